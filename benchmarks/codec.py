@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+
+"""
+This application measures the number of times per second the primitive
+data types, the registered confirmed request, unconfirmed request and
+complex ack services, and the BVLL and NPDU headers can be encoded and
+decoded.  The results can be saved as a baseline and the results of a later
+build compared with it, the exit status is 1 when one of them is slower by
+more than the threshold or fails.
+"""
+
+import re
+import sys
+import json
+import time
+import timeit
+import platform
+
+from bacpypes import __version__ as bacpypes_version
+from bacpypes.debugging import ModuleLogger, xtob
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address, RemoteStation, PDU, PDUData
+from bacpypes.primitivedata import Atomic, Null, Boolean, Unsigned, Integer, \
+    Real, Double, OctetString, CharacterString, BitString, Enumerated, \
+    Date, Time, ObjectIdentifier, Tag
+from bacpypes.constructeddata import Sequence, Choice, Array, Any, AnyAtomic, \
+    _sequence_of_classes
+from bacpypes.npdu import NPDU
+from bacpypes.bvll import BVLPDU, OriginalUnicastNPDU, ForwardedNPDU
+from bacpypes.apdu import APDU, ConfirmedRequestPDU, UnconfirmedRequestPDU, \
+    ComplexAckPDU, confirmed_request_types, unconfirmed_request_types, \
+    complex_ack_types
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# the deepest structure built for a sample value
+MAX_DEPTH = 6
+
+#
+#   sample_value
+#
+
+# values of the primitive data types, checked in order
+_atomic_samples = [
+    (Null, ()),
+    (Boolean, True),
+    (Unsigned, 1200),
+    (Integer, -1200),
+    (Real, 72.5),
+    (Double, 1013.25),
+    (OctetString, xtob('0102030405')),
+    (CharacterString, 'sample character string'),
+    (Date, (118, 6, 15, 5)),
+    (Time, (13, 45, 30, 0)),
+    (ObjectIdentifier, ('analogValue', 12)),
+    ]
+
+def sample_value(klass, depth=0):
+    """Return a value of a class that can be given to the constructor of
+    the class or as an element of a sequence."""
+    if depth > MAX_DEPTH:
+        raise RuntimeError("structure too deep: %s" % (klass.__name__,))
+
+    if issubclass(klass, Enumerated):
+        # the name with the smallest value
+        if not klass.enumerations:
+            return 0
+        return min(klass.enumerations, key=lambda name: klass.enumerations[name])
+
+    if issubclass(klass, BitString):
+        # the default has the right length
+        value = klass().value
+        return [i % 2 for i in range(len(value) or 8)]
+
+    if issubclass(klass, Atomic):
+        for atomic_class, value in _atomic_samples:
+            if issubclass(klass, atomic_class):
+                return value
+        raise TypeError("no sample for %s" % (klass.__name__,))
+
+    if issubclass(klass, AnyAtomic):
+        return Unsigned(12)
+
+    if issubclass(klass, Any):
+        return Any(Real(72.5))
+
+    if klass in _sequence_of_classes:
+        return [sample_value(klass.subtype, depth + 1) for i in range(2)]
+
+    if issubclass(klass, Array):
+        return klass([sample_value(klass.subtype, depth + 1) for i in range(2)])
+
+    if issubclass(klass, Choice):
+        if not klass.choiceElements:
+            raise TypeError("no choices for %s" % (klass.__name__,))
+        element = klass.choiceElements[0]
+        return klass(**{element.name: sample_value(element.klass, depth + 1)})
+
+    if issubclass(klass, Sequence):
+        kwargs = {}
+        for element in klass.sequenceElements:
+            try:
+                kwargs[element.name] = sample_value(element.klass, depth + 1)
+            except (TypeError, RuntimeError):
+                # optional elements without a sample are left out
+                if not element.optional:
+                    raise
+        return klass(**kwargs)
+
+    raise TypeError("no sample for %s" % (klass.__name__,))
+
+#
+#   Cases
+#
+
+def encoded_length(tag):
+    """Return the number of octets of an encoded tag."""
+    data = PDUData()
+    tag.encode(data)
+    return len(data.pduData)
+
+def atomic_case(klass):
+    """Return the size and the encode and decode functions of a primitive
+    data type."""
+    obj = klass(sample_value(klass))
+
+    def encode():
+        obj.encode(Tag())
+
+    tag = Tag()
+    obj.encode(tag)
+
+    def decode():
+        klass(tag)
+
+    return encoded_length(tag), encode, decode
+
+def service_case(klass, pdu_class):
+    """Return the size and the encode and decode functions of a service,
+    encoded into an APDU of the class and then the octets of a PDU like the
+    application and network layers."""
+    seq = sample_value(klass)
+    if pdu_class is not UnconfirmedRequestPDU:
+        seq.apduInvokeID = 1
+    if pdu_class is ConfirmedRequestPDU:
+        seq.apduMaxResp = 1024
+
+    def encode():
+        xpdu = pdu_class()
+        seq.encode(xpdu)
+        apdu = APDU()
+        xpdu.encode(apdu)
+        pdu = PDU()
+        apdu.encode(pdu)
+        return pdu
+
+    data = encode().pduData
+
+    def decode():
+        apdu = APDU()
+        apdu.decode(PDU(data))
+        xpdu = pdu_class()
+        xpdu.decode(apdu)
+        klass().decode(xpdu)
+
+    return len(data), encode, decode
+
+def npdu_case(dadr=None, sadr=None):
+    """Return the size and the encode and decode functions of an NPDU
+    header with an APDU payload."""
+    payload = xtob('1008')
+
+    def encode():
+        npdu = NPDU(payload)
+        if dadr:
+            npdu.npduDADR = dadr
+            npdu.npduHopCount = 255
+        npdu.npduSADR = sadr
+        pdu = PDU()
+        npdu.encode(pdu)
+        return pdu
+
+    data = encode().pduData
+
+    def decode():
+        NPDU().decode(PDU(data))
+
+    return len(data), encode, decode
+
+def bvll_case(klass, *args):
+    """Return the size and the encode and decode functions of a BVLL
+    header with an NPDU payload."""
+    payload = xtob('01201008')
+
+    def encode():
+        xpdu = klass(*args + (payload,))
+        bvlpdu = BVLPDU()
+        xpdu.encode(bvlpdu)
+        pdu = PDU()
+        bvlpdu.encode(pdu)
+        return pdu
+
+    data = encode().pduData
+
+    def decode():
+        bvlpdu = BVLPDU()
+        bvlpdu.decode(PDU(data))
+        klass().decode(bvlpdu)
+
+    return len(data), encode, decode
+
+def build_cases():
+    """Return a list of (name, case_function, args) tuples for all of the
+    cases."""
+    cases = []
+
+    for klass in (Null, Boolean, Unsigned, Integer, Real, Double, OctetString,
+            CharacterString, BitString, Enumerated, Date, Time, ObjectIdentifier):
+        cases.append(("primitive." + klass.__name__, atomic_case, (klass,)))
+
+    for prefix, types, pdu_class in (
+            ('confirmed.', confirmed_request_types, ConfirmedRequestPDU),
+            ('unconfirmed.', unconfirmed_request_types, UnconfirmedRequestPDU),
+            ('complexack.', complex_ack_types, ComplexAckPDU),
+            ):
+        for klass in sorted(types.values(), key=lambda klass: klass.__name__):
+            cases.append((prefix + klass.__name__, service_case, (klass, pdu_class)))
+
+    cases.append(("npdu.Local", npdu_case, ()))
+    cases.append(("npdu.Routed", npdu_case, (RemoteStation(2, 5), RemoteStation(3, 6))))
+    cases.append(("bvll.OriginalUnicastNPDU", bvll_case, (OriginalUnicastNPDU,)))
+    cases.append(("bvll.ForwardedNPDU", bvll_case, (ForwardedNPDU, Address('192.168.0.10'))))
+
+    return cases
+
+#
+#   ops_per_second
+#
+
+def ops_per_second(fn, duration, repeat):
+    """Return the number of calls to the function per second, the best of
+    a number of runs that each take at least the duration."""
+    timer = timeit.Timer(fn)
+
+    # find a number of calls that takes long enough
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= duration:
+            break
+        number *= 2 if (elapsed < duration / 10.0) else int(duration / elapsed) + 1
+
+    return number / min([elapsed] + timer.repeat(repeat - 1, number))
+
+#
+#   run_cases
+#
+
+def run_cases(pattern, duration, repeat):
+    """Return a dictionary of the results of the cases with a name that
+    matches the pattern."""
+    results = {}
+
+    for name, case_function, args in build_cases():
+        if not re.search(pattern, name):
+            continue
+
+        try:
+            size, encode, decode = case_function(*args)
+            encode_ops = ops_per_second(encode, duration, repeat)
+            decode_ops = ops_per_second(decode, duration, repeat)
+        except Exception as err:
+            sys.stderr.write("%s skipped: %r\n" % (name, err))
+            continue
+
+        results[name] = {'size': size, 'encode': encode_ops, 'decode': decode_ops}
+        print("%-50s %5d %12.0f %10.2f %12.0f %10.2f" % (name, size,
+            encode_ops, encode_ops * size / 1e6,
+            decode_ops, decode_ops * size / 1e6,
+            ))
+
+    return results
+
+#
+#   compare_results
+#
+
+def compare_results(baseline, results, threshold):
+    """Print the change of each result from the baseline and return the
+    number of them slower by more than the threshold.  A case in the
+    baseline without a result, because it raised an exception or is gone,
+    is also a regression."""
+    regressions = 0
+
+    print("")
+    print("%-50s %8s %8s" % ('', 'encode', 'decode'))
+    for name in sorted(results):
+        if name not in baseline:
+            print("%-50s %8s %8s" % (name, 'new', 'new'))
+            continue
+
+        changes = []
+        for key in ('encode', 'decode'):
+            change = results[name][key] / baseline[name][key] - 1.0
+            if change < -threshold:
+                regressions += 1
+                changes.append("%+7.1f%%*" % (change * 100.0,))
+            else:
+                changes.append("%+7.1f%% " % (change * 100.0,))
+        print("%-50s %s %s" % (name, changes[0], changes[1]))
+
+    for name in sorted(set(baseline) - set(results)):
+        regressions += 1
+        print("%-50s %8s %8s" % (name, 'missing*', 'missing*'))
+
+    return regressions
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add arguments for the cases and the timing
+    parser.add_argument('--filter', type=str, default='',
+          help='regular expression matching the names of the cases to run',
+          )
+    parser.add_argument('--duration', type=float, default=0.1,
+          help='minimum number of seconds for each run',
+          )
+    parser.add_argument('--repeat', type=int, default=3,
+          help='number of runs, the best one is used',
+          )
+
+    # add arguments for the baseline
+    parser.add_argument('--save', type=str,
+          help='save the results in a baseline file',
+          )
+    parser.add_argument('--compare', type=str,
+          help='compare the results with a baseline file',
+          )
+    parser.add_argument('--threshold', type=float, default=0.10,
+          help='fraction slower than the baseline that is a regression',
+          )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    print("%-50s %5s %12s %10s %12s %10s" % ('', 'size', 'encode/s', 'MB/s', 'decode/s', 'MB/s'))
+    results = run_cases(args.filter, args.duration, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({
+                'python': platform.python_version(),
+                'bacpypes': bacpypes_version,
+                'date': time.strftime('%Y-%m-%d'),
+                'results': results,
+                }, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        if baseline['python'] != platform.python_version():
+            sys.stderr.write("baseline is from Python %s\n" % (baseline['python'],))
+
+        # only the cases that were run are compared
+        baseline_results = dict((name, result) for name, result in baseline['results'].items()
+            if re.search(args.filter, name))
+
+        regressions = compare_results(baseline_results, results, args.threshold)
+        if regressions:
+            sys.stderr.write("%d regression(s), missing or slower by more than %.0f%%\n" % (regressions, args.threshold * 100.0))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+"""
+This application runs the core while a number of threads call functions
+in it with deferred_iocb() and wait for them to complete.  It reports the
+number of calls per second, the time from a call to its completion, and
+how late a task that is scheduled every 10 milliseconds runs, for each of
+the numbers of threads.
+"""
+
+import time
+import threading
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.core import run, stop, deferred
+from bacpypes.task import FunctionTask
+from bacpypes.iocb import deferred_iocb
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   percentile
+#
+
+def percentile(values, fraction):
+    """Return the value below which the fraction of the values are."""
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+#
+#   measure
+#
+
+def measure(thread_count, duration):
+    """Return the calls per second, the round trip times and the task
+    lateness with a number of threads."""
+    done = threading.Event()
+    round_trips = []
+    lateness = []
+
+    def worker():
+        while not done.is_set():
+            start = time.time()
+            iocb = deferred_iocb(int)
+            iocb.wait()
+            round_trips.append(time.time() - start)
+
+    def probe(when):
+        lateness.append(time.time() - when)
+        if not done.is_set():
+            when = time.time() + 0.01
+            FunctionTask(probe, when).install_task(when)
+
+    threads = [threading.Thread(target=worker) for i in range(thread_count)]
+
+    def finish():
+        time.sleep(duration)
+        done.set()
+
+        # the core keeps running until the threads are finished
+        for thread in threads:
+            thread.join()
+        stop()
+
+    def begin():
+        for thread in threads:
+            thread.start()
+        threading.Thread(target=finish).start()
+        probe(time.time())
+
+    deferred(begin)
+    run(sigterm=None, sigusr1=None)
+
+    return len(round_trips) / duration, round_trips, lateness
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add arguments for the threads and the time
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 10, 50],
+          help='numbers of threads to measure',
+          )
+    parser.add_argument('--duration', type=float, default=2.0,
+          help='number of seconds for each measurement',
+          )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    print("%8s %10s %10s %10s %10s %10s" % ('threads', 'calls/s',
+        'rtt p50', 'rtt p99', 'late p50', 'late p99'))
+    for thread_count in args.threads:
+        rate, round_trips, lateness = measure(thread_count, args.duration)
+        print("%8d %10.0f %8.3fms %8.3fms %8.3fms %8.3fms" % (thread_count, rate,
+            percentile(round_trips, 0.5) * 1000.0, percentile(round_trips, 0.99) * 1000.0,
+            percentile(lateness, 0.5) * 1000.0, percentile(lateness, 0.99) * 1000.0,
+            ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+"""
+This application opens a number of idle TCP connections to a server
+director and reports the time it takes to make one pass through the loop
+that waits for socket activity, using asyncore.loop() that builds the
+lists of readable and writable dispatchers each time and the selector loop
+that only checks the ones that change.  The select() call used by asyncore
+cannot watch file descriptors above 1023, so keep the counts below that.
+"""
+
+import socket
+import asyncore
+import timeit
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes import core
+from bacpypes.tcp import TCPServerDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   open_connections
+#
+
+def open_connections(director, address, count):
+    """Return a list of client sockets connected to the director."""
+    clients = []
+    start = len(director.servers)
+    for i in range(count):
+        client = socket.create_connection(address)
+        clients.append(client)
+
+        # let the director accept it
+        while len(director.servers) <= start + i:
+            asyncore.loop(timeout=0.1, count=1)
+
+    return clients
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add arguments for the connections and the passes
+    parser.add_argument('--count', type=int, nargs='+', default=[10, 100, 500],
+          help='numbers of idle connections to measure',
+          )
+    parser.add_argument('--number', type=int, default=1000,
+          help='number of passes through the loop timed',
+          )
+    parser.add_argument('--port', type=int, default=47850,
+          help='port of the server director',
+          )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    address = ('127.0.0.1', args.port)
+    director = TCPServerDirector(address, reuse=True)
+
+    # the selector loop watches the same dispatchers
+    selector_loop = core.SelectorLoop()
+
+    print("%8s %12s %12s" % ('count', 'asyncore', 'selectors'))
+    clients = []
+    for count in args.count:
+        clients.extend(open_connections(director, address, count - len(clients)))
+
+        asyncore_time = timeit.timeit(lambda: asyncore.loop(timeout=0, count=1), number=args.number)
+        selector_time = timeit.timeit(lambda: selector_loop.poll(0), number=args.number)
+
+        print("%8d %10.1fus %10.1fus" % (count,
+            asyncore_time * 1e6 / args.number, selector_time * 1e6 / args.number,
+            ))
+
+    for client in clients:
+        client.close()
+    director.close()
+
+if __name__ == "__main__":
+    main()
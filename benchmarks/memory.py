@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+"""
+This application builds a large number of tags, addresses and PDUs and
+reports the memory used by each one and the time it takes to reference one
+of its attributes.  The same values are copied into plain objects that keep
+their attributes in a dictionary for comparison.
+"""
+
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from bacpypes.debugging import ModuleLogger, xtob
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.primitivedata import Tag, ContextTag
+from bacpypes.pdu import Address, LocalStation, RemoteStation, PDU
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   Plain
+#
+
+class Plain(object):
+
+    """An object with its attributes in a dictionary."""
+
+    pass
+
+def attribute_names(obj):
+    """Return the names of the attributes of an object that have a value,
+    whether they are slots or in its dictionary."""
+    names = []
+    for klass in type(obj).__mro__:
+        for name in klass.__dict__.get('__slots__', ()):
+            if (name not in names) and hasattr(obj, name):
+                names.append(name)
+    names.extend(getattr(obj, '__dict__', {}))
+    return names
+
+def plain_copy(obj):
+    """Return a plain object with the same attribute values."""
+    plain = Plain()
+    for name in attribute_names(obj):
+        setattr(plain, name, getattr(obj, name))
+    return plain
+
+#
+#   object_size
+#
+
+def object_size(fn, count):
+    """Return the average number of bytes allocated by a call to the
+    function, which returns a new object."""
+    if tracemalloc:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [fn() for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # the list of objects is not part of the objects
+        return (after - before - sys.getsizeof(objects)) / float(count)
+
+    # without tracemalloc only the object and its dictionary are counted
+    obj = fn()
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return float(size)
+
+# the object referenced by access_time()
+_obj = None
+
+def access_time(obj, attr, number):
+    """Return the time in nanoseconds to reference an attribute."""
+    global _obj
+
+    _obj = obj
+    timer = timeit.Timer("obj.%s" % (attr,), "from %s import _obj as obj" % (__name__,))
+    return min(timer.repeat(3, number)) * 1e9 / number
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the number of objects
+    parser.add_argument('--count', type=int, default=100000,
+          help='number of objects built for each measurement',
+          )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    source = Address('192.168.0.10')
+    destination = Address('192.168.0.20')
+
+    cases = [
+        ('Tag', 'tagNumber', lambda: ContextTag(1, xtob('05'))),
+        ('Address', 'addrAddr', lambda: Address('192.168.0.10:47809')),
+        ('LocalStation', 'addrAddr', lambda: LocalStation(12)),
+        ('RemoteStation', 'addrNet', lambda: RemoteStation(2, 12)),
+        ('PDU', 'pduSource', lambda: PDU(xtob('0102'), source=source, destination=destination)),
+        ]
+
+    print("%-14s %10s %10s %10s %10s" % ('', 'bytes', 'plain', 'ns', 'plain'))
+    for name, attr, fn in cases:
+        size = object_size(fn, args.count)
+        plain_size = object_size(lambda: plain_copy(fn()), args.count)
+
+        obj = fn()
+        ns = access_time(obj, attr, 1000000)
+        plain_ns = access_time(plain_copy(obj), attr, 1000000)
+
+        print("%-14s %10.1f %10.1f %10.1f %10.1f" % (name, size, plain_size, ns, plain_ns))
+
+if __name__ == "__main__":
+    main()
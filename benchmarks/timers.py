@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""
+This application installs a large number of timers in the task manager
+and reports the time it takes to install, reschedule and suspend one of
+them, like the state machine, IOCB and UDP actor timers that are restarted
+all the time.
+"""
+
+import random
+import timeit
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.task import TaskManager, OneShotTask
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   Timer
+#
+
+class Timer(OneShotTask):
+
+    def process_task(self):
+        pass
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add arguments for the number of timers and operations
+    parser.add_argument('--count', type=int, default=100000,
+          help='number of timers installed',
+          )
+    parser.add_argument('--number', type=int, default=10000,
+          help='number of operations timed',
+          )
+    parser.add_argument('--wheel', type=float,
+          help='resolution of the timing wheel for the timers',
+          )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    task_manager = TaskManager()
+    now = task_manager.get_time()
+
+    # all the timers are coarse
+    if args.wheel:
+        task_manager.enable_timing_wheel(args.wheel, default=True)
+
+    # install the timers an hour from now
+    timers = [Timer() for i in range(args.count)]
+    start = timeit.default_timer()
+    for timer in timers:
+        timer.install_task(now + 3600.0 + random.random())
+    elapsed = timeit.default_timer() - start
+    print("%-12s %10.2f us" % ('install', elapsed * 1e6 / args.count))
+
+    # pick the timers that are changed
+    picked = [random.choice(timers) for i in range(args.number)]
+
+    # move them around
+    start = timeit.default_timer()
+    for timer in picked:
+        timer.install_task(now + 3600.0 + random.random())
+    elapsed = timeit.default_timer() - start
+    print("%-12s %10.2f us" % ('reschedule', elapsed * 1e6 / args.number))
+
+    # suspend and resume them
+    start = timeit.default_timer()
+    for timer in picked:
+        timer.suspend_task()
+        timer.resume_task()
+    elapsed = timeit.default_timer() - start
+    print("%-12s %10.2f us" % ('suspend', elapsed * 1e6 / args.number))
+
+    # all of them still scheduled
+    assert all(timer.isScheduled for timer in timers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+"""
+This application sends a storm of datagrams, like the I-Am responses to a
+global Who-Is, from a number of peer sockets to a UDP director and reports
+how many of them were received, how many the kernel dropped when that is
+known, and how many datagrams were read each time the socket was readable,
+for each of the batch sizes.  Then it fans a
+broadcast out to the peers, like a BBMD forwarding to foreign devices, and
+reports how many datagrams were sent each time the socket was writable and
+how many times the socket buffer was full.
+"""
+
+import time
+import socket
+import threading
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.core import run, stop, deferred
+from bacpypes.task import FunctionTask
+from bacpypes.comm import PDU, Client, bind
+from bacpypes.udp import UDPDirector, BufferPool
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# an I-Am with a BVLL header
+I_AM = b'\x81\x0b\x00\x18\x01\x20\xff\xff\x00\xff\x10\x00\xc4\x02\x00\x00\x05\x22\x04\x00\x91\x00\x21\x0f'
+
+#
+#   Counter
+#
+
+class Counter(Client):
+
+    def __init__(self):
+        Client.__init__(self)
+        self.received = 0
+
+    def confirmation(self, pdu):
+        self.received += 1
+
+#
+#   measure
+#
+
+def measure(address, batch, count, peer_count, rcvbuf, pool):
+    """Return the number of datagrams received and the director."""
+    director = UDPDirector(address, reuse=True, batch=batch,
+        pool=BufferPool() if pool else None, rcvbuf=rcvbuf,
+        )
+
+    counter = Counter()
+    bind(counter, director)
+
+    peers = []
+    for i in range(peer_count):
+        peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        peer.bind((address[0], 0))
+        peers.append(peer)
+
+    def storm():
+        for i in range(count):
+            peers[i % peer_count].sendto(I_AM, address)
+
+        # give the core some time to catch up
+        time.sleep(0.5)
+        deferred(stop)
+
+    deferred(threading.Thread(target=storm).start)
+    run(sigterm=None, sigusr1=None)
+
+    for peer in peers:
+        peer.close()
+    director.close_socket()
+
+    return counter.received, director
+
+#
+#   measure_fanout
+#
+
+def measure_fanout(address, count, peer_count, sndbuf):
+    """Return the seconds to send to every peer count times and the
+    director."""
+    director = UDPDirector(address, reuse=True, sndbuf=sndbuf)
+
+    peers = []
+    for i in range(peer_count):
+        peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        peer.bind((address[0], 0))
+        peers.append(peer)
+
+    def fanout():
+        for i in range(count):
+            for peer in peers:
+                director.indication(PDU(I_AM, destination=peer.getsockname()))
+
+        deferred(finish)
+
+    def finish():
+        if director.request:
+            FunctionTask(finish).install_task(delta=0.001)
+        else:
+            stop()
+
+    start = time.time()
+    deferred(fanout)
+    run(sigterm=None, sigusr1=None)
+    elapsed = time.time() - start
+
+    for peer in peers:
+        peer.close()
+    director.close_socket()
+
+    return elapsed, director
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add arguments for the storm
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 8, 64],
+          help='most datagrams read each time the socket is readable',
+          )
+    parser.add_argument('--count', type=int, default=20000,
+          help='number of datagrams sent',
+          )
+    parser.add_argument('--peers', type=int, default=100,
+          help='number of peer sockets sending them',
+          )
+    parser.add_argument('--rcvbuf', type=int, default=65536,
+          help='receive buffer size of the director socket',
+          )
+    parser.add_argument('--sndbuf', type=int, default=0,
+          help='send buffer size of the director socket for the fanout',
+          )
+    parser.add_argument('--pool', action='store_true',
+          help='read the datagrams into pooled buffers',
+          )
+    parser.add_argument('--port', type=int, default=47870,
+          help='port of the director',
+          )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    address = ('127.0.0.1', args.port)
+
+    print("%6s %9s %9s %9s %10s %10s" % ('batch', 'received', 'lost', 'kernel', 'mean read', 'max read'))
+    for batch in args.batch:
+        received, director = measure(address, batch, args.count, args.peers, args.rcvbuf, args.pool)
+
+        reads = director.readBatches
+        kernel_drops = director.metrics.kernelDrops
+        print("%6d %9d %9d %9s %10s %10s" % (batch, received, args.count - received,
+            '-' if kernel_drops is None else kernel_drops,
+            "%.1f" % reads.mean() if reads.count else '-',
+            reads.maximum if reads.count else '-',
+            ))
+
+    fanout_count = max(args.count // args.peers, 1)
+    elapsed, director = measure_fanout(address, fanout_count, args.peers, args.sndbuf)
+
+    writes = director.writeBatches
+    print("")
+    print("%9s %10s %10s %10s" % ('sent', 'seconds', 'mean sent', 'blocked'))
+    print("%9d %10.3f %10.1f %10d" % (writes.total, elapsed, writes.mean(), director.writeBlocked))
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,8 @@ from .pdu import PCI, PDUData
 from .primitivedata import Boolean, CharacterString, Enumerated, Integer, \
     ObjectIdentifier, ObjectType, OctetString, Real, TagList, Unsigned, \
     expand_enumerations
-from .constructeddata import Any, Choice, Element, Sequence, SequenceOf
+from .constructeddata import Any, Choice, Element, Sequence, SequenceOf, \
+    compile_codec
 from .basetypes import ChannelValue, DateTime, DeviceAddress, ErrorType, \
     EventState, EventTransitionBits, EventType, LifeSafetyOperation, \
     NotificationParameters, NotifyType, ObjectPropertyReference, \
@@ -22,6 +23,10 @@ from .basetypes import ChannelValue, DateTime, DeviceAddress, ErrorType, \
 _debug = 0
 _log = ModuleLogger(globals())
 
+# octets reserved in front of an encoded APDU for the APCI and the headers
+# added by the lower layers, see PDUData.put_pdu()
+apdu_header_room = 64
+
 # a dictionary of message type values and classes
 apdu_types = {}
 
@@ -33,24 +38,28 @@ confirmed_request_types = {}
 
 def register_confirmed_request_type(klass):
     confirmed_request_types[klass.serviceChoice] = klass
+    compile_codec(klass)
 
 # a dictionary of complex ack choices and classes
 complex_ack_types = {}
 
 def register_complex_ack_type(klass):
     complex_ack_types[klass.serviceChoice] = klass
+    compile_codec(klass)
 
 # a dictionary of unconfirmed request choices and classes
 unconfirmed_request_types = {}
 
 def register_unconfirmed_request_type(klass):
     unconfirmed_request_types[klass.serviceChoice] = klass
+    compile_codec(klass)
 
 # a dictionary of unconfirmed request choices and classes
 error_types = {}
 
 def register_error_type(klass):
     error_types[klass.serviceChoice] = klass
+    compile_codec(klass)
 
 #
 #   encode_max_segments_accepted/decode_max_segments_accepted
@@ -262,11 +271,9 @@ class APCI(PCI, DebugContents):
                 self.apduSeq = pdu.get()
                 self.apduWin = pdu.get()
             self.apduService = pdu.get()
-            self.pduData = pdu.pduData
 
         elif (self.apduType == UnconfirmedRequestPDU.pduType):
             self.apduService = pdu.get()
-            self.pduData = pdu.pduData
 
         elif (self.apduType == SimpleAckPDU.pduType):
             self.apduInvokeID = pdu.get()
@@ -280,7 +287,6 @@ class APCI(PCI, DebugContents):
                 self.apduSeq = pdu.get()
                 self.apduWin = pdu.get()
             self.apduService = pdu.get()
-            self.pduData = pdu.pduData
 
         elif (self.apduType == SegmentAckPDU.pduType):
             self.apduNak = ((buff & 0x02) != 0)
@@ -292,7 +298,6 @@ class APCI(PCI, DebugContents):
         elif (self.apduType == ErrorPDU.pduType):
             self.apduInvokeID = pdu.get()
             self.apduService = pdu.get()
-            self.pduData = pdu.pduData
 
         elif (self.apduType == RejectPDU.pduType):
             self.apduInvokeID = pdu.get()
@@ -302,7 +307,6 @@ class APCI(PCI, DebugContents):
             self.apduSrv = ((buff & 0x01) != 0)
             self.apduInvokeID = pdu.get()
             self.apduAbortRejectReason = pdu.get()
-            self.pduData = pdu.pduData
 
         else:
             raise DecodingError("invalid APDU type")
@@ -358,12 +362,12 @@ class APDU(APCI, PDUData):
     def encode(self, pdu):
         if _debug: APCI._debug("encode %s", str(pdu))
         APCI.encode(self, pdu)
-        pdu.put_data(self.pduData)
+        pdu.put_pdu(self)
 
     def decode(self, pdu):
         if _debug: APCI._debug("decode %s", str(pdu))
         APCI.decode(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
     def apdu_contents(self, use_dict=None, as_class=dict):
         return PDUData.pdudata_contents(self, use_dict=use_dict, as_class=as_class)
@@ -397,11 +401,11 @@ class _APDU(APDU):
 
     def encode(self, pdu):
         APCI.update(pdu, self)
-        pdu.put_data(self.pduData)
+        pdu.put_pdu(self)
 
     def decode(self, pdu):
         APCI.update(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
     def set_context(self, context):
         self.pduUserData = context.pduUserData
@@ -661,6 +665,38 @@ class APCISequence(APCI, Sequence):
         # start with an empty tag list
         self._tag_list = None
 
+        # data that has not been decoded, see lazy_decode()
+        self._lazy_data = None
+
+    def __getattr__(self, attr):
+        # decode the data when an element is first referenced
+        lazy_data = self.__dict__.get('_lazy_data')
+        if lazy_data is not None:
+            for element in self.sequenceElements:
+                if element.name == attr:
+                    if _debug: APCISequence._debug("__getattr__ %r (decoding)", attr)
+
+                    self._lazy_data = None
+                    offset = lazy_data._pduOffset
+                    try:
+                        self._decode_elements(lazy_data)
+                    except Exception as err:
+                        # remove what was decoded and keep the data, so the
+                        # next reference raises the error again
+                        for element in self.sequenceElements:
+                            self.__dict__.pop(element.name, None)
+                        lazy_data._pduOffset = offset
+                        self._lazy_data = lazy_data
+
+                        # not to be mistaken for a missing attribute
+                        if isinstance(err, AttributeError):
+                            raise DecodingError(str(err))
+                        raise
+
+                    return getattr(self, attr)
+
+        raise AttributeError(attr)
+
     def encode(self, apdu):
         if _debug: APCISequence._debug("encode %r", apdu)
 
@@ -671,7 +707,8 @@ class APCISequence(APCI, Sequence):
         self._tag_list = TagList()
         Sequence.encode(self, self._tag_list)
 
-        # encode the tag list
+        # leave room for the headers and encode the tag list
+        apdu.reserve(apdu_header_room)
         self._tag_list.encode(apdu)
 
     def decode(self, apdu):
@@ -680,6 +717,29 @@ class APCISequence(APCI, Sequence):
         # copy the header fields
         self.update(apdu)
 
+        # decode the rest of the data
+        self._lazy_data = None
+        self._decode_elements(apdu)
+
+    def lazy_decode(self, apdu):
+        """Decode the header fields now and the elements when one of them
+        is first referenced, which is when decoding errors are raised.  The
+        error is raised again by each reference after that."""
+        if _debug: APCISequence._debug("lazy_decode %r", apdu)
+
+        # copy the header fields
+        self.update(apdu)
+
+        # keep the rest of the data, remove the elements so they are found
+        # by __getattr__()
+        self._lazy_data = PDUData()
+        self._lazy_data.take_data(apdu)
+        for element in self.sequenceElements:
+            self.__dict__.pop(element.name, None)
+
+    def _decode_elements(self, apdu):
+        if _debug: APCISequence._debug("_decode_elements %r", apdu)
+
         # create a tag list and decode the rest of the data
         self._tag_list = TagList()
         self._tag_list.decode(apdu)
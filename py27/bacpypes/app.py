@@ -5,8 +5,10 @@ Application Module
 """
 
 import warnings
+import threading
 
 from .debugging import bacpypes_debugging, DebugContents, ModuleLogger
+from .core import deferred
 from .comm import ApplicationServiceElement, bind
 from .iocb import IOController, SieveQueue
 
@@ -37,6 +39,9 @@ from .service.object import ReadWritePropertyServices
 _debug = 0
 _log = ModuleLogger(globals())
 
+# set in the threads running helper functions for the executor
+_executor_thread = threading.local()
+
 #
 #   DeviceInfo
 #
@@ -239,6 +244,10 @@ class Application(ApplicationServiceElement, Collector):
         # controllers for managing confirmed requests as a client
         self.controllers = {}
 
+        # helper functions can run in an executor
+        self.executor = None
+        self.executorHelpers = set()
+
         # now set up the rest of the capabilities
         Collector.__init__(self)
 
@@ -345,6 +354,75 @@ class Application(ApplicationServiceElement, Collector):
         # continue
         super(Application, self).request(apdu)
 
+    def set_executor(self, executor, helpers=()):
+        """Run the helper functions with these names, like
+        'do_ReadPropertyRequest', and the requests to read or write properties
+        that have offload set, in an executor like a ThreadPoolExecutor.
+        Only ReadProperty and WriteProperty requests look at offload, other
+        services like ReadPropertyMultiple read those properties on the core
+        thread unless their helper functions are named here."""
+        if _debug: Application._debug("set_executor %r %r", executor, helpers)
+
+        self.executor = executor
+        self.executorHelpers = set(helpers)
+
+    def offload_helper(self, helperName, apdu):
+        """Return true if the helper function should run in the executor."""
+        if helperName in self.executorHelpers:
+            return True
+
+        try:
+            objId = getattr(apdu, 'objectIdentifier', None)
+            propId = getattr(apdu, 'propertyIdentifier', None)
+            if (objId is None) or (propId is None):
+                return False
+
+            obj = self.get_object_id(objId)
+            prop = obj and obj._properties.get(propId, None)
+        except Exception:
+            # let the helper function have the error
+            return False
+
+        return bool(prop and prop.offload)
+
+    def run_helper(self, helperFn, apdu):
+        """Run a helper function in a thread of the executor, the responses
+        and errors are passed back to the core."""
+        if _debug: Application._debug("run_helper %r %r", helperFn, apdu)
+
+        resp = None
+
+        _executor_thread.active = True
+        try:
+            helperFn(apdu)
+        except RejectException as err:
+            if _debug: Application._debug("    - reject exception: %r", err)
+            resp = RejectPDU(reason=err.rejectReason, context=apdu)
+        except AbortException as err:
+            if _debug: Application._debug("    - abort exception: %r", err)
+            resp = AbortPDU(reason=err.abortReason, context=apdu)
+        except ExecutionError as err:
+            if _debug: Application._debug("    - execution error: %r", err)
+            resp = Error(errorClass=err.errorClass, errorCode=err.errorCode, context=apdu)
+        except Exception as err:
+            Application._exception("exception: %r", err)
+            resp = Error(errorClass='device', errorCode='operationalProblem', context=apdu)
+        finally:
+            _executor_thread.active = False
+
+        # send back the error
+        if resp and isinstance(apdu, ConfirmedRequestPDU):
+            deferred(ApplicationServiceElement.response, self, resp)
+
+    def response(self, apdu):
+        if _debug: Application._debug("response %r", apdu)
+
+        # helper functions running in the executor pass it to the core
+        if getattr(_executor_thread, 'active', False):
+            deferred(ApplicationServiceElement.response, self, apdu)
+        else:
+            ApplicationServiceElement.response(self, apdu)
+
     def indication(self, apdu):
         if _debug: Application._debug("indication %r", apdu)
 
@@ -359,6 +437,21 @@ class Application(ApplicationServiceElement, Collector):
                 raise UnrecognizedService("no function %s" % (helperName,))
             return
 
+        # some run in the executor, the server transaction still has the
+        # application timeout
+        if self.executor and self.offload_helper(helperName, apdu):
+            if _debug: Application._debug("    - executor")
+            try:
+                self.executor.submit(self.run_helper, helperFn, apdu)
+            except Exception as err:
+                Application._exception("executor exception: %r", err)
+
+                # send back an error like the helper function failed
+                if isinstance(apdu, ConfirmedRequestPDU):
+                    resp = Error(errorClass='device', errorCode='operationalProblem', context=apdu)
+                    self.response(resp)
+            return
+
         # pass the apdu on to the helper function
         try:
             helperFn(apdu)
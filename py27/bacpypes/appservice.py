@@ -16,7 +16,7 @@ from .apdu import AbortPDU, AbortReason, ComplexAckPDU, \
     ConfirmedRequestPDU, Error, ErrorPDU, RejectPDU, SegmentAckPDU, \
     SimpleAckPDU, UnconfirmedRequestPDU, apdu_types, \
     unconfirmed_request_types, confirmed_request_types, complex_ack_types, \
-    error_types
+    error_types, apdu_header_room
 from .errors import RejectException, AbortException
 
 # some debugging
@@ -184,9 +184,13 @@ class SSM(OneShotTask, DebugContents):
             segAPDU.apduSeg = False
             segAPDU.apduMor = False
 
-        # add the content
-        offset = indx * self.segmentSize
-        segAPDU.put_data( self.segmentAPDU.pduData[offset:offset+self.segmentSize] )
+        # add the content, an unsegmented message shares the buffer
+        if (self.segmentCount == 1):
+            segAPDU.put_pdu(self.segmentAPDU)
+        else:
+            offset = indx * self.segmentSize
+            segAPDU.reserve(apdu_header_room)
+            segAPDU.put_data( self.segmentAPDU.pduData[offset:offset+self.segmentSize] )
 
         # success
         return segAPDU
@@ -300,12 +304,12 @@ class ClientSSM(SSM):
         if _debug: ClientSSM._debug("    - invoke ID: %r", self.invokeID)
 
         # compute the segment count ### minus the header?
-        if not apdu.pduData:
+        if not apdu.remaining():
             # always at least one segment
             self.segmentCount = 1
         else:
             # split into chunks, maybe need one more
-            self.segmentCount, more = divmod(len(apdu.pduData), self.segmentSize)
+            self.segmentCount, more = divmod(apdu.remaining(), self.segmentSize)
             if more:
                 self.segmentCount += 1
         if _debug: ClientSSM._debug("    - segment count: %r", self.segmentCount)
@@ -747,12 +751,12 @@ class ServerSSM(SSM):
             if _debug: ServerSSM._debug("    - segment size: %r", self.segmentSize)
 
             # compute the segment count ### minus the header?
-            if not apdu.pduData:
+            if not apdu.remaining():
                 # always at least one segment
                 self.segmentCount = 1
             else:
                 # split into chunks, maybe need one more
-                self.segmentCount, more = divmod(len(apdu.pduData), self.segmentSize)
+                self.segmentCount, more = divmod(apdu.remaining(), self.segmentSize)
                 if more:
                     self.segmentCount += 1
             if _debug: ServerSSM._debug("    - segment count: %r", self.segmentCount)
@@ -1318,11 +1322,24 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
 @bacpypes_debugging
 class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoint):
 
-    def __init__(self, aseID=None, sapID=None):
-        if _debug: ApplicationServiceAccessPoint._debug("__init__ aseID=%r sapID=%r", aseID, sapID)
+    def __init__(self, aseID=None, sapID=None, lazy=False):
+        if _debug: ApplicationServiceAccessPoint._debug("__init__ aseID=%r sapID=%r lazy=%r", aseID, sapID, lazy)
         ApplicationServiceElement.__init__(self, aseID)
         ServiceAccessPoint.__init__(self, sapID)
 
+        # decode the service parameters when they are referenced
+        self.lazy = lazy
+
+    def decode_apdu(self, atype, apdu):
+        """Return an instance of the service class decoded from the APDU."""
+        xpdu = atype()
+        if self.lazy:
+            xpdu.lazy_decode(apdu)
+        else:
+            xpdu.decode(apdu)
+
+        return xpdu
+
     def indication(self, apdu):
         if _debug: ApplicationServiceAccessPoint._debug("indication %r", apdu)
 
@@ -1336,8 +1353,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
             error_found = None
 
             try:
-                xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu = self.decode_apdu(atype, apdu)
             except RejectException as err:
                 ApplicationServiceAccessPoint._debug("    - decoding reject: %r", err)
                 error_found = err
@@ -1387,8 +1403,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
                 return
 
             try:
-                xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu = self.decode_apdu(atype, apdu)
             except RejectException as err:
                 ApplicationServiceAccessPoint._debug("    - decoding reject: %r", err)
                 return
@@ -1456,8 +1471,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
                 return
 
             try:
-                xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu = self.decode_apdu(atype, apdu)
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("unconfirmed request decoding error: %r", err)
                 return
@@ -1469,8 +1483,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
                 atype = Error
 
             try:
-                xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu = self.decode_apdu(atype, apdu)
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("error PDU decoding error: %r", err)
                 xpdu = Error(errorClass=0, errorCode=0)
@@ -65,7 +65,7 @@ class BVLCI(PCI, DebugContents):
         pdu.put( self.bvlciType )               # 0x81
         pdu.put( self.bvlciFunction )
 
-        if (self.bvlciLength != len(self.pduData) + 4):
+        if (self.bvlciLength != self.remaining() + 4):
             raise EncodingError("invalid BVLCI length")
 
         pdu.put_short( self.bvlciLength )
@@ -84,7 +84,7 @@ class BVLCI(PCI, DebugContents):
         self.bvlciFunction = pdu.get()
         self.bvlciLength = pdu.get_short()
 
-        if (self.bvlciLength != len(pdu.pduData) + 4):
+        if (self.bvlciLength != pdu.remaining() + 4):
             raise DecodingError("invalid BVLCI length")
 
     def bvlci_contents(self, use_dict=None, as_class=dict):
@@ -116,11 +116,11 @@ class BVLPDU(BVLCI, PDUData):
 
     def encode(self, pdu):
         BVLCI.encode(self, pdu)
-        pdu.put_data(self.pduData)
+        pdu.put_pdu(self)
 
     def decode(self, pdu):
         BVLCI.decode(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         return PDUData.pdudata_contents(self, use_dict=use_dict, as_class=as_class)
@@ -226,7 +226,7 @@ class WriteBroadcastDistributionTable(BVLPDU):
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
         self.bvlciBDT = []
-        while bvlpdu.pduData:
+        while bvlpdu.remaining():
             bdte = Address(unpack_ip_addr(bvlpdu.get_data(6)))
             bdte.addrMask = bvlpdu.get_long()
             self.bvlciBDT.append(bdte)
@@ -306,7 +306,7 @@ class ReadBroadcastDistributionTableAck(BVLPDU):
 
         # decode the table
         self.bvlciBDT = []
-        while bvlpdu.pduData:
+        while bvlpdu.remaining():
             bdte = Address(unpack_ip_addr(bvlpdu.get_data(6)))
             bdte.addrMask = bvlpdu.get_long()
             self.bvlciBDT.append(bdte)
@@ -339,12 +339,12 @@ class ForwardedNPDU(BVLPDU):
         super(ForwardedNPDU, self).__init__(*args, **kwargs)
 
         self.bvlciFunction = BVLCI.forwardedNPDU
-        self.bvlciLength = 10 + len(self.pduData)
+        self.bvlciLength = 10 + self.remaining()
         self.bvlciAddress = addr
 
     def encode(self, bvlpdu):
         # make sure the length is correct
-        self.bvlciLength = 10 + len(self.pduData)
+        self.bvlciLength = 10 + self.remaining()
 
         BVLCI.update(bvlpdu, self)
 
@@ -352,7 +352,7 @@ class ForwardedNPDU(BVLPDU):
         bvlpdu.put_data( self.bvlciAddress.addrAddr )
 
         # encode the rest of the data
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu(self)
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
@@ -361,7 +361,7 @@ class ForwardedNPDU(BVLPDU):
         self.bvlciAddress = Address(unpack_ip_addr(bvlpdu.get_data(6)))
 
         # get the rest of the data
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -508,7 +508,7 @@ class ReadForeignDeviceTableAck(BVLPDU):
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
         self.bvlciFDT = []
-        while bvlpdu.pduData:
+        while bvlpdu.remaining():
             fdte = FDTEntry()
             fdte.fdAddress = Address(unpack_ip_addr(bvlpdu.get_data(6)))
             fdte.fdTTL = bvlpdu.get_short()
@@ -576,16 +576,16 @@ class DistributeBroadcastToNetwork(BVLPDU):
         super(DistributeBroadcastToNetwork, self).__init__(*args, **kwargs)
 
         self.bvlciFunction = BVLCI.distributeBroadcastToNetwork
-        self.bvlciLength = 4 + len(self.pduData)
+        self.bvlciLength = 4 + self.remaining()
 
     def encode(self, bvlpdu):
-        self.bvlciLength = 4 + len(self.pduData)
+        self.bvlciLength = 4 + self.remaining()
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu(self)
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -619,16 +619,16 @@ class OriginalUnicastNPDU(BVLPDU):
         super(OriginalUnicastNPDU, self).__init__(*args, **kwargs)
 
         self.bvlciFunction = BVLCI.originalUnicastNPDU
-        self.bvlciLength = 4 + len(self.pduData)
+        self.bvlciLength = 4 + self.remaining()
 
     def encode(self, bvlpdu):
-        self.bvlciLength = 4 + len(self.pduData)
+        self.bvlciLength = 4 + self.remaining()
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu(self)
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -662,16 +662,16 @@ class OriginalBroadcastNPDU(BVLPDU):
         super(OriginalBroadcastNPDU, self).__init__(*args, **kwargs)
 
         self.bvlciFunction = BVLCI.originalBroadcastNPDU
-        self.bvlciLength = 4 + len(self.pduData)
+        self.bvlciLength = 4 + self.remaining()
 
     def encode(self, bvlpdu):
-        self.bvlciLength = 4 + len(self.pduData)
+        self.bvlciLength = 4 + self.remaining()
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu(self)
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
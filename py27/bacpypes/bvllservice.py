@@ -57,8 +57,8 @@ class _MultiplexServer(Server):
 @bacpypes_debugging
 class UDPMultiplexer:
 
-    def __init__(self, addr=None, noBroadcast=False):
-        if _debug: UDPMultiplexer._debug("__init__ %r noBroadcast=%r", addr, noBroadcast)
+    def __init__(self, addr=None, noBroadcast=False, batch=1, rcvbuf=None, sndbuf=None):
+        if _debug: UDPMultiplexer._debug("__init__ %r noBroadcast=%r batch=%r rcvbuf=%r sndbuf=%r", addr, noBroadcast, batch, rcvbuf, sndbuf)
 
         # check for some options
         specialBroadcast = False
@@ -93,13 +93,13 @@ class UDPMultiplexer:
 
         # create and bind the direct address
         self.direct = _MultiplexClient(self)
-        self.directPort = UDPDirector(self.addrTuple)
+        self.directPort = UDPDirector(self.addrTuple, batch=batch, rcvbuf=rcvbuf, sndbuf=sndbuf)
         bind(self.direct, self.directPort)
 
         # create and bind the broadcast address for non-Windows
         if specialBroadcast and (not noBroadcast) and sys.platform in ('linux2', 'darwin'):
             self.broadcast = _MultiplexClient(self)
-            self.broadcastPort = UDPDirector(self.addrBroadcastTuple, reuse=True)
+            self.broadcastPort = UDPDirector(self.addrBroadcastTuple, reuse=True, batch=batch, rcvbuf=rcvbuf, sndbuf=sndbuf)
             bind(self.direct, self.broadcastPort)
         else:
             self.broadcast = None
@@ -19,6 +19,10 @@ _log = ModuleLogger(globals())
 _short_mask = 0xFFFFL
 _long_mask = 0xFFFFFFFFL
 
+# unpack short/long values in place
+_short_struct = struct.Struct('>H')
+_long_struct = struct.Struct('>L')
+
 # maps of named clients and servers
 client_map = {}
 server_map = {}
@@ -28,12 +32,29 @@ service_map = {}
 element_map = {}
 
 
+#
+#   PDUSlots
+#
+#   The PCI and PDUData classes are mixed together in the PDU classes of
+#   each layer, and only one of the bases of a class can add slots, so the
+#   attributes of both of them are slots of this class.  The PDU classes do
+#   not have slots, a dictionary is created for other attributes when one
+#   is set.
+#
+
+class PDUSlots(object):
+
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination',
+        '_pduData', '_pduOffset', '_pduPending')
+
 #
 #   PCI
 #
 
 @bacpypes_debugging
-class PCI(DebugContents):
+class PCI(PDUSlots, DebugContents):
+
+    __slots__ = ()
 
     _debug_contents = ('pduUserData+', 'pduSource', 'pduDestination')
 
@@ -96,9 +117,22 @@ class PCI(DebugContents):
 #
 #   PDUData
 #
+#   The packet data is kept in a buffer with a read cursor, the get*()
+#   functions advance the cursor rather than slicing octets off the front
+#   of the string, so decoding a packet is linear in its length.  The unread
+#   part is only sliced out when the pduData attribute is referenced.
+#
+#   When encoding, the put*() functions collect the pieces in a list that is
+#   joined when the data is next referenced, so encoding is linear too.
+#   Strings are immutable so they can be shared between PDUs, but they can
+#   not be written into, so put_pdu() only avoids the copy when there is no
+#   header in front of the data.
+#
 
 @bacpypes_debugging
-class PDUData(object):
+class PDUData(PDUSlots):
+
+    __slots__ = ()
 
     def __init__(self, data=None, *args, **kwargs):
         if _debug: PDUData._debug("__init__ %r %r %r", data, args, kwargs)
@@ -113,46 +147,147 @@ class PDUData(object):
         elif isinstance(data, str):
             self.pduData = data
         elif isinstance(data, PDUData) or isinstance(data, PDU):
-            self.pduData = _copy(data.pduData)
+            self.pduData = b''
+            self.put_pdu(data)
         else:
             raise TypeError("string expected")
 
+    def _get_pdu_data(self):
+        if self._pduPending:
+            self._flush()
+
+        # slice off what has already been decoded
+        if self._pduOffset:
+            self._pduData = self._pduData[self._pduOffset:]
+            self._pduOffset = 0
+
+        return self._pduData
+
+    def _set_pdu_data(self, data):
+        self._pduData = data
+        self._pduOffset = 0
+        self._pduPending = None
+
+    pduData = property(_get_pdu_data, _set_pdu_data)
+
+    def _flush(self):
+        # join the pieces that have been put
+        self._pduData = self._pduData + ''.join(self._pduPending)
+        self._pduPending = None
+
+    def remaining(self):
+        """Return the number of octets that have not been decoded."""
+        if self._pduPending:
+            self._flush()
+
+        return len(self._pduData) - self._pduOffset
+
     def get(self):
-        if len(self.pduData) == 0:
+        if self._pduPending:
+            self._flush()
+
+        offset = self._pduOffset
+        if offset >= len(self._pduData):
             raise DecodingError("no more packet data")
 
-        octet = ord(self.pduData[0])
-        self.pduData = self.pduData[1:]
+        self._pduOffset = offset + 1
 
-        return octet
+        return ord(self._pduData[offset])
 
     def get_data(self, dlen):
-        if len(self.pduData) < dlen:
+        if self._pduPending:
+            self._flush()
+
+        offset = self._pduOffset
+        if len(self._pduData) - offset < dlen:
             raise DecodingError("no more packet data")
 
-        data = self.pduData[:dlen]
-        self.pduData = self.pduData[dlen:]
+        data = self._pduData[offset:offset + dlen]
+        self._pduOffset = offset + dlen
 
         return data
 
     def get_short(self):
-        return struct.unpack('>H',self.get_data(2))[0]
+        if self._pduPending:
+            self._flush()
+
+        offset = self._pduOffset
+        if len(self._pduData) - offset < 2:
+            raise DecodingError("no more packet data")
+
+        self._pduOffset = offset + 2
+
+        return _short_struct.unpack_from(self._pduData, offset)[0]
 
     def get_long(self):
-        return struct.unpack('>L',self.get_data(4))[0]
+        if self._pduPending:
+            self._flush()
+
+        offset = self._pduOffset
+        if len(self._pduData) - offset < 4:
+            raise DecodingError("no more packet data")
+
+        self._pduOffset = offset + 4
+
+        return _long_struct.unpack_from(self._pduData, offset)[0]
+
+    def take_data(self, pdu):
+        """Take the rest of the packet data from the PDU, sharing its buffer
+        and cursor rather than copying the contents."""
+        if pdu._pduPending:
+            pdu._flush()
+
+        self._pduData = pdu._pduData
+        self._pduOffset = pdu._pduOffset
+        self._pduPending = None
+
+        # the other PDU has been completely decoded
+        pdu.pduData = b''
+
+    def reserve(self, n):
+        """Reserve room for n octets of headers in front of the data.  Strings
+        can not be written into, so there is nothing to do."""
+        pass
 
     def put(self, n):
+        if self._pduPending is None:
+            self._pduPending = []
+
         # pduData is a string
-        self.pduData += chr(n)
+        self._pduPending.append(chr(n))
 
     def put_data(self, data):
-        self.pduData += data
+        if isinstance(data, bytearray):
+            data = str(data)
+
+        if self._pduPending is None:
+            self._pduPending = []
+
+        self._pduPending.append(data)
 
     def put_short(self, n):
-        self.pduData += struct.pack('>H',n & _short_mask)
+        if self._pduPending is None:
+            self._pduPending = []
+
+        self._pduPending.append(_short_struct.pack(n & _short_mask))
 
     def put_long(self, n):
-        self.pduData += struct.pack('>L',n & _long_mask)
+        if self._pduPending is None:
+            self._pduPending = []
+
+        self._pduPending.append(_long_struct.pack(n & _long_mask))
+
+    def put_pdu(self, pdu):
+        """Append the rest of the data of the PDU, sharing the string when
+        there is nothing here yet."""
+        if pdu._pduPending:
+            pdu._flush()
+
+        if self.remaining():
+            self.put_data(pdu._pduData[pdu._pduOffset:])
+        else:
+            self._pduData = pdu._pduData
+            self._pduOffset = pdu._pduOffset
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         if isinstance(self.pduData, str):
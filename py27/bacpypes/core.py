@@ -12,7 +12,11 @@ import time
 import traceback
 import warnings
 
+from collections import deque
+from thread import get_ident
+
 from .task import TaskManager
+from .metrics import LoopMetrics
 from .debugging import bacpypes_debugging, ModuleLogger
 
 # some debugging
@@ -22,9 +26,14 @@ _log = ModuleLogger(globals())
 # globals
 running = False
 taskManager = None
-deferredFns = []
 sleeptime = 0.0
 
+# functions called by the loop, appended by any thread
+deferredFns = deque()
+
+# updated by the loop when metrics are enabled
+loopMetrics = None
+
 #
 #   stop
 #
@@ -42,10 +51,11 @@ def stop(*args):
 
     running = False
 
-    # trigger the task manager event
+    # trigger the task manager event, this may be a signal handler
+    # running in the loop thread
     if taskManager and taskManager.trigger:
         if _debug: stop._debug("    - trigger")
-        taskManager.trigger.set()
+        taskManager.trigger.wakeup()
 
 #
 #   dump_stack
@@ -65,15 +75,19 @@ def dump_stack():
 def print_stack(sig, frame):
     """Signal handler to print a stack trace and some interesting values."""
     if _debug: print_stack._debug("print_stack %r %r", sig, frame)
-    global running, deferredFns, sleeptime
+    global running, deferredFns, sleeptime, loopMetrics
 
     sys.stderr.write("==== USR1 Signal, %s\n" % time.strftime("%d-%b-%Y %H:%M:%S"))
 
     sys.stderr.write("---------- globals\n")
     sys.stderr.write("    running: %r\n" % (running,))
-    sys.stderr.write("    deferredFns: %r\n" % (deferredFns,))
+    sys.stderr.write("    deferredFns: %r\n" % (list(deferredFns),))
     sys.stderr.write("    sleeptime: %r\n" % (sleeptime,))
 
+    if loopMetrics:
+        sys.stderr.write("---------- metrics\n")
+        loopMetrics.dump(sys.stderr)
+
     sys.stderr.write("---------- stack\n")
     traceback.print_stack(frame)
 
@@ -93,14 +107,38 @@ def print_stack(sig, frame):
 
     sys.stderr.flush()
 
+#
+#   enable_metrics
+#
+
+@bacpypes_debugging
+def enable_metrics():
+    """Start recording how the loop and the tasks are doing, returns the
+    metrics.LoopMetrics instance which is also dumped by print_stack()."""
+    if _debug: enable_metrics._debug("enable_metrics")
+    global loopMetrics
+
+    if not loopMetrics:
+        loopMetrics = LoopMetrics()
+
+    # reference the task manager (a singleton)
+    TaskManager().metrics = loopMetrics
+
+    return loopMetrics
+
 #
 #   run
 #
 
+# seconds to wait when there are no tasks and nothing to break the wait
 SPIN = 1.0
 
 @bacpypes_debugging
 def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
+    """Process tasks, socket activity and deferred functions until stop()
+    is called.  When the task manager has a trigger the loop waits until
+    the next task, socket activity or a wake up from another thread,
+    otherwise it wakes up every spin seconds."""
     if _debug: run._debug("run spin=%r sigterm=%r, sigusr1=%r", spin, sigterm, sigusr1)
     global running, taskManager, deferredFns, sleeptime
 
@@ -116,6 +154,10 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
     # reference the task manager (a singleton)
     taskManager = TaskManager()
 
+    # tasks installed by this thread do not need the trigger
+    if taskManager.trigger:
+        taskManager.trigger.loopThread = get_ident()
+
     # count how many times we are going through the loop
     loopCount = 0
 
@@ -124,6 +166,10 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
 #       if _debug: run._debug("    - time: %r", time.time())
         loopCount += 1
 
+        metrics = loopMetrics
+        if metrics:
+            start = time.time()
+
         # get the next task
         task, delta = taskManager.get_next_task()
 
@@ -133,36 +179,40 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
                 # if _debug: run._debug("    - task: %r", task)
                 taskManager.process_task(task)
 
-            # if delta is None, there are no tasks, default to spinning
-            if delta is None:
+                # it may have installed a task that is sooner
+                when, nxttask = taskManager.peek_task()
+                if nxttask:
+                    delta = max(when - time.time(), 0.0)
+
+            # if delta is None, there are no tasks, wait for the trigger
+            # or default to spinning when there isn't one
+            if (delta is None) and not taskManager.trigger:
                 delta = spin
 
-            # there may be threads around, sleep for a bit
-            if sleeptime and (delta > sleeptime):
+            # there may be threads around, sleep for a bit, not needed when
+            # they can use the trigger
+            if sleeptime and (not taskManager.trigger) and (delta > sleeptime):
                 time.sleep(sleeptime)
                 delta -= sleeptime
 
-            # if there are deferred functions, use a small delta
+            # if there are deferred functions, do not wait
             if deferredFns:
-                delta = min(delta, 0.001)
+                delta = 0.0
 #           if _debug: run._debug("    - delta: %r", delta)
 
             # loop for socket activity
+            if metrics:
+                poll_start = time.time()
             asyncore.loop(timeout=delta, count=1)
+            if metrics:
+                metrics.poll.record(time.time() - poll_start)
+                metrics.deferred.record(len(deferredFns))
 
-            # check for deferred functions
+            # check for deferred functions, including the ones they defer
             while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-#                   if _debug: run._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn(*args, **kwargs)
-
-                # done with this list
-                del fnlist
+                fn, args, kwargs = deferredFns.popleft()
+#               if _debug: run._debug("    - call: %r %r %r", fn, args, kwargs)
+                fn(*args, **kwargs)
 
         except KeyboardInterrupt:
             if _debug: run._info("keyboard interrupt")
@@ -170,8 +220,15 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
         except Exception as err:
             if _debug: run._exception("an error has occurred: %s", err)
 
+        if metrics:
+            metrics.iterations.record(time.time() - start)
+
     running = False
 
+    # other threads may run tasks now
+    if taskManager.trigger:
+        taskManager.trigger.loopThread = None
+
 #
 #   run_once
 #
@@ -200,19 +257,11 @@ def run_once():
             if task:
                 taskManager.process_task(task)
 
-            # check for deferred functions
+            # check for deferred functions, including the ones they defer
             while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-                    if _debug: run_once._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn(*args, **kwargs)
-
-                # done with this list
-                del fnlist
+                fn, args, kwargs = deferredFns.popleft()
+                if _debug: run_once._debug("    - call: %r %r %r", fn, args, kwargs)
+                fn(*args, **kwargs)
 
     except KeyboardInterrupt:
         if _debug: run_once._info("keyboard interrupt")
@@ -228,20 +277,34 @@ def deferred(fn, *args, **kwargs):
     if _debug: deferred._debug("deferred %r %r %r", fn, args, kwargs)
     global deferredFns, taskManager
 
-    # append it to the list
+    # append it to the queue, safe from any thread
     deferredFns.append((fn, args, kwargs))
 
-    # trigger the task manager event
+    # trigger the task manager event, once until the loop wakes up
     if taskManager and taskManager.trigger:
         if _debug: deferred._debug("    - trigger")
         taskManager.trigger.set()
 
+#
+#   dispatcher_changed
+#
+
+def dispatcher_changed(dispatcher):
+    """Called when what readable() or writable() returns may have changed
+    other than by an event of the dispatcher, like a PDU queued to send.
+    The loop may be waiting without a timeout, so the wait is broken when
+    this is called by another thread."""
+    if taskManager and taskManager.trigger:
+        taskManager.trigger.set()
+
 #
 #   enable_sleeping
 #
 
 @bacpypes_debugging
 def enable_sleeping(stime=0.001):
+    """Sleep each time through the loop so other threads can run, only
+    used when the task manager does not have a trigger."""
     if _debug: enable_sleeping._debug("enable_sleeping %r", stime)
     global sleeptime
 
@@ -0,0 +1,298 @@
+#!/usr/bin/python
+
+"""
+Metrics
+
+Instances of the classes in this module are updated by core.run() and the
+task manager when core.enable_metrics() has been called.  Recording a value
+is a bisect and a few additions, cheap enough to leave on.  The UDP and TCP
+directors always count their traffic in a TransportMetrics instance.
+"""
+
+import sys
+
+from bisect import bisect_left
+from collections import OrderedDict
+
+from .debugging import DebugContents, bacpypes_debugging, ModuleLogger
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# bucket bounds for durations in seconds, 100us doubling to about 6.5s
+TIME_BOUNDS = tuple(0.0001 * 2 ** i for i in range(17))
+
+# bucket bounds for queue depths
+DEPTH_BOUNDS = tuple(2 ** i for i in range(11))
+
+#
+#   Histogram
+#
+#   Values are counted in buckets, each has an upper bound and the last one
+#   is for everything larger than the last bound.
+#
+
+@bacpypes_debugging
+class Histogram(DebugContents):
+
+    _debug_contents = ('count', 'total', 'maximum')
+
+    def __init__(self, bounds=TIME_BOUNDS):
+        if _debug: Histogram._debug("__init__ %r", bounds)
+
+        self.bounds = tuple(bounds)
+        self.reset()
+
+    def reset(self):
+        """Forget the recorded values."""
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.maximum = 0
+
+    def record(self, value):
+        """Count the value in its bucket."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def mean(self):
+        """Return the mean of the values, None if there are none."""
+        if not self.count:
+            return None
+
+        return self.total / float(self.count)
+
+    def percentile(self, percent):
+        """Return the upper bound of the bucket with the value at this
+        percentile, the maximum for the last bucket, None if there are
+        no values."""
+        if not self.count:
+            return None
+
+        target = self.count * percent / 100.0
+        running = 0
+        for i, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                break
+
+        if i < len(self.bounds):
+            return min(self.bounds[i], self.maximum)
+        return self.maximum
+
+    def snapshot(self):
+        """Return the values as a dictionary."""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'maximum': self.maximum,
+            'mean': self.mean(),
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'buckets': list(zip(self.bounds + (None,), self.counts)),
+            }
+
+#
+#   LoopMetrics
+#
+
+@bacpypes_debugging
+class LoopMetrics(DebugContents):
+
+    _debug_contents = ('iterations', 'poll', 'lateness', 'deferred')
+
+    def __init__(self):
+        if _debug: LoopMetrics._debug("__init__")
+
+        # seconds for each pass through the loop and waiting for sockets
+        self.iterations = Histogram(TIME_BOUNDS)
+        self.poll = Histogram(TIME_BOUNDS)
+
+        # seconds from the time a task is scheduled until it is processed
+        self.lateness = Histogram(TIME_BOUNDS)
+
+        # number of deferred functions waiting at the end of a pass
+        self.deferred = Histogram(DEPTH_BOUNDS)
+
+        # task class name -> [count, total seconds, maximum seconds]
+        self.taskClasses = {}
+
+    def reset(self):
+        """Forget the recorded values."""
+        if _debug: LoopMetrics._debug("reset")
+
+        self.iterations.reset()
+        self.poll.reset()
+        self.lateness.reset()
+        self.deferred.reset()
+        self.taskClasses = {}
+
+    def record_task(self, task, lateness, elapsed):
+        """Called by the task manager after a task has been processed."""
+        self.lateness.record(max(lateness, 0.0))
+
+        task_class = task.__class__
+        name = task_class.__module__ + '.' + task_class.__name__
+
+        stats = self.taskClasses.get(name, None)
+        if stats is None:
+            self.taskClasses[name] = [1, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+
+    def snapshot(self):
+        """Return the values as a dictionary."""
+        return {
+            'iterations': self.iterations.snapshot(),
+            'poll': self.poll.snapshot(),
+            'lateness': self.lateness.snapshot(),
+            'deferred': self.deferred.snapshot(),
+            'taskClasses': dict((name, tuple(stats)) for name, stats in self.taskClasses.items()),
+            }
+
+    def dump(self, file=None):
+        """Write a summary of the values."""
+        if file is None:
+            file = sys.stderr
+
+        for name in ('iterations', 'poll', 'lateness', 'deferred'):
+            histogram = getattr(self, name)
+            file.write("    %s: count=%d mean=%r p50=%r p99=%r max=%r\n" % (
+                name, histogram.count, histogram.mean(),
+                histogram.percentile(50), histogram.percentile(99), histogram.maximum,
+                ))
+
+        # slowest tasks first
+        task_classes = sorted(self.taskClasses.items(), key=lambda item: -item[1][1])
+        for name, (count, total, maximum) in task_classes:
+            file.write("    task %s: count=%d total=%r max=%r\n" % (name, count, total, maximum))
+
+#
+#   TransportMetrics
+#
+#   Each UDP and TCP director has one of these.  For UDP a packet is a
+#   datagram, for TCP it is the octets from one read or write of the stream.
+#   The counts are kept for the most recently active peers, up to maxPeers,
+#   so a scan of a large network does not grow them without bound.
+#
+
+# indexes of the per-peer counters
+PACKETS_IN, BYTES_IN, PACKETS_OUT, BYTES_OUT, ERRORS = range(5)
+
+@bacpypes_debugging
+class TransportMetrics(DebugContents):
+
+    _debug_contents = ('packetsIn', 'bytesIn', 'packetsOut', 'bytesOut',
+        'errors', 'queueDepth', 'queueHighWater', 'kernelDrops')
+
+    def __init__(self, maxPeers=256):
+        if _debug: TransportMetrics._debug("__init__ maxPeers=%r", maxPeers)
+
+        # the most peers counted, the least recently active are dropped
+        self.maxPeers = maxPeers
+
+        # number of datagrams dropped because the socket receive buffer was
+        # full, None when the platform does not report it
+        self.kernelDrops = None
+
+        self.reset()
+
+    def reset(self):
+        """Forget the counts, the kernel drops are a running total kept by
+        the socket and are not reset."""
+        if _debug: TransportMetrics._debug("reset")
+
+        self.packetsIn = 0
+        self.bytesIn = 0
+        self.packetsOut = 0
+        self.bytesOut = 0
+        self.errors = 0
+
+        # packets waiting to be sent, or octets for TCP connections
+        self.queueDepth = 0
+        self.queueHighWater = 0
+
+        # peer address -> [packets in, bytes in, packets out, bytes out, errors]
+        # least recently active first
+        self.peers = OrderedDict()
+
+    def _peer(self, peer):
+        peers = self.peers
+
+        # move it to the end
+        stats = peers.pop(peer, None)
+        if stats is None:
+            stats = [0, 0, 0, 0, 0]
+            if len(peers) >= self.maxPeers:
+                peers.popitem(last=False)
+        peers[peer] = stats
+
+        return stats
+
+    def received(self, peer, nbytes):
+        """Count a packet received from the peer."""
+        self.packetsIn += 1
+        self.bytesIn += nbytes
+
+        stats = self._peer(peer)
+        stats[PACKETS_IN] += 1
+        stats[BYTES_IN] += nbytes
+
+    def sent(self, peer, nbytes):
+        """Count a packet sent to the peer."""
+        self.packetsOut += 1
+        self.bytesOut += nbytes
+
+        stats = self._peer(peer)
+        stats[PACKETS_OUT] += 1
+        stats[BYTES_OUT] += nbytes
+
+    def error(self, peer=None):
+        """Count a socket error, with the peer when there is one."""
+        self.errors += 1
+
+        if peer is not None:
+            self._peer(peer)[ERRORS] += 1
+
+    def queued(self, depth):
+        """Record the depth of the outbound queue after it has grown."""
+        self.queueDepth = depth
+        if depth > self.queueHighWater:
+            self.queueHighWater = depth
+
+    def snapshot(self):
+        """Return the values as a dictionary."""
+        return {
+            'packetsIn': self.packetsIn,
+            'bytesIn': self.bytesIn,
+            'packetsOut': self.packetsOut,
+            'bytesOut': self.bytesOut,
+            'errors': self.errors,
+            'queueDepth': self.queueDepth,
+            'queueHighWater': self.queueHighWater,
+            'kernelDrops': self.kernelDrops,
+            'peers': dict((peer, tuple(stats)) for peer, stats in self.peers.items()),
+            }
+
+    def dump(self, file=None):
+        """Write a summary of the values."""
+        if file is None:
+            file = sys.stderr
+
+        file.write("    in: packets=%d bytes=%d\n" % (self.packetsIn, self.bytesIn))
+        file.write("    out: packets=%d bytes=%d\n" % (self.packetsOut, self.bytesOut))
+        file.write("    errors=%d queue=%d high=%d kernelDrops=%r\n" % (
+            self.errors, self.queueDepth, self.queueHighWater, self.kernelDrops,
+            ))
+
+        # busiest peers first
+        peers = sorted(self.peers.items(), key=lambda item: -(item[1][PACKETS_IN] + item[1][PACKETS_OUT]))
+        for peer, stats in peers:
+            file.write("    peer %s: in=%d/%d out=%d/%d errors=%d\n" % ((peer,) + tuple(stats)))
@@ -8,6 +8,8 @@ import re
 import socket
 import struct
 
+from collections import OrderedDict
+
 try:
     import netifaces
 except ImportError:
@@ -33,7 +35,7 @@ ethernet_re = re.compile(r'^([0-9A-Fa-f][0-9A-Fa-f][:]){5}([0-9A-Fa-f][0-9A-Fa-f
 interface_re = re.compile(r'^(?:([\w]+))(?::(\d+))?$')
 
 @bacpypes_debugging
-class Address:
+class Address(object):
     nullAddr = 0
     localBroadcastAddr = 1
     localStationAddr = 2
@@ -41,8 +43,27 @@ class Address:
     remoteStationAddr = 4
     globalBroadcastAddr = 5
 
+    __slots__ = ('addrType', 'addrNet', 'addrLen', 'addrAddr',
+        'addrIP', 'addrMask', 'addrHost', 'addrSubnet', 'addrPort',
+        'addrTuple', 'addrBroadcastTuple', 'addrHash')
+
     def __init__(self, *args):
         if _debug: Address._debug("__init__ %r", args)
+
+        # the arguments are parsed once and each address gets a copy of the
+        # results, so attributes like the mask can be changed without
+        # changing the others, subclasses may parse them differently
+        if (self.__class__ is Address) and args:
+            for attr, value in _parse_address(args)[1]:
+                setattr(self, attr, value)
+            return
+
+        self.parse_args(args)
+
+    def parse_args(self, args):
+        """Initialize the address from the arguments of the constructor."""
+        if _debug: Address._debug("parse_args %r", args)
+
         self.addrType = Address.nullAddr
         self.addrNet = None
         self.addrLen = 0
@@ -61,6 +82,8 @@ class Address:
             else:
                 raise ValueError("unrecognized address ctor form")
 
+        self.addrHash = hash( (self.addrType, self.addrNet, self.addrAddr) )
+
     def decode_address(self, addr):
         """Initialize the address from a string.  Lots of different forms are supported."""
         if _debug: Address._debug("decode_address %r (%s)", addr, type(addr))
@@ -337,12 +360,17 @@ class Address:
         return "<%s %s>" % (self.__class__.__name__, self.__str__())
 
     def __hash__(self):
-        return hash( (self.addrType, self.addrNet, self.addrAddr) )
+        # computed when the address is built, so the type, network and
+        # address must not be changed after that
+        return self.addrHash
 
     def __eq__(self,arg):
-        # try an coerce it into an address
+        if arg is self:
+            return True
+
+        # try an coerce it into an address, without building a new one
         if not isinstance(arg, Address):
-            arg = Address(arg)
+            arg = _parse_address((arg,))[0]
 
         # all of the components must match
         return (self.addrType == arg.addrType) and (self.addrNet == arg.addrNet) and (self.addrAddr == arg.addrAddr)
@@ -371,12 +399,62 @@ def unpack_ip_addr(addr):
     """Given a six-octet BACnet address, return an IP address tuple."""
     return (socket.inet_ntoa(addr[0:4]), struct.unpack('!H', addr[4:6])[0])
 
+#
+#   _parse_address
+#
+
+# addresses parsed from the arguments of the constructor and the values of
+# their attributes, least recently used first
+_address_cache = OrderedDict()
+_address_cache_size = 1024
+
+def _parse_address(args):
+    """Return the Address built from the arguments of its constructor and a
+    tuple of the names and values of its attributes.  The address is shared
+    and must not be changed."""
+    # the class of each argument is part of the key, True is not 1
+    key = ()
+    for arg in args:
+        key += (arg.__class__, arg)
+
+    try:
+        parsed = _address_cache.get(key)
+    except TypeError:
+        # unhashable arguments like a bytearray are not cached
+        key = parsed = None
+
+    if parsed is not None:
+        _address_cache[key] = _address_cache.pop(key)
+        return parsed
+
+    addr = object.__new__(Address)
+    addr.parse_args(args)
+
+    # the address of an interface can change, so it is looked up each time,
+    # these are the IP addresses parsed from a string that is not one
+    if (key is not None) and netifaces and hasattr(addr, 'addrTuple'):
+        for arg in args:
+            if isinstance(arg, basestring) and not ip_address_mask_port_re.match(arg):
+                key = None
+
+    # the IP attributes are only set for IP addresses
+    parsed = (addr, tuple((attr, getattr(addr, attr)) for attr in Address.__slots__ if hasattr(addr, attr)))
+
+    if key is not None:
+        _address_cache[key] = parsed
+        if len(_address_cache) > _address_cache_size:
+            _address_cache.popitem(last=False)
+
+    return parsed
+
 #
 #   LocalStation
 #
 
 class LocalStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, addr):
         self.addrType = Address.localStationAddr
         self.addrNet = None
@@ -397,12 +475,16 @@ class LocalStation(Address):
         else:
             raise TypeError("integer, bytes or bytearray required")
 
+        self.addrHash = hash( (self.addrType, self.addrNet, self.addrAddr) )
+
 #
 #   RemoteStation
 #
 
 class RemoteStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, net, addr):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -428,24 +510,32 @@ class RemoteStation(Address):
         else:
             raise TypeError("integer, bytes or bytearray required")
 
+        self.addrHash = hash( (self.addrType, self.addrNet, self.addrAddr) )
+
 #
 #   LocalBroadcast
 #
 
 class LocalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self):
         self.addrType = Address.localBroadcastAddr
         self.addrNet = None
         self.addrAddr = None
         self.addrLen = None
 
+        self.addrHash = hash( (self.addrType, self.addrNet, self.addrAddr) )
+
 #
 #   RemoteBroadcast
 #
 
 class RemoteBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self, net):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -457,18 +547,24 @@ class RemoteBroadcast(Address):
         self.addrAddr = None
         self.addrLen = None
 
+        self.addrHash = hash( (self.addrType, self.addrNet, self.addrAddr) )
+
 #
 #   GlobalBroadcast
 #
 
 class GlobalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self):
         self.addrType = Address.globalBroadcastAddr
         self.addrNet = None
         self.addrAddr = None
         self.addrLen = None
 
+        self.addrHash = hash( (self.addrType, self.addrNet, self.addrAddr) )
+
 #
 #   PCI
 #
@@ -476,6 +572,8 @@ class GlobalBroadcast(Address):
 @bacpypes_debugging
 class PCI(_PCI):
 
+    __slots__ = ('pduExpectingReply', 'pduNetworkPriority')
+
     _debug_contents = ('pduExpectingReply', 'pduNetworkPriority')
 
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,234 @@
+#!/usr/bin/python
+
+"""
+Shard
+
+A sharded stack runs a BACnet/IP application in each of a number of
+processes.  Shard zero is the primary, it binds the BACnet port like any
+other application, hosts the local device and steers the unconfirmed
+services it receives to the shard that owns the initiating device.  The
+other shards bind the ports that follow it on the same interface, so the
+responses to their requests come straight back from the network.
+
+Devices are partitioned by their instance number, shard_of() returns the
+shard that owns a device and each shard should only make requests to the
+devices it owns.  The primary steers these unconfirmed services, wrapped in
+a Forwarded-NPDU so the shard sees the original source:
+
+    - I-Am and I-Have, by the device identifier
+    - unconfirmed COV and event notifications, by the initiating device
+
+Other broadcasts, like Who-Is and Who-Has, are processed by the primary
+and also forwarded to every shard when fanout is true.  Everything else
+received by the primary, including requests for the local device, is
+processed by the primary.
+"""
+
+import struct
+import multiprocessing
+
+from .debugging import bacpypes_debugging, ModuleLogger
+
+from .comm import Client, Server, bind
+from .pdu import Address, PDU
+from .bvll import ForwardedNPDU, OriginalBroadcastNPDU, OriginalUnicastNPDU
+from .npdu import NPDU
+from .apdu import UnconfirmedRequestPDU
+from .primitivedata import Tag
+from .app import BIPSimpleApplication
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# unconfirmed service choice -> context tag of the initiating device
+# identifier, None when it is the first application tag
+_steered_services = {
+    0: None,    # iAm
+    1: None,    # iHave
+    2: 1,       # unconfirmedCOVNotification
+    3: 1,       # unconfirmedEventNotification
+    }
+
+#
+#   shard_of
+#
+
+def shard_of(instance, shards):
+    """Return the shard that owns the device with this instance number."""
+    return instance % shards
+
+#
+#   shard_address
+#
+
+def shard_address(address, shard):
+    """Return the address of the shard given the address of the primary."""
+    if not isinstance(address, Address):
+        address = Address(address)
+
+    host, port = address.addrTuple
+    return Address((host, port + shard))
+
+#
+#   initiating_device
+#
+
+@bacpypes_debugging
+def initiating_device(pdu):
+    """Return the instance number of the device that initiated the
+    unconfirmed service in the NPDU, None if it is not steered."""
+    try:
+        npdu = NPDU()
+        npdu.decode(PDU(pdu.pduData))
+        if npdu.npduNetMessage is not None:
+            return None
+
+        # only unconfirmed requests are steered, so check the header before
+        # decoding anything else
+        if (npdu.get() >> 4) != UnconfirmedRequestPDU.pduType:
+            return None
+        service = npdu.get()
+        if service not in _steered_services:
+            return None
+        context = _steered_services[service]
+
+        # look for the device identifier in the first two tags
+        tag = Tag()
+        for i in range(2):
+            tag.decode(npdu)
+            if context is None:
+                if (tag.tagClass == Tag.applicationTagClass) and (tag.tagNumber == Tag.objectIdentifierAppTag):
+                    break
+            elif (tag.tagClass == Tag.contextTagClass) and (tag.tagNumber == context):
+                break
+        else:
+            return None
+
+        if len(tag.tagData) != 4:
+            return None
+
+        return struct.unpack('>L', tag.tagData)[0] & 0x003FFFFF
+
+    except Exception as err:
+        # anything that cannot be decoded is left to the primary
+        if _debug: initiating_device._debug("    - decoding error: %r", err)
+        return None
+
+#
+#   ShardSteering
+#
+#   An instance of this class sits between the BIPSimple and AnnexJCodec
+#   instances of the primary.  Downstream traffic passes through.
+#
+
+@bacpypes_debugging
+class ShardSteering(Client, Server):
+
+    def __init__(self, addresses, fanout=False, cid=None, sid=None):
+        """Steer to the shards at these addresses, the first is the primary."""
+        if _debug: ShardSteering._debug("__init__ %r fanout=%r cid=%r sid=%r", addresses, fanout, cid, sid)
+        Client.__init__(self, cid)
+        Server.__init__(self, sid)
+
+        self.shardAddresses = [addr if isinstance(addr, Address) else Address(addr) for addr in addresses]
+        self.fanout = fanout
+
+    def indication(self, pdu):
+        if _debug: ShardSteering._debug("indication %r", pdu)
+
+        # send it downstream
+        self.request(pdu)
+
+    def confirmation(self, pdu):
+        if _debug: ShardSteering._debug("confirmation %r", pdu)
+
+        # find the real source
+        if isinstance(pdu, ForwardedNPDU):
+            source = pdu.bvlciAddress
+        elif isinstance(pdu, (OriginalUnicastNPDU, OriginalBroadcastNPDU)):
+            source = pdu.pduSource
+        else:
+            self.response(pdu)
+            return
+
+        instance = initiating_device(pdu)
+        if _debug: ShardSteering._debug("    - instance: %r", instance)
+
+        if instance is not None:
+            shard = shard_of(instance, len(self.shardAddresses))
+            if shard:
+                self.forward(pdu, source, shard)
+                return
+
+        elif self.fanout and not isinstance(pdu, OriginalUnicastNPDU):
+            for shard in range(1, len(self.shardAddresses)):
+                self.forward(pdu, source, shard)
+
+        # send it upstream
+        self.response(pdu)
+
+    def forward(self, pdu, source, shard):
+        """Send the NPDU to the shard with the real source."""
+        xpdu = ForwardedNPDU(source, pdu, user_data=pdu.pduUserData)
+        xpdu.pduDestination = self.shardAddresses[shard]
+        if _debug: ShardSteering._debug("    - forward to shard %d: %r", shard, xpdu)
+
+        self.request(xpdu)
+
+#
+#   BIPShardApplication
+#
+
+@bacpypes_debugging
+class BIPShardApplication(BIPSimpleApplication):
+
+    def __init__(self, localDevice, localAddress, shard, shards, fanout=False, deviceInfoCache=None, aseID=None):
+        """The local address is the address of the primary, the other shards
+        bind the port offset by their number and need a local device with
+        their own instance number."""
+        if _debug: BIPShardApplication._debug("__init__ %r %r %r %r fanout=%r deviceInfoCache=%r aseID=%r", localDevice, localAddress, shard, shards, fanout, deviceInfoCache, aseID)
+
+        if not (0 <= shard < shards):
+            raise ValueError("invalid shard")
+
+        self.shard = shard
+        self.shards = shards
+
+        if shard:
+            address = shard_address(localAddress, shard)
+        else:
+            address = localAddress
+        BIPSimpleApplication.__init__(self, localDevice, address, deviceInfoCache, aseID)
+
+        # the primary steers to the other shards
+        if (shard == 0) and (shards > 1):
+            self.steering = ShardSteering([shard_address(self.localAddress, i) for i in range(shards)], fanout)
+            bind(self.bip, self.steering, self.annexj)
+        else:
+            self.steering = None
+
+    def owns(self, instance):
+        """Return true if requests to the device should come from this shard."""
+        return shard_of(instance, self.shards) == self.shard
+
+#
+#   start_shards
+#
+
+@bacpypes_debugging
+def start_shards(shards, target, *args):
+    """Start a process for each shard other than the primary that calls
+    target(shard, *args) to build its application and run the core.  Call
+    this before the primary builds anything that opens a socket or starts
+    the task manager, the processes inherit them."""
+    if _debug: start_shards._debug("start_shards %r %r %r", shards, target, args)
+
+    processes = []
+    for shard in range(1, shards):
+        process = multiprocessing.Process(target=target, args=(shard,) + args, name="shard-%d" % (shard,))
+        process.daemon = True
+        process.start()
+        processes.append(process)
+
+    return processes
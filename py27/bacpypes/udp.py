@@ -5,18 +5,20 @@ UDP Communications Module
 """
 
 import asyncore
+import errno
 import socket
 import cPickle as pickle
-import Queue as queue
 
 from time import time as _time
+from collections import deque
 
 from .debugging import ModuleLogger, bacpypes_debugging
 
-from .core import deferred
+from .core import deferred, dispatcher_changed
 from .task import FunctionTask
 from .comm import PDU, Server
 from .comm import ServiceAccessPoint
+from .metrics import Histogram, TransportMetrics, DEPTH_BOUNDS
 
 # some debugging
 _debug = 0
@@ -41,11 +43,14 @@ class UDPActor:
         # associated with a peer
         self.peer = peer
 
-        # add a timer
+        # add a timer, it is not rescheduled for each PDU, when it fires
+        # it checks the time of the last one
         self.timeout = director.timeout
+        self.lastActivity = _time()
         if self.timeout > 0:
             self.timer = FunctionTask(self.idle_timeout)
-            self.timer.install_task(_time() + self.timeout)
+            self.timer.taskCoarse = True
+            self.timer.install_task(self.lastActivity + self.timeout)
         else:
             self.timer = None
 
@@ -55,25 +60,32 @@ class UDPActor:
     def idle_timeout(self):
         if _debug: UDPActor._debug("idle_timeout")
 
+        # there has been traffic since the timer was installed
+        when = self.lastActivity + self.timeout
+        if when > _time():
+            if _debug: UDPActor._debug("    - still active")
+            self.timer.install_task(when)
+            return
+
         # tell the director this is gone
         self.director.del_actor(self)
 
     def indication(self, pdu):
         if _debug: UDPActor._debug("indication %r", pdu)
 
-        # reschedule the timer
-        if self.timer:
-            self.timer.install_task(_time() + self.timeout)
+        # the timer checks this when it fires
+        self.lastActivity = _time()
 
         # put it in the outbound queue for the director
-        self.director.request.put(pdu)
+        self.director.request.append(pdu)
+        self.director.metrics.queued(len(self.director.request))
+        dispatcher_changed(self.director)
 
     def response(self, pdu):
         if _debug: UDPActor._debug("response %r", pdu)
 
-        # reschedule the timer
-        if self.timer:
-            self.timer.install_task(_time() + self.timeout)
+        # the timer checks this when it fires
+        self.lastActivity = _time()
 
         # process this as a response from the director
         self.director.response(pdu)
@@ -125,8 +137,8 @@ class UDPPickleActor(UDPActor):
 @bacpypes_debugging
 class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
 
-    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None):
-        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r", address, timeout, reuse, actorClass, sid, sapID)
+    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, batch=1, rcvbuf=None, sndbuf=None, sid=None, sapID=None):
+        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r batch=%r rcvbuf=%r sndbuf=%r sid=%r sapID=%r", address, timeout, reuse, actorClass, batch, rcvbuf, sndbuf, sid, sapID)
         Server.__init__(self, sid)
         ServiceAccessPoint.__init__(self, sapID)
 
@@ -141,6 +153,20 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # save the address
         self.address = address
 
+        # the most datagrams read each time the socket is readable, and
+        # how many were read when there can be more than one
+        self.batch = batch
+        self.readBatches = Histogram(DEPTH_BOUNDS)
+
+        # how many datagrams were sent each time the socket was writable,
+        # and how many times the socket buffer was full
+        self.writeBatches = Histogram(DEPTH_BOUNDS)
+        self.writeBlocked = 0
+
+        # count the traffic, there is no recvmsg() to get the number of
+        # dropped datagrams
+        self.metrics = TransportMetrics()
+
         asyncore.dispatcher.__init__(self)
 
         # ask the dispatcher for a socket
@@ -157,8 +183,17 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # allow it to send broadcasts
         self.socket.setsockopt( socket.SOL_SOCKET, socket.SO_BROADCAST, 1 )
 
-        # create the request queue
-        self.request = queue.Queue()
+        # set the buffer sizes, the kernel may adjust them
+        if rcvbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        if sndbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        self.rcvbuf = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        self.sndbuf = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        if _debug: UDPDirector._debug("    - rcvbuf, sndbuf: %r, %r", self.rcvbuf, self.sndbuf)
+
+        # create the request queue, any thread can append to it
+        self.request = deque()
 
         # start with an empty peer pool
         self.peers = {}
@@ -202,12 +237,21 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
     def handle_read(self):
         if _debug: UDPDirector._debug("handle_read")
 
+        metrics = self.metrics
+
+        pdus = []
         try:
-            msg, addr = self.socket.recvfrom(65536)
-            if _debug: UDPDirector._debug("    - received %d octets from %s", len(msg), addr)
+            # the socket does not block, read until there are no more
+            # datagrams or the batch is full
+            while True:
+                msg, addr = self.socket.recvfrom(65536)
+                if _debug: UDPDirector._debug("    - received %d octets from %s", len(msg), addr)
+
+                metrics.received(addr, len(msg))
 
-            # send the PDU up to the client
-            deferred(self._response, PDU(msg, source=addr))
+                pdus.append(PDU(msg, source=addr))
+                if len(pdus) >= self.batch:
+                    break
 
         except socket.timeout as err:
             if _debug: UDPDirector._debug("    - socket timeout: %s", err)
@@ -217,35 +261,65 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
                 pass
             else:
                 if _debug: UDPDirector._debug("    - socket error: %s", err)
+                metrics.error()
 
                 # pass along to a handler
                 self.handle_error(err)
 
+        if self.batch > 1:
+            self.readBatches.record(len(pdus))
+
+        # send the PDUs up to the client
+        if len(pdus) == 1:
+            deferred(self._response, pdus[0])
+        elif pdus:
+            deferred(self._response_batch, pdus)
+
     def writable(self):
         """Return true iff there is a request pending."""
-        return (not self.request.empty())
+        return (len(self.request) != 0)
 
     def handle_write(self):
-        """get a PDU from the queue and send it."""
+        """Send the PDUs in the queue until it is empty or the socket
+        buffer is full."""
         if _debug: UDPDirector._debug("handle_write")
 
-        try:
-            pdu = self.request.get()
+        request = self.request
+        metrics = self.metrics
+        count = 0
+        while request:
+            pdu = request.popleft()
 
-            sent = self.socket.sendto(pdu.pduData, pdu.pduDestination)
-            if _debug: UDPDirector._debug("    - sent %d octets to %s", sent, pdu.pduDestination)
+            try:
+                sent = self.socket.sendto(pdu.pduData, pdu.pduDestination)
+                if _debug: UDPDirector._debug("    - sent %d octets to %s", sent, pdu.pduDestination)
 
-        except socket.error as err:
-            if _debug: UDPDirector._debug("    - socket error: %s", err)
+                metrics.sent(pdu.pduDestination, sent)
+                count += 1
 
-            # get the peer
-            peer = self.peers.get(pdu.pduDestination, None)
-            if peer:
-                # let the actor handle the error
-                peer.handle_error(err)
-            else:
-                # let the director handle the error
-                self.handle_error(err)
+            except socket.error as err:
+                if err.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    if _debug: UDPDirector._debug("    - socket buffer full, %d pending", len(request) + 1)
+
+                    # try again when the socket is writable
+                    request.appendleft(pdu)
+                    self.writeBlocked += 1
+                    break
+
+                if _debug: UDPDirector._debug("    - socket error: %s", err)
+                metrics.error(pdu.pduDestination)
+
+                # get the peer
+                peer = self.peers.get(pdu.pduDestination, None)
+                if peer:
+                    # let the actor handle the error
+                    peer.handle_error(err)
+                else:
+                    # let the director handle the error
+                    self.handle_error(err)
+
+        self.writeBatches.record(count)
+        metrics.queueDepth = len(request)
 
     def close_socket(self):
         """Close the socket."""
@@ -295,3 +369,13 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
 
         # send the message
         peer.response(pdu)
+
+    def _response_batch(self, pdus):
+        """Incoming datagrams read together are routed one at a time."""
+        if _debug: UDPDirector._debug("_response_batch %r", len(pdus))
+
+        for pdu in pdus:
+            try:
+                self._response(pdu)
+            except Exception as err:
+                UDPDirector._exception("response error: %r", err)
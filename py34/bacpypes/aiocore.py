@@ -0,0 +1,310 @@
+#!/usr/bin/python
+
+"""
+asyncio Core
+
+This is an alternative to core.run() that runs the task manager, the
+deferred functions and the asyncore dispatchers (the UDP and TCP directors
+and the task manager trigger) as callbacks of an asyncio event loop, so
+applications can share the loop with other asyncio services or use a
+different event loop implementation.
+"""
+
+import asyncio
+import asyncore
+import time
+
+from threading import get_ident
+
+from . import core
+from .task import TaskManager
+from .debugging import bacpypes_debugging, ModuleLogger
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   AsyncioCore
+#
+
+@bacpypes_debugging
+class AsyncioCore:
+
+    def __init__(self, loop=None, spin=core.SPIN, rescan=core.RESCAN):
+        if _debug: AsyncioCore._debug("__init__ loop=%r spin=%r rescan=%r", loop, spin, rescan)
+
+        # the event loop to run on
+        self.loop = loop or asyncio.get_event_loop()
+        self.spin = spin
+
+        # seconds between checking all of the dispatchers like the
+        # selector loop, None to only check the ones that change
+        self.rescan = rescan
+        self.rescanTime = 0.0
+
+        # the next call to step()
+        self.handle = None
+
+        # true while step() is processing tasks and deferred functions
+        self.stepping = False
+
+        # the asyncore socket map that knows which dispatchers have been
+        # added or removed
+        self.socket_map = None
+
+        # file descriptor -> (dispatcher, readable, writable) registered
+        # with the event loop
+        self.fds = {}
+
+        # dispatchers passed to core.dispatcher_changed(), and true when a
+        # call to update_dispatchers() has been scheduled
+        self.changed = set()
+        self.updatePending = False
+
+        # done when core.stop() is called
+        self.done = None
+
+    def start(self):
+        """Start running and return a future that is done when stop() is
+        called."""
+        if _debug: AsyncioCore._debug("start")
+
+        # reference the task manager (a singleton)
+        core.taskManager = TaskManager()
+
+        # tasks installed by callbacks of the event loop do not need the
+        # trigger, the next pass is scheduled instead
+        trigger = core.taskManager.trigger
+        if trigger:
+            trigger.loopThread = get_ident()
+            trigger.loopWakeup = self.task_changed
+
+        # check all of the dispatchers first, then the ones that change
+        self.socket_map = core._install_socket_map()
+        self.socket_map.changed.update(self.socket_map)
+        core.dispatcherWatcher = self
+
+        core.running = True
+        self.done = asyncio.Future(loop=self.loop)
+
+        # make the first pass as soon as the loop is running
+        self.handle = self.loop.call_soon(self.step)
+
+        return self.done
+
+    def close(self):
+        """Stop watching the dispatchers and finish the future."""
+        if _debug: AsyncioCore._debug("close")
+
+        core.running = False
+        if core.dispatcherWatcher is self:
+            core.dispatcherWatcher = None
+
+        trigger = core.taskManager and core.taskManager.trigger
+        if trigger and (trigger.loopWakeup == self.task_changed):
+            trigger.loopThread = None
+            trigger.loopWakeup = None
+
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+
+        for fd, (obj, readable, writable) in self.fds.items():
+            if readable:
+                self.loop.remove_reader(fd)
+            if writable:
+                self.loop.remove_writer(fd)
+        self.fds = {}
+
+        if self.done and not self.done.done():
+            self.done.set_result(None)
+
+    def wakeup(self):
+        """Make the next pass as soon as possible."""
+        if self.handle:
+            self.handle.cancel()
+        self.handle = self.loop.call_soon(self.step)
+
+    def task_changed(self):
+        """Called by the trigger when a task is installed or suspended by the
+        thread running the event loop."""
+        if not self.stepping:
+            self.wakeup()
+
+    def step(self):
+        """Process the next task and the deferred functions just like a pass
+        through the core.run() loop, then wait for socket activity."""
+        self.handle = None
+
+        metrics = core.loopMetrics
+        if metrics:
+            start = time.time()
+
+        # get the next task
+        task, delta = core.taskManager.get_next_task()
+
+        self.stepping = True
+        try:
+            # if there is a task to process, do it
+            if task:
+                core.taskManager.process_task(task)
+
+            # check for deferred functions, including the ones they defer
+            deferredFns = core.deferredFns
+            if metrics:
+                metrics.deferred.record(len(deferredFns))
+            while deferredFns:
+                fn, args, kwargs = deferredFns.popleft()
+                fn(*args, **kwargs)
+
+        except KeyboardInterrupt:
+            if _debug: AsyncioCore._info("keyboard interrupt")
+            core.running = False
+        except Exception as err:
+            if _debug: AsyncioCore._exception("an error has occurred: %s", err)
+
+        self.stepping = False
+
+        # they may have installed a task that is sooner
+        when, nxttask = core.taskManager.peek_task()
+        if nxttask:
+            delta = max(when - core.taskManager.get_time(), 0.0)
+
+        # the socket activity is in the callbacks of the event loop
+        if metrics:
+            metrics.iterations.record(time.time() - start)
+
+        if not core.running:
+            self.close()
+            return
+
+        # dispatchers may have been added, closed or have something to write
+        self.update_dispatchers()
+
+        # if delta is None, there are no tasks, wait for the trigger or
+        # default to spinning when there isn't one
+        if (delta is None) and not core.taskManager.trigger:
+            delta = self.spin
+
+        # the wait is not longer than the time until the next check
+        if self.rescan is not None:
+            next_rescan = max(self.rescanTime + self.rescan - time.time(), 0.0)
+            if (delta is None) or (delta > next_rescan):
+                delta = next_rescan
+
+        if delta is not None:
+            self.handle = self.loop.call_later(delta, self.step)
+
+    def dispatcher_changed(self, obj):
+        """Called by core.dispatcher_changed(), for example when a callback
+        or coroutine of the event loop or another thread queues a PDU."""
+        self.changed.add(obj)
+
+        # added before the flag is checked, so update_dispatchers() sees it
+        if not self.updatePending:
+            self.updatePending = True
+            self.loop.call_soon_threadsafe(self.update_dispatchers)
+
+    def update_dispatchers(self):
+        """Watch the file descriptors of the dispatchers that have been
+        added, removed or changed, and now and then all of them."""
+        self.updatePending = False
+        socket_map = self.socket_map
+
+        # dispatchers that have been added or removed, taken one at a time
+        # because other threads may be adding to the sets
+        changed = socket_map.changed
+        while changed:
+            self.update(changed.pop())
+
+        # dispatchers passed to core.dispatcher_changed()
+        changed = self.changed
+        while changed:
+            obj = changed.pop()
+            fd = getattr(obj, '_fileno', None)
+            if socket_map.get(fd, None) is obj:
+                self.update(fd)
+
+        # now and then check all of them
+        if self.rescan is not None:
+            now = time.time()
+            if now - self.rescanTime >= self.rescan:
+                self.rescanTime = now
+                for fd in list(socket_map):
+                    self.update(fd)
+
+    def update(self, fd):
+        """Register the interest of the dispatcher with the file descriptor
+        if it has changed."""
+        obj = self.socket_map.get(fd, None)
+
+        readable = writable = False
+        if obj is not None:
+            readable = bool(obj.readable())
+            # accepting sockets should not be writable
+            writable = bool(obj.writable()) and not obj.accepting
+
+        old_obj, was_readable, was_writable = self.fds.get(fd, (None, False, False))
+        if (obj is old_obj) and (readable == was_readable) and (writable == was_writable):
+            return
+
+        # the file descriptor may have been reused
+        if obj is not old_obj:
+            if was_readable:
+                self.loop.remove_reader(fd)
+            if was_writable:
+                self.loop.remove_writer(fd)
+            was_readable = was_writable = False
+
+        if readable != was_readable:
+            if readable:
+                self.loop.add_reader(fd, self.handle_read, obj)
+            else:
+                self.loop.remove_reader(fd)
+        if writable != was_writable:
+            if writable:
+                self.loop.add_writer(fd, self.handle_write, obj)
+            else:
+                self.loop.remove_writer(fd)
+
+        if readable or writable:
+            self.fds[fd] = (obj, readable, writable)
+        else:
+            self.fds.pop(fd, None)
+
+    def handle_read(self, obj):
+        fd = obj._fileno
+        asyncore.read(obj)
+
+        # the event may have changed its interest
+        self.update(fd)
+        self.wakeup()
+
+    def handle_write(self, obj):
+        fd = obj._fileno
+        asyncore.write(obj)
+
+        # the event may have changed its interest
+        self.update(fd)
+        self.wakeup()
+
+#
+#   run
+#
+
+@bacpypes_debugging
+def run(spin=core.SPIN, sigterm=core.stop, sigusr1=core.print_stack, loop=None, rescan=core.RESCAN):
+    """Run on an asyncio event loop until core.stop() is called."""
+    if _debug: run._debug("run spin=%r sigterm=%r, sigusr1=%r loop=%r rescan=%r", spin, sigterm, sigusr1, loop, rescan)
+
+    # install the signal handlers
+    core.install_signal_handlers(sigterm, sigusr1)
+
+    runner = AsyncioCore(loop, spin, rescan)
+    try:
+        runner.loop.run_until_complete(runner.start())
+    except KeyboardInterrupt:
+        if _debug: run._info("keyboard interrupt")
+    finally:
+        runner.close()
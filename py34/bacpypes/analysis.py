@@ -133,9 +133,10 @@ def decode_udp(s):
 #
 
 @bacpypes_debugging
-def decode_packet(data):
-    """decode the data, return some kind of PDU."""
-    if _debug: decode_packet._debug("decode_packet %r", data)
+def decode_packet(data, lazy=False):
+    """decode the data, return some kind of PDU.  When lazy is true the
+    parameters of a service are decoded when they are referenced."""
+    if _debug: decode_packet._debug("decode_packet %r lazy=%r", data, lazy)
 
     # empty strings are some other kind of pcap content
     if not data:
@@ -314,7 +315,10 @@ def decode_packet(data):
             if atype:
                 xpdu = apdu
                 apdu = atype()
-                apdu.decode(xpdu)
+                if lazy:
+                    apdu.lazy_decode(xpdu)
+                else:
+                    apdu.decode(xpdu)
         except Exception as err:
             if _debug: decode_packet._debug("    - decoding error: %r", err)
             return xpdu
@@ -347,9 +351,9 @@ def decode_packet(data):
 #
 
 @bacpypes_debugging
-def decode_file(fname):
+def decode_file(fname, lazy=False):
     """Given the name of a pcap file, open it, decode the contents and yield each packet."""
-    if _debug: decode_file._debug("decode_file %r", fname)
+    if _debug: decode_file._debug("decode_file %r lazy=%r", fname, lazy)
 
     if not pcap:
         raise RuntimeError("failed to import pcap")
@@ -367,7 +371,7 @@ def decode_file(fname):
 
         # returns a tuple
         pktlen, data, timestamp = pkt
-        pkt = decode_packet(data)
+        pkt = decode_packet(data, lazy)
         if not pkt:
             continue
 
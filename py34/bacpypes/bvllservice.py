@@ -57,8 +57,8 @@ class _MultiplexServer(Server):
 @bacpypes_debugging
 class UDPMultiplexer:
 
-    def __init__(self, addr=None, noBroadcast=False):
-        if _debug: UDPMultiplexer._debug("__init__ %r noBroadcast=%r", addr, noBroadcast)
+    def __init__(self, addr=None, noBroadcast=False, batch=1, pool=None, rcvbuf=None, sndbuf=None):
+        if _debug: UDPMultiplexer._debug("__init__ %r noBroadcast=%r batch=%r pool=%r rcvbuf=%r sndbuf=%r", addr, noBroadcast, batch, pool, rcvbuf, sndbuf)
 
         # check for some options
         specialBroadcast = False
@@ -93,13 +93,13 @@ class UDPMultiplexer:
 
         # create and bind the direct address
         self.direct = _MultiplexClient(self)
-        self.directPort = UDPDirector(self.addrTuple)
+        self.directPort = UDPDirector(self.addrTuple, batch=batch, pool=pool, rcvbuf=rcvbuf, sndbuf=sndbuf)
         bind(self.direct, self.directPort)
 
         # create and bind the broadcast address for non-Windows
         if specialBroadcast and (not noBroadcast) and sys.platform in ('linux', 'darwin'):
             self.broadcast = _MultiplexClient(self)
-            self.broadcastPort = UDPDirector(self.addrBroadcastTuple, reuse=True)
+            self.broadcastPort = UDPDirector(self.addrBroadcastTuple, reuse=True, batch=batch, pool=pool, rcvbuf=rcvbuf, sndbuf=sndbuf)
             bind(self.direct, self.broadcastPort)
         else:
             self.broadcast = None
@@ -158,12 +158,12 @@ class UDPMultiplexer:
             raise RuntimeError("confirmation mismatch")
 
         # must have at least one octet
-        if not pdu.pduData:
+        if not pdu.remaining():
             if _debug: UDPMultiplexer._debug("    - no data")
             return
 
-        # extract the first octet
-        msg_type = pdu.pduData[0]
+        # look at the first octet, the data may be a receive buffer
+        msg_type = pdu.peek()
 
         # check for the message type
         if msg_type == 0x01:
@@ -381,7 +381,7 @@ class BIPSimple(BIPSAP, Client, Server):
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             # build a vanilla PDU
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it upstream
@@ -389,7 +389,7 @@ class BIPSimple(BIPSAP, Client, Server):
 
         elif isinstance(pdu, OriginalBroadcastNPDU):
             # build a PDU with a local broadcast address
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it upstream
@@ -397,7 +397,7 @@ class BIPSimple(BIPSAP, Client, Server):
 
         elif isinstance(pdu, ForwardedNPDU):
             # build a PDU with the source from the real source
-            xpdu = PDU(pdu.pduData, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it upstream
@@ -508,14 +508,14 @@ class BIPForeign(BIPSAP, Client, Server, OneShotTask, DebugContents):
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             # build a vanilla PDU
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
 
             # send it upstream
             self.response(xpdu)
 
         elif isinstance(pdu, ForwardedNPDU):
             # build a PDU with the source from the real source
-            xpdu = PDU(pdu.pduData, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
 
             # send it upstream
             self.response(xpdu)
@@ -660,7 +660,7 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
 
         elif isinstance(pdu, ForwardedNPDU):
             # build a PDU with the source from the real source
-            xpdu = PDU(pdu.pduData, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - upstream xpdu: %r", xpdu)
 
             # send it upstream
@@ -719,7 +719,7 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
 
         elif isinstance(pdu, DistributeBroadcastToNetwork):
             # build a PDU with a local broadcast address
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - upstream xpdu: %r", xpdu)
 
             # send it upstream
@@ -749,7 +749,7 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             # build a vanilla PDU
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - upstream xpdu: %r", xpdu)
 
             # send it upstream
@@ -757,7 +757,7 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
 
         elif isinstance(pdu, OriginalBroadcastNPDU):
             # build a PDU with a local broadcast address
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(pdu, source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - upstream xpdu: %r", xpdu)
 
             # send it upstream
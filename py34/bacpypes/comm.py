@@ -19,6 +19,10 @@ _log = ModuleLogger(globals())
 _short_mask = 0xFFFF
 _long_mask = 0xFFFFFFFF
 
+# unpack short/long values in place
+_short_struct = struct.Struct('>H')
+_long_struct = struct.Struct('>L')
+
 # maps of named clients and servers
 client_map = {}
 server_map = {}
@@ -28,12 +32,29 @@ service_map = {}
 element_map = {}
 
 
+#
+#   PDUSlots
+#
+#   The PCI and PDUData classes are mixed together in the PDU classes of
+#   each layer, and only one of the bases of a class can add slots, so the
+#   attributes of both of them are slots of this class.  The PDU classes do
+#   not have slots, a dictionary is created for other attributes when one
+#   is set.
+#
+
+class PDUSlots(object):
+
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination',
+        '_pduData', '_pduOffset', '_pduRoom', '_pduShared')
+
 #
 #   PCI
 #
 
 @bacpypes_debugging
-class PCI(DebugContents):
+class PCI(PDUSlots, DebugContents):
+
+    __slots__ = ()
 
     _debug_contents = ('pduUserData+', 'pduSource', 'pduDestination')
 
@@ -96,9 +117,24 @@ class PCI(DebugContents):
 #
 #   PDUData
 #
+#   The packet data is kept in a buffer with a read cursor, the get*()
+#   functions advance the cursor rather than deleting octets from the front
+#   of the buffer, so decoding a packet is linear in its length.  The unread
+#   part is only sliced out when the pduData attribute is referenced.
+#
+#   When encoding, room can be reserved in front of the data so the lower
+#   layers can write their headers into the same buffer with put_pdu()
+#   rather than copying the contents into a new one.  A buffer shared with
+#   another PDU is copied before it is appended to.
+#
+#   The data can also be a memoryview of a receive buffer, it is read in
+#   place and copied before it is changed or the pduData is referenced.
+#
 
 @bacpypes_debugging
-class PDUData(object):
+class PDUData(PDUSlots):
+
+    __slots__ = ()
 
     def __init__(self, data=None, *args, **kwargs):
         if _debug: PDUData._debug("__init__ %r %r %r", data, args, kwargs)
@@ -112,57 +148,176 @@ class PDUData(object):
             self.pduData = bytearray()
         elif isinstance(data, (bytes, bytearray)):
             self.pduData = bytearray(data)
+        elif isinstance(data, memoryview):
+            self.pduData = data
         elif isinstance(data, PDUData) or isinstance(data, PDU):
-            self.pduData = _copy(data.pduData)
+            self.pduData = bytearray()
+            self.put_pdu(data)
         else:
             raise TypeError("bytes or bytearray expected")
 
+    def _get_pdu_data(self):
+        # slice off what has already been decoded or make a private copy
+        if self._pduOffset or self._pduShared:
+            self._unshare()
+
+        return self._pduData
+
+    def _set_pdu_data(self, data):
+        self._pduData = data
+        self._pduOffset = 0
+        self._pduRoom = 0
+
+        # immutable data and views are copied before they are changed
+        self._pduShared = isinstance(data, (bytes, memoryview))
+
+    pduData = property(_get_pdu_data, _set_pdu_data)
+
+    def remaining(self):
+        """Return the number of octets that have not been decoded."""
+        return len(self._pduData) - self._pduOffset
+
     def get(self):
-        if len(self.pduData) == 0:
+        offset = self._pduOffset
+        if offset >= len(self._pduData):
             raise DecodingError("no more packet data")
 
-        octet = self.pduData[0]
-        del self.pduData[0]
+        self._pduOffset = offset + 1
 
-        return octet
+        return self._pduData[offset]
 
     def get_data(self, dlen):
-        if len(self.pduData) < dlen:
+        offset = self._pduOffset
+        if len(self._pduData) - offset < dlen:
             raise DecodingError("no more packet data")
 
-        data = self.pduData[:dlen]
-        del self.pduData[:dlen]
+        data = self._pduData[offset:offset + dlen]
+        self._pduOffset = offset + dlen
+
+        # do not keep a receive buffer after decoding
+        if isinstance(data, memoryview):
+            data = bytearray(data)
 
         return data
 
+    def peek(self):
+        """Return the next octet without decoding it."""
+        offset = self._pduOffset
+        if offset >= len(self._pduData):
+            raise DecodingError("no more packet data")
+
+        return self._pduData[offset]
+
     def get_short(self):
-        return struct.unpack('>H',self.get_data(2))[0]
+        offset = self._pduOffset
+        if len(self._pduData) - offset < 2:
+            raise DecodingError("no more packet data")
+
+        self._pduOffset = offset + 2
+
+        return _short_struct.unpack_from(self._pduData, offset)[0]
 
     def get_long(self):
-        return struct.unpack('>L',self.get_data(4))[0]
+        offset = self._pduOffset
+        if len(self._pduData) - offset < 4:
+            raise DecodingError("no more packet data")
+
+        self._pduOffset = offset + 4
+
+        return _long_struct.unpack_from(self._pduData, offset)[0]
+
+    def take_data(self, pdu):
+        """Take the rest of the packet data from the PDU, sharing its buffer
+        and cursor rather than copying the contents."""
+        self._pduData = pdu._pduData
+        self._pduOffset = pdu._pduOffset
+        self._pduRoom = pdu._pduRoom
+        self._pduShared = pdu._pduShared
+
+        # the other PDU has been completely decoded
+        pdu.pduData = bytearray()
+
+    def copy_view(self):
+        """Copy the data if it is a view of a receive buffer, so the PDU
+        can be kept after the buffer is returned to its pool."""
+        if isinstance(self._pduData, memoryview):
+            self._unshare()
+
+    def reserve(self, n):
+        """Reserve room for n octets of headers in front of the data."""
+        if self._pduRoom >= n:
+            return
+
+        self._pduData = bytearray(n) + self._pduData[self._pduOffset:]
+        self._pduOffset = self._pduRoom = n
+        self._pduShared = False
+
+    def _unshare(self):
+        # copy the data before changing a buffer another PDU references
+        self._pduData = bytearray(memoryview(self._pduData)[self._pduOffset:])
+        self._pduOffset = 0
+        self._pduRoom = 0
+        self._pduShared = False
 
     def put(self, n):
+        if self._pduShared:
+            self._unshare()
+
         # pduData is a bytearray
-        self.pduData += bytes([n])
+        self._pduData.append(n)
 
     def put_data(self, data):
         if isinstance(data, bytes):
             pass
         elif isinstance(data, bytearray):
             pass
+        elif isinstance(data, memoryview):
+            pass
         elif isinstance(data, list):
             data = bytes(data)
         else:
             raise TypeError("data must be bytes, bytearray, or a list")
 
+        if self._pduShared:
+            self._unshare()
+
         # regular append works
-        self.pduData += data
+        self._pduData += data
 
     def put_short(self, n):
-        self.pduData += struct.pack('>H',n & _short_mask)
+        if self._pduShared:
+            self._unshare()
+
+        self._pduData += _short_struct.pack(n & _short_mask)
 
     def put_long(self, n):
-        self.pduData += struct.pack('>L',n & _long_mask)
+        if self._pduShared:
+            self._unshare()
+
+        self._pduData += _long_struct.pack(n & _long_mask)
+
+    def put_pdu(self, pdu):
+        """Append the rest of the data of the PDU.  When what is already here
+        fits in the room reserved in front of the PDU data it is written there
+        and the buffer is shared, so the contents are not copied."""
+        header = self._pduData[self._pduOffset:]
+        hlen = len(header)
+
+        # not enough room, copy the contents
+        if hlen > pdu._pduRoom:
+            self.put_data(pdu._pduData[pdu._pduOffset:])
+            return
+
+        offset = pdu._pduOffset - hlen
+        if hlen:
+            pdu._pduData[offset:pdu._pduOffset] = header
+
+        # share the buffer, the room now belongs to this PDU
+        self._pduData = pdu._pduData
+        self._pduOffset = offset
+        self._pduRoom = pdu._pduRoom - hlen
+        self._pduShared = pdu._pduShared = True
+        pdu._pduRoom = 0
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         if isinstance(self.pduData, bytearray):
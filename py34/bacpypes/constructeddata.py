@@ -11,7 +11,7 @@ from .errors import DecodingError, \
 from .debugging import ModuleLogger, bacpypes_debugging
 
 from .primitivedata import Atomic, ClosingTag, OpeningTag, Tag, TagList, \
-    Unsigned
+    Unsigned, cached_tag, _tag_cache_classes
 
 # some debugging
 _debug = 0
@@ -80,6 +80,11 @@ class Sequence(object):
         if _debug: Sequence._debug("encode %r", taglist)
         global _sequence_of_classes
 
+        # use the codec if one has been built
+        codec = _codec_map.get(self.__class__)
+        if codec:
+            return codec[0](self, taglist)
+
         # make sure we're dealing with a tag list
         if not isinstance(taglist, TagList):
             raise TypeError("TagList expected")
@@ -136,6 +141,11 @@ class Sequence(object):
     def decode(self, taglist):
         if _debug: Sequence._debug("decode %r", taglist)
 
+        # use the codec if one has been built
+        codec = _codec_map.get(self.__class__)
+        if codec:
+            return codec[1](self, taglist)
+
         # make sure we're dealing with a tag list
         if not isinstance(taglist, TagList):
             raise TypeError("TagList expected")
@@ -259,7 +269,7 @@ class Sequence(object):
                     # make a backup of the tag list in case the structure manages to
                     # decode some content but not all of it.  This is not supposed to
                     # happen if the ASN.1 has been formed correctly.
-                    backup = taglist.tagList[:]
+                    backup = taglist.save_state()
 
                     # build a value and decode it
                     value = element.klass()
@@ -275,7 +285,7 @@ class Sequence(object):
                         setattr(self, element.name, None)
 
                         # restore the backup
-                        taglist.tagList = backup
+                        taglist.restore_state(backup)
                     else:
                         raise
 
@@ -408,6 +418,12 @@ def SequenceOf(klass):
 
         def encode(self, taglist):
             if _debug: _SequenceOf._debug("(%r)encode %r", self.__class__.__name__, taglist)
+
+            # use the codec if one has been built
+            codec = _codec_map.get(self.__class__)
+            if codec:
+                return codec[0](self, taglist)
+
             for value in self.value:
                 if issubclass(self.subtype, (Atomic, AnyAtomic)):
                     # a helper cooperates between the atomic value and the tag
@@ -428,6 +444,11 @@ def SequenceOf(klass):
         def decode(self, taglist):
             if _debug: _SequenceOf._debug("(%r)decode %r", self.__class__.__name__, taglist)
 
+            # use the codec if one has been built
+            codec = _codec_map.get(self.__class__)
+            if codec:
+                return codec[1](self, taglist)
+
             while len(taglist) != 0:
                 tag = taglist.Peek()
                 if tag.tagClass == Tag.closingTagClass:
@@ -803,6 +824,11 @@ class Choice(object):
     def encode(self, taglist):
         if _debug: Choice._debug("(%r)encode %r", self.__class__.__name__, taglist)
 
+        # use the codec if one has been built
+        codec = _codec_map.get(self.__class__)
+        if codec:
+            return codec[0](self, taglist)
+
         for element in self.choiceElements:
             value = getattr(self, element.name, None)
             if value is None:
@@ -845,6 +871,11 @@ class Choice(object):
     def decode(self, taglist):
         if _debug: Choice._debug("(%r)decode %r", self.__class__.__name__, taglist)
 
+        # use the codec if one has been built
+        codec = _codec_map.get(self.__class__)
+        if codec:
+            return codec[1](self, taglist)
+
         # peek at the element
         tag = taglist.Peek()
         if tag is None:
@@ -987,6 +1018,402 @@ class Choice(object):
         # return what we built/updated
         return use_dict
 
+#
+#   Codecs
+#
+#   The encode() and decode() functions of Sequence, Choice and SequenceOf
+#   interpret the elements each time they are called.  A codec is a pair of
+#   functions built once for a specific class with the kind of each element,
+#   its tags and its name already worked out.  Classes without a codec, or
+#   with elements the compiler does not handle, are interpreted.
+#
+
+_codec_map = {}
+
+def _sequence_encoder(cls, element):
+    """Return a function that encodes one element of a sequence."""
+    name = element.name
+    klass = element.klass
+    context = element.context
+    optional = element.optional
+    missing = "%s is a missing required element of %s" % (name, cls.__name__)
+
+    if klass in _sequence_of_classes:
+        def encode_element(obj, taglist):
+            value = getattr(obj, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+
+            if context is not None:
+                taglist.append(OpeningTag(context))
+            klass(value).encode(taglist)
+            if context is not None:
+                taglist.append(ClosingTag(context))
+
+    elif issubclass(klass, _tag_cache_classes):
+        def encode_element(obj, taglist):
+            value = getattr(obj, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+
+            taglist.append(cached_tag(klass, value, context))
+
+    elif issubclass(klass, (Atomic, AnyAtomic)):
+        def encode_element(obj, taglist):
+            value = getattr(obj, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+
+            tag = Tag()
+            klass(value).encode(tag)
+            if context is not None:
+                tag = tag.app_to_context(context)
+            taglist.append(tag)
+
+    else:
+        def encode_element(obj, taglist):
+            value = getattr(obj, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+            if not isinstance(value, klass):
+                raise TypeError("%s must be of type %s" % (name, klass.__name__))
+
+            if context is not None:
+                taglist.append(OpeningTag(context))
+            value.encode(taglist)
+            if context is not None:
+                taglist.append(ClosingTag(context))
+
+    return encode_element
+
+def _sequence_decoder(cls, element):
+    """Return a function that decodes one element of a sequence, it is
+    called with the next tag which is not a closing tag."""
+    name = element.name
+    klass = element.klass
+    context = element.context
+    optional = element.optional
+
+    if klass in _sequence_of_classes:
+        def decode_element(obj, taglist, tag):
+            if context is not None:
+                if tag.tagClass != Tag.openingTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise MissingRequiredParameter("%s expected opening tag %d" % (name, context))
+                    setattr(obj, name, [])
+                    return
+                taglist.Pop()
+
+            helper = klass()
+            helper.decode(taglist)
+            setattr(obj, name, helper.value)
+
+            if context is not None:
+                tag = taglist.Pop()
+                if tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                    raise InvalidTag("%s expected closing tag %d" % (name, context))
+
+    elif issubclass(klass, (Atomic, AnyAtomic)):
+        is_atomic = issubclass(klass, Atomic)
+
+        def decode_element(obj, taglist, tag):
+            if context is not None:
+                if tag.tagClass != Tag.contextTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected context tag %d" % (name, context))
+                    setattr(obj, name, None)
+                    return
+                tag = tag.context_to_app(klass._app_tag)
+            elif tag.tagClass != Tag.applicationTagClass or (is_atomic and tag.tagNumber != klass._app_tag):
+                if not optional:
+                    if is_atomic:
+                        raise InvalidParameterDatatype("%s expected application tag %s" % (name, Tag._app_tag_name[klass._app_tag]))
+                    raise InvalidParameterDatatype("%s expected application tag" % (name,))
+                setattr(obj, name, None)
+                return
+
+            taglist.Pop()
+            setattr(obj, name, klass(tag).value)
+
+    else:
+        def decode_element(obj, taglist, tag):
+            if context is not None:
+                if tag.tagClass != Tag.openingTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected opening tag %d" % (name, context))
+                    setattr(obj, name, None)
+                    return
+                taglist.Pop()
+
+            # see Sequence.decode() for the backup
+            backup = taglist.save_state()
+            try:
+                value = klass()
+                value.decode(taglist)
+                setattr(obj, name, value)
+            except (DecodingError, InvalidTag):
+                if context is None and optional:
+                    setattr(obj, name, None)
+                    taglist.restore_state(backup)
+                else:
+                    raise
+
+            if context is not None:
+                tag = taglist.Pop()
+                if (not tag) or tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                    raise InvalidTag("%s expected closing tag %d" % (name, context))
+
+    return decode_element
+
+@bacpypes_debugging
+def _compile_sequence(cls):
+    if _debug: _compile_sequence._debug("_compile_sequence %r", cls)
+
+    encoders = []
+    decoders = []
+    for element in cls.sequenceElements:
+        encoders.append(_sequence_encoder(cls, element))
+        decoders.append((
+            element.name,
+            element.optional,
+            element.klass in _sequence_of_classes,
+            "%s is a missing required element of %s" % (element.name, cls.__name__),
+            _sequence_decoder(cls, element),
+            ))
+
+    def encode(obj, taglist):
+        if not isinstance(taglist, TagList):
+            raise TypeError("TagList expected")
+
+        for encode_element in encoders:
+            encode_element(obj, taglist)
+
+    def decode(obj, taglist):
+        if not isinstance(taglist, TagList):
+            raise TypeError("TagList expected")
+
+        for name, optional, is_list, missing, decode_element in decoders:
+            tag = taglist.Peek()
+
+            # no more elements
+            if tag is None:
+                if optional:
+                    setattr(obj, name, None)
+                elif is_list:
+                    setattr(obj, name, [])
+                else:
+                    raise MissingRequiredParameter(missing)
+
+            # we have been enclosed in a context
+            elif tag.tagClass == Tag.closingTagClass:
+                if not optional:
+                    raise MissingRequiredParameter(missing)
+                setattr(obj, name, None)
+
+            else:
+                decode_element(obj, taglist, tag)
+
+    return encode, decode
+
+@bacpypes_debugging
+def _compile_choice(cls):
+    if _debug: _compile_choice._debug("_compile_choice %r", cls)
+
+    missing = "missing choice of %s" % (cls.__name__,)
+    names = [element.name for element in cls.choiceElements]
+
+    encoders = []
+    decoders = {}
+    for element in cls.choiceElements:
+        name = element.name
+        klass = element.klass
+        context = element.context
+
+        if issubclass(klass, (Atomic, AnyAtomic)):
+            encoders.append((name, klass, context, True, issubclass(klass, _tag_cache_classes)))
+
+            # the first element that matches the tag is the choice
+            if context is not None:
+                key = (Tag.contextTagClass, context)
+            elif hasattr(klass, '_app_tag'):
+                key = (Tag.applicationTagClass, klass._app_tag)
+            else:
+                if _debug: _compile_choice._debug("    - no application tag: %r", name)
+                return None
+
+            def decode_element(taglist, tag, klass=klass, context=context):
+                if context is not None:
+                    tag = tag.context_to_app(klass._app_tag)
+                taglist.Pop()
+                return klass(tag).value
+
+        else:
+            encoders.append((name, klass, context, False, False))
+
+            if context is None:
+                if _debug: _compile_choice._debug("    - not context encoded: %r", name)
+                return None
+
+            if klass in _sequence_of_classes:
+                key = (Tag.contextTagClass, context)
+
+                def decode_element(taglist, tag, name=name, klass=klass, context=context):
+                    taglist.Pop()
+                    helper = klass()
+                    helper.decode(taglist)
+
+                    tag = taglist.Pop()
+                    if tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                        raise InvalidTag("%s expected closing tag %d" % (name, context))
+                    return helper.value
+
+            else:
+                key = (Tag.openingTagClass, context)
+
+                def decode_element(taglist, tag, name=name, klass=klass, context=context):
+                    taglist.Pop()
+                    value = klass()
+                    value.decode(taglist)
+
+                    tag = taglist.Pop()
+                    if tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                        raise InvalidTag("%s expected closing tag %d" % (name, context))
+                    return value
+
+        if key not in decoders:
+            decoders[key] = (name, decode_element)
+
+    def encode(obj, taglist):
+        for name, klass, context, is_atomic, is_cached in encoders:
+            value = getattr(obj, name, None)
+            if value is None:
+                continue
+
+            if is_cached:
+                taglist.append(cached_tag(klass, value, context))
+            elif is_atomic:
+                tag = Tag()
+                klass(value).encode(tag)
+                if context is not None:
+                    tag = tag.app_to_context(context)
+                taglist.append(tag)
+            elif isinstance(value, klass):
+                if context is not None:
+                    taglist.append(OpeningTag(context))
+                value.encode(taglist)
+                if context is not None:
+                    taglist.append(ClosingTag(context))
+            else:
+                raise TypeError("%s must be a %s" % (name, klass.__name__))
+            break
+        else:
+            raise AttributeError(missing)
+
+    def decode(obj, taglist):
+        tag = taglist.Peek()
+        if tag is None:
+            raise AttributeError(missing)
+
+        try:
+            name, decode_element = decoders[(tag.tagClass, tag.tagNumber)]
+        except KeyError:
+            raise AttributeError(missing)
+        value = decode_element(taglist, tag)
+
+        # save the value and None everywhere else
+        for element_name in names:
+            setattr(obj, element_name, None)
+        setattr(obj, name, value)
+
+    return encode, decode
+
+@bacpypes_debugging
+def _compile_sequence_of(cls):
+    if _debug: _compile_sequence_of._debug("_compile_sequence_of %r", cls)
+
+    subtype = cls.subtype
+
+    if issubclass(subtype, (Atomic, AnyAtomic)):
+        if issubclass(subtype, _tag_cache_classes):
+            def encode(obj, taglist):
+                for value in obj.value:
+                    taglist.append(cached_tag(subtype, value))
+        else:
+            def encode(obj, taglist):
+                for value in obj.value:
+                    tag = Tag()
+                    subtype(value).encode(tag)
+                    taglist.append(tag)
+
+        def decode(obj, taglist):
+            append = obj.value.append
+            while len(taglist) != 0:
+                tag = taglist.Peek()
+                if tag.tagClass == Tag.closingTagClass:
+                    return
+                taglist.Pop()
+                append(subtype(tag).value)
+
+    else:
+        def encode(obj, taglist):
+            for value in obj.value:
+                if not isinstance(value, subtype):
+                    raise TypeError("%s must be a %s" % (value, subtype.__name__))
+                value.encode(taglist)
+
+        def decode(obj, taglist):
+            append = obj.value.append
+            while len(taglist) != 0:
+                tag = taglist.Peek()
+                if tag.tagClass == Tag.closingTagClass:
+                    return
+                value = subtype()
+                value.decode(taglist)
+                append(value)
+
+    return encode, decode
+
+@bacpypes_debugging
+def compile_codec(cls):
+    """Build the codec for a Sequence, Choice or SequenceOf class, and for
+    the classes of its elements."""
+    if _debug: compile_codec._debug("compile_codec %r", cls)
+
+    # built or being built
+    if cls in _codec_map:
+        return _codec_map[cls]
+    _codec_map[cls] = None
+
+    if cls in _sequence_of_classes:
+        element_classes = [cls.subtype]
+        codec = _compile_sequence_of(cls)
+    elif issubclass(cls, Sequence):
+        element_classes = [element.klass for element in cls.sequenceElements]
+        codec = _compile_sequence(cls)
+    elif issubclass(cls, Choice):
+        element_classes = [element.klass for element in cls.choiceElements]
+        codec = _compile_choice(cls)
+    else:
+        return None
+    if _debug: compile_codec._debug("    - codec: %r", codec)
+
+    _codec_map[cls] = codec
+
+    # the elements have their own
+    for klass in element_classes:
+        if (klass in _sequence_of_classes) or issubclass(klass, (Sequence, Choice)):
+            compile_codec(klass)
+
+    return codec
+
 #
 #   Any
 #
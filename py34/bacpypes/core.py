@@ -6,13 +6,18 @@ Core
 
 import sys
 import asyncore
+import selectors
 import signal
 import threading
 import time
 import traceback
 import warnings
 
+from collections import deque
+from threading import get_ident
+
 from .task import TaskManager
+from .metrics import LoopMetrics
 from .debugging import bacpypes_debugging, ModuleLogger
 
 # some debugging
@@ -22,9 +27,21 @@ _log = ModuleLogger(globals())
 # globals
 running = False
 taskManager = None
-deferredFns = []
 sleeptime = 0.0
 
+# functions called by the loop, appended by any thread
+deferredFns = deque()
+
+# updated by the loop when metrics are enabled
+loopMetrics = None
+
+# watches the dispatchers when selectors are enabled
+selectorLoop = None
+
+# has a dispatcher_changed() method called by dispatcher_changed(), the
+# selector loop or the asyncio runner
+dispatcherWatcher = None
+
 #
 #   stop
 #
@@ -42,10 +59,11 @@ def stop(*args):
 
     running = False
 
-    # trigger the task manager event
+    # trigger the task manager event, this may be a signal handler
+    # running in the loop thread
     if taskManager and taskManager.trigger:
         if _debug: stop._debug("    - trigger")
-        taskManager.trigger.set()
+        taskManager.trigger.wakeup()
 
 #
 #   dump_stack
@@ -65,15 +83,19 @@ def dump_stack():
 def print_stack(sig, frame):
     """Signal handler to print a stack trace and some interesting values."""
     if _debug: print_stack._debug("print_stack %r %r", sig, frame)
-    global running, deferredFns, sleeptime
+    global running, deferredFns, sleeptime, loopMetrics
 
     sys.stderr.write("==== USR1 Signal, %s\n" % time.strftime("%d-%b-%Y %H:%M:%S"))
 
     sys.stderr.write("---------- globals\n")
     sys.stderr.write("    running: %r\n" % (running,))
-    sys.stderr.write("    deferredFns: %r\n" % (deferredFns,))
+    sys.stderr.write("    deferredFns: %r\n" % (list(deferredFns),))
     sys.stderr.write("    sleeptime: %r\n" % (sleeptime,))
 
+    if loopMetrics:
+        sys.stderr.write("---------- metrics\n")
+        loopMetrics.dump(sys.stderr)
+
     sys.stderr.write("---------- stack\n")
     traceback.print_stack(frame)
 
@@ -93,29 +115,257 @@ def print_stack(sig, frame):
 
     sys.stderr.flush()
 
+#
+#   install_signal_handlers
+#
+
+def install_signal_handlers(sigterm=stop, sigusr1=print_stack):
+    """Install the signal handlers if they have been provided (issue #112)."""
+    if isinstance(threading.current_thread(), threading._MainThread):
+        if (sigterm is not None) and hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, sigterm)
+        if (sigusr1 is not None) and hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, sigusr1)
+    elif sigterm or sigusr1:
+        warnings.warn("no signal handlers for child threads")
+
+#
+#   _SocketMap
+#
+#   An instance of this class replaces the asyncore socket map so the file
+#   descriptors of the dispatchers that have been added or removed are known.
+#
+
+class _SocketMap(dict):
+
+    def __init__(self, *args):
+        dict.__init__(self, *args)
+        self.changed = set(self)
+
+    def __setitem__(self, fd, obj):
+        dict.__setitem__(self, fd, obj)
+        self.changed.add(fd)
+
+    def __delitem__(self, fd):
+        dict.__delitem__(self, fd)
+        self.changed.add(fd)
+
+    def pop(self, fd, *args):
+        self.changed.add(fd)
+        return dict.pop(self, fd, *args)
+
+    def clear(self):
+        self.changed.update(self)
+        dict.clear(self)
+
+def _install_socket_map():
+    """Replace the asyncore socket map with a _SocketMap if it has not been
+    replaced already and return it."""
+    old_map = asyncore.socket_map
+    if isinstance(old_map, _SocketMap):
+        return old_map
+
+    # dispatchers created from now on use it
+    socket_map = asyncore.socket_map = _SocketMap(old_map)
+    for obj in old_map.values():
+        if getattr(obj, '_map', None) is old_map:
+            obj._map = socket_map
+
+    return socket_map
+
+#
+#   SelectorLoop
+#
+#   Instead of asking every dispatcher if it is readable() or writable() and
+#   building the lists of file descriptors for select() each time through
+#   the loop, the interest is registered with a selector (epoll on Linux)
+#   and only updated for the dispatchers that had an event, were added or
+#   removed, or were passed to dispatcher_changed().
+#
+
+# seconds between checking all of the dispatchers, for the ones that
+# change without calling dispatcher_changed(), None to only check the
+# ones that do
+RESCAN = 1.0
+
+@bacpypes_debugging
+class SelectorLoop:
+
+    def __init__(self, rescan=RESCAN):
+        if _debug: SelectorLoop._debug("__init__ rescan=%r", rescan)
+
+        self.selector = selectors.DefaultSelector()
+        self.rescan = rescan
+        self.rescanTime = 0.0
+
+        # replace the socket map, check all of the dispatchers first
+        self.socket_map = _install_socket_map()
+        self.socket_map.changed.update(self.socket_map)
+
+        # file descriptor -> (dispatcher, events) registered
+        self.registered = {}
+
+        # dispatchers passed to dispatcher_changed()
+        self.changed = set()
+
+    def dispatcher_changed(self, obj):
+        """Check the interest of the dispatcher before the next wait."""
+        self.changed.add(obj)
+
+    def update(self, fd):
+        """Register the interest of the dispatcher with the file descriptor
+        if it has changed."""
+        obj = self.socket_map.get(fd, None)
+
+        events = 0
+        if obj is not None:
+            if obj.readable():
+                events |= selectors.EVENT_READ
+            # accepting sockets should not be writable
+            if obj.writable() and not obj.accepting:
+                events |= selectors.EVENT_WRITE
+
+        old_obj, old_events = self.registered.get(fd, (None, 0))
+        if (obj is old_obj) and (events == old_events):
+            return
+
+        # the file descriptor may have been reused
+        if old_events and (obj is not old_obj):
+            self.selector.unregister(fd)
+            old_events = 0
+
+        if not events:
+            if old_events:
+                self.selector.unregister(fd)
+            self.registered.pop(fd, None)
+        elif old_events:
+            self.selector.modify(fd, events, obj)
+            self.registered[fd] = (obj, events)
+        else:
+            self.selector.register(fd, events, obj)
+            self.registered[fd] = (obj, events)
+
+    def poll(self, timeout):
+        """Wait for socket activity like one pass of asyncore.loop()."""
+        socket_map = self.socket_map
+
+        # dispatchers that have been added or removed, taken one at a time
+        # because other threads may be adding to the sets
+        changed = socket_map.changed
+        while changed:
+            self.update(changed.pop())
+
+        # dispatchers that have something to write
+        changed = self.changed
+        while changed:
+            obj = changed.pop()
+            if socket_map.get(obj._fileno, None) is obj:
+                self.update(obj._fileno)
+
+        # now and then check all of them, the wait is not longer than
+        # the time until the next check
+        if self.rescan is not None:
+            now = time.time()
+            if now - self.rescanTime >= self.rescan:
+                self.rescanTime = now
+                for fd in list(socket_map):
+                    self.update(fd)
+
+            next_rescan = self.rescanTime + self.rescan - now
+            if (timeout is None) or (timeout > next_rescan):
+                timeout = next_rescan
+
+        # nothing to watch
+        if not self.registered:
+            time.sleep(timeout)
+            return
+
+        for key, mask in self.selector.select(timeout):
+            obj = key.data
+
+            # skip it if an earlier event closed it
+            if (mask & selectors.EVENT_READ) and (socket_map.get(key.fd, None) is obj):
+                asyncore.read(obj)
+            if (mask & selectors.EVENT_WRITE) and (socket_map.get(key.fd, None) is obj):
+                asyncore.write(obj)
+
+            # the event may have changed its interest
+            self.update(key.fd)
+
+#
+#   enable_selectors
+#
+
+@bacpypes_debugging
+def enable_selectors(rescan=RESCAN):
+    """Watch the dispatchers with a selector rather than asyncore.loop(),
+    call this before run()."""
+    if _debug: enable_selectors._debug("enable_selectors rescan=%r", rescan)
+    global selectorLoop, dispatcherWatcher
+
+    if not selectorLoop:
+        selectorLoop = dispatcherWatcher = SelectorLoop(rescan)
+
+#
+#   dispatcher_changed
+#
+
+def dispatcher_changed(dispatcher):
+    """Called when what readable() or writable() returns may have changed
+    other than by an event of the dispatcher, like a PDU queued to send."""
+    if dispatcherWatcher:
+        dispatcherWatcher.dispatcher_changed(dispatcher)
+
+    # the loop may be waiting without a timeout, break the wait when this
+    # is called by another thread
+    if taskManager and taskManager.trigger:
+        taskManager.trigger.set()
+
+#
+#   enable_metrics
+#
+
+@bacpypes_debugging
+def enable_metrics():
+    """Start recording how the loop and the tasks are doing, returns the
+    metrics.LoopMetrics instance which is also dumped by print_stack()."""
+    if _debug: enable_metrics._debug("enable_metrics")
+    global loopMetrics
+
+    if not loopMetrics:
+        loopMetrics = LoopMetrics()
+
+    # reference the task manager (a singleton)
+    TaskManager().metrics = loopMetrics
+
+    return loopMetrics
+
 #
 #   run
 #
 
+# seconds to wait when there are no tasks and nothing to break the wait
 SPIN = 1.0
 
 @bacpypes_debugging
 def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
+    """Process tasks, socket activity and deferred functions until stop()
+    is called.  When the task manager has a trigger the loop waits until
+    the next task, socket activity or a wake up from another thread,
+    otherwise it wakes up every spin seconds."""
     if _debug: run._debug("run spin=%r sigterm=%r, sigusr1=%r", spin, sigterm, sigusr1)
     global running, taskManager, deferredFns, sleeptime
 
-    # install the signal handlers if they have been provided (issue #112)
-    if isinstance(threading.current_thread(), threading._MainThread):
-        if (sigterm is not None) and hasattr(signal, 'SIGTERM'):
-            signal.signal(signal.SIGTERM, sigterm)
-        if (sigusr1 is not None) and hasattr(signal, 'SIGUSR1'):
-            signal.signal(signal.SIGUSR1, sigusr1)
-    elif sigterm or sigusr1:
-        warnings.warn("no signal handlers for child threads")
+    # install the signal handlers
+    install_signal_handlers(sigterm, sigusr1)
 
     # reference the task manager (a singleton)
     taskManager = TaskManager()
 
+    # tasks installed by this thread do not need the trigger
+    if taskManager.trigger:
+        taskManager.trigger.loopThread = get_ident()
+
     # count how many times we are going through the loop
     loopCount = 0
 
@@ -124,6 +374,10 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
 #       if _debug: run._debug("    - time: %r", time.time())
         loopCount += 1
 
+        metrics = loopMetrics
+        if metrics:
+            start = time.time()
+
         # get the next task
         task, delta = taskManager.get_next_task()
 
@@ -133,36 +387,43 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
                 # if _debug: run._debug("    - task: %r", task)
                 taskManager.process_task(task)
 
-            # if delta is None, there are no tasks, default to spinning
-            if delta is None:
+                # it may have installed a task that is sooner
+                when, nxttask = taskManager.peek_task()
+                if nxttask:
+                    delta = max(when - time.time(), 0.0)
+
+            # if delta is None, there are no tasks, wait for the trigger
+            # or default to spinning when there isn't one
+            if (delta is None) and not taskManager.trigger:
                 delta = spin
 
-            # there may be threads around, sleep for a bit
-            if sleeptime and (delta > sleeptime):
+            # there may be threads around, sleep for a bit, not needed when
+            # they can use the trigger
+            if sleeptime and (not taskManager.trigger) and (delta > sleeptime):
                 time.sleep(sleeptime)
                 delta -= sleeptime
 
-            # if there are deferred functions, use a small delta
+            # if there are deferred functions, do not wait
             if deferredFns:
-                delta = min(delta, 0.001)
+                delta = 0.0
 #           if _debug: run._debug("    - delta: %r", delta)
 
             # loop for socket activity
-            asyncore.loop(timeout=delta, count=1)
-
-            # check for deferred functions
+            if metrics:
+                poll_start = time.time()
+            if selectorLoop:
+                selectorLoop.poll(delta)
+            else:
+                asyncore.loop(timeout=delta, count=1)
+            if metrics:
+                metrics.poll.record(time.time() - poll_start)
+                metrics.deferred.record(len(deferredFns))
+
+            # check for deferred functions, including the ones they defer
             while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-#                   if _debug: run._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn(*args, **kwargs)
-
-                # done with this list
-                del fnlist
+                fn, args, kwargs = deferredFns.popleft()
+#               if _debug: run._debug("    - call: %r %r %r", fn, args, kwargs)
+                fn(*args, **kwargs)
 
         except KeyboardInterrupt:
             if _debug: run._info("keyboard interrupt")
@@ -170,8 +431,15 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
         except Exception as err:
             if _debug: run._exception("an error has occurred: %s", err)
 
+        if metrics:
+            metrics.iterations.record(time.time() - start)
+
     running = False
 
+    # other threads may run tasks now
+    if taskManager.trigger:
+        taskManager.trigger.loopThread = None
+
 #
 #   run_once
 #
@@ -200,19 +468,11 @@ def run_once():
             if task:
                 taskManager.process_task(task)
 
-            # check for deferred functions
+            # check for deferred functions, including the ones they defer
             while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-                    if _debug: run_once._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn(*args, **kwargs)
-
-                # done with this list
-                del fnlist
+                fn, args, kwargs = deferredFns.popleft()
+                if _debug: run_once._debug("    - call: %r %r %r", fn, args, kwargs)
+                fn(*args, **kwargs)
 
     except KeyboardInterrupt:
         if _debug: run_once._info("keyboard interrupt")
@@ -228,10 +488,10 @@ def deferred(fn, *args, **kwargs):
     if _debug: deferred._debug("deferred %r %r %r", fn, args, kwargs)
     global deferredFns, taskManager
 
-    # append it to the list
+    # append it to the queue, safe from any thread
     deferredFns.append((fn, args, kwargs))
 
-    # trigger the task manager event
+    # trigger the task manager event, once until the loop wakes up
     if taskManager and taskManager.trigger:
         if _debug: deferred._debug("    - trigger")
         taskManager.trigger.set()
@@ -242,6 +502,8 @@ def deferred(fn, *args, **kwargs):
 
 @bacpypes_debugging
 def enable_sleeping(stime=0.001):
+    """Sleep each time through the loop so other threads can run, only
+    used when the task manager does not have a trigger."""
     if _debug: enable_sleeping._debug("enable_sleeping %r", stime)
     global sleeptime
 
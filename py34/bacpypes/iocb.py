@@ -1010,3 +1010,31 @@ def abort(err):
     # tell all the local controllers to abort
     for controller in local_controllers.values():
         controller.abort(err)
+
+#
+#   deferred_iocb
+#
+
+@bacpypes_debugging
+def deferred_iocb(fn, *args, **kwargs):
+    """Call a function in the core like deferred(), from any thread, and
+    return an IOCB that is completed with the value it returns or aborted
+    with the exception it raises."""
+    if _debug: deferred_iocb._debug("deferred_iocb %r %r %r", fn, args, kwargs)
+
+    iocb = IOCB()
+    iocb.ioState = PENDING
+
+    def call():
+        if _debug: deferred_iocb._debug("call %r", iocb)
+
+        try:
+            value = fn(*args, **kwargs)
+        except Exception as err:
+            iocb.abort(err)
+        else:
+            iocb.complete(value)
+
+    deferred(call)
+
+    return iocb
@@ -147,6 +147,10 @@ def get_datatype(object_type, propid, vendor_id=0):
 @bacpypes_debugging
 class Property:
 
+    # ReadProperty and WriteProperty requests for the property run in the
+    # executor of the application, see Application.set_executor()
+    offload = False
+
     def __init__(self, identifier, datatype, default=None, optional=True, mutable=True):
         if _debug:
             Property._debug("__init__ %s %s default=%r optional=%r mutable=%r",
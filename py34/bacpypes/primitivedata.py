@@ -54,6 +54,8 @@ class Tag(object):
         ]
     _app_tag_class = [] # defined later
 
+    __slots__ = ('tagClass', 'tagNumber', 'tagLVT', 'tagData')
+
     def __init__(self, *args):
         self.tagClass = None
         self.tagNumber = None
@@ -270,6 +272,8 @@ class Tag(object):
 
 class ApplicationTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -287,6 +291,8 @@ class ApplicationTag(Tag):
 
 class ContextTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -304,6 +310,8 @@ class ContextTag(Tag):
 
 class OpeningTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -320,6 +328,8 @@ class OpeningTag(Tag):
 
 class ClosingTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -336,32 +346,68 @@ class ClosingTag(Tag):
 
 class TagList(object):
 
+    """
+    The tags that have not been decoded yet start at a cursor, so Peek(),
+    Pop() and push() do not move the rest of the list.  The tagList
+    attribute is the list of tags from the cursor.
+    """
+
     def __init__(self, arg=None):
-        self.tagList = []
+        self._tags = []
+        self._index = 0
+        self._contexts = None
 
         if isinstance(arg, list):
-            self.tagList = arg
+            self._tags = arg
         elif isinstance(arg, TagList):
-            self.tagList = arg.tagList[:]
+            self._tags = arg.tagList[:]
         elif isinstance(arg, PDUData):
             self.decode(arg)
 
+    def _get_tag_list(self):
+        # drop the tags before the cursor, the list may be changed
+        if self._index:
+            self._tags = self._tags[self._index:]
+            self._index = 0
+        self._contexts = None
+
+        return self._tags
+
+    def _set_tag_list(self, tags):
+        self._tags = tags
+        self._index = 0
+        self._contexts = None
+
+    tagList = property(_get_tag_list, _set_tag_list)
+
     def append(self, tag):
-        self.tagList.append(tag)
+        self._tags.append(tag)
+        self._contexts = None
 
     def extend(self, taglist):
-        self.tagList.extend(taglist)
+        self._tags.extend(taglist)
+        self._contexts = None
 
     def __getitem__(self, item):
-        return self.tagList[item]
+        if not self._index:
+            return self._tags[item]
+        if isinstance(item, slice):
+            return self._tags[self._index:][item]
+
+        # index from the cursor without copying the rest of the list
+        if item < 0:
+            item += len(self._tags) - self._index
+        if not (0 <= item < len(self._tags) - self._index):
+            raise IndexError("list index out of range")
+        return self._tags[self._index + item]
 
     def __len__(self):
-        return len(self.tagList)
+        return len(self._tags) - self._index
 
     def Peek(self):
         """Return the tag at the front of the list."""
-        if self.tagList:
-            tag = self.tagList[0]
+        if self._index < len(self._tags):
+            tag = self._tags[self._index]
         else:
             tag = None
 
@@ -369,79 +415,114 @@ class TagList(object):
 
     def push(self, tag):
         """Return a tag back to the front of the list."""
-        self.tagList = [tag] + self.tagList
+        if self._index and (self._tags[self._index - 1] is tag):
+            self._index -= 1
+        else:
+            self._tags = [tag] + self._tags[self._index:]
+            self._index = 0
+            self._contexts = None
 
     def Pop(self):
         """Remove the tag from the front of the list and return it."""
-        if self.tagList:
-            tag = self.tagList[0]
-            del self.tagList[0]
+        if self._index < len(self._tags):
+            tag = self._tags[self._index]
+            self._index += 1
         else:
             tag = None
 
         return tag
 
-    def get_context(self, context):
-        """Return a tag or a list of tags context encoded."""
-        # forward pass
-        i = 0
-        while i < len(self.tagList):
-            tag = self.tagList[i]
+    def save_state(self):
+        """Return the position of the cursor for restore_state()."""
+        return (self._tags, self._index)
+
+    def restore_state(self, state):
+        """Put back tags removed since save_state()."""
+        self._tags, self._index = state
+        self._contexts = None
+
+    def _context_index(self):
+        """Map the context encoded tags and the opening tags at the top
+        level to their positions, along with the error that stopped the
+        forward pass, if any."""
+        contexts = {}
+        error = None
+
+        tags = self._tags
+        i = self._index
+        while i < len(tags):
+            tag = tags[i]
 
             # skip application stuff
             if tag.tagClass == Tag.applicationTagClass:
                 pass
 
-            # check for context encoded atomic value
+            # context encoded atomic value, the first one is found
             elif tag.tagClass == Tag.contextTagClass:
-                if tag.tagNumber == context:
-                    return tag
+                contexts.setdefault(tag.tagNumber, i)
 
-            # check for context encoded group
+            # context encoded group, find the matching closing tag
             elif tag.tagClass == Tag.openingTagClass:
-                keeper = tag.tagNumber == context
-                rslt = []
-                i += 1
+                start = i
                 lvl = 0
-                while i < len(self.tagList):
-                    tag = self.tagList[i]
+                i += 1
+                while i < len(tags):
+                    tag = tags[i]
                     if tag.tagClass == Tag.openingTagClass:
                         lvl += 1
                     elif tag.tagClass == Tag.closingTagClass:
                         lvl -= 1
                         if lvl < 0: break
-
-                    rslt.append(tag)
                     i += 1
 
                 # make sure everything balances
                 if lvl >= 0:
-                    raise InvalidTag("mismatched open/close tags")
+                    error = InvalidTag("mismatched open/close tags")
+                    break
 
-                # get everything we need?
-                if keeper:
-                    return TagList(rslt)
+                contexts.setdefault(tags[start].tagNumber, (start, i))
             else:
-                raise InvalidTag("unexpected tag")
+                error = InvalidTag("unexpected tag")
+                break
 
             # try the next tag
             i += 1
 
-        # nothing found
-        return None
+        return (self._index, contexts, error)
+
+    def get_context(self, context):
+        """Return a tag or a list of tags context encoded."""
+        if (self._contexts is None) or (self._contexts[0] != self._index):
+            self._contexts = self._context_index()
+        index, contexts, error = self._contexts
+
+        position = contexts.get(context)
+        if position is None:
+            if error:
+                raise error
+            return None
+
+        # simple context encoded element
+        if isinstance(position, int):
+            return self._tags[position]
+
+        # the tags between the opening and closing tags
+        start, end = position
+        return TagList(self._tags[start + 1:end])
 
     def encode(self, pdu):
         """encode the tag list into a PDU."""
-        for tag in self.tagList:
+        for tag in self._tags[self._index:]:
             tag.encode(pdu)
 
     def decode(self, pdu):
         """decode the tags from a PDU."""
-        while pdu.pduData:
-            self.tagList.append( Tag(pdu) )
+        while pdu.remaining():
+            self._tags.append( Tag(pdu) )
+        self._contexts = None
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
-        for tag in self.tagList:
+        for tag in self._tags[self._index:]:
             tag.debug_contents(indent+1, file, _ids)
 
 #
@@ -1061,11 +1142,46 @@ class BitString(Atomic):
         # funny cast to a bit
         self.value[bit] = value and 1 or 0
 
+#
+#   expand_enumerations
+#
+
+def expand_enumerations(klass):
+    # build a value dictionary
+    xlateTable = {}
+
+    for c in klass.__mro__:
+        enumerations = getattr(c, 'enumerations', {})
+        if enumerations:
+            for name, value in enumerations.items():
+                # save the results
+                xlateTable[name] = value
+                xlateTable[value] = name
+
+                # save the name in the class
+                setattr(klass, name, value)
+
+    # save the dictionary in the class
+    setattr(klass, '_xlate_table', xlateTable)
+
+#
+#   _EnumeratedMetaclass
+#
+
+class _EnumeratedMetaclass(type):
+
+    """Build the translation table when the class is created, call
+    expand_enumerations() again if the enumerations are changed."""
+
+    def __init__(cls, *args):
+        super(_EnumeratedMetaclass, cls).__init__(*args)
+        expand_enumerations(cls)
+
 #
 #   Enumerated
 #
 
-class Enumerated(Atomic):
+class Enumerated(Atomic, metaclass=_EnumeratedMetaclass):
 
     _app_tag = Tag.enumeratedAppTag
 
@@ -1073,11 +1189,9 @@ class Enumerated(Atomic):
     _xlate_table = {}
 
     def __init__(self, arg=None):
-        self.value = int(0)
-
-        # see if the class has a translate table
-        if '_xlate_table' not in self.__class__.__dict__:
-            expand_enumerations(self.__class__)
+        # the value is kept as an integer, the name is found when it is
+        # referenced, the default is not translated
+        self._value = None
 
         # initialize the object
         if arg is None:
@@ -1087,29 +1201,44 @@ class Enumerated(Atomic):
         elif isinstance(arg, int):
             if (arg < 0):
                 raise ValueError("unsigned integer required")
-
-            # convert it to a string if you can
-            self.value = self._xlate_table.get(arg, arg)
+            self._value = arg
 
         elif isinstance(arg, str):
-            if arg not in self._xlate_table:
+            value = self._xlate_table.get(arg)
+            if value is None:
                 raise ValueError("undefined enumeration '%s'" % (arg,))
-            self.value = arg
+            self._value = value
         elif isinstance(arg, Enumerated):
-            self.value = arg.value
+            if arg._value is not None:
+                self.value = arg.value
         else:
             raise TypeError("invalid constructor datatype")
 
+    @property
+    def value(self):
+        """The name of the value if it has one, otherwise the integer."""
+        if self._value is None:
+            return 0
+        return self._xlate_table.get(self._value, self._value)
+
+    @value.setter
+    def value(self, value):
+        if isinstance(value, str):
+            value = self._xlate_table.get(value, value)
+        self._value = value
+
     def __getitem__(self, item):
         return self._xlate_table.get(item)
 
     def get_long(self):
-        if isinstance(self.value, int):
-            return self.value
-        elif isinstance(self.value, str):
-            return int(self._xlate_table[self.value])
+        if isinstance(self._value, int):
+            return self._value
+        elif isinstance(self._value, str):
+            return int(self._xlate_table[self._value])
+        elif self._value is None:
+            return 0
         else:
-            raise TypeError("%s is an invalid enumeration value datatype" % (type(self.value),))
+            raise TypeError("%s is an invalid enumeration value datatype" % (type(self._value),))
 
     def keylist(self):
         """Return a list of names in order by value."""
@@ -1145,20 +1274,16 @@ class Enumerated(Atomic):
         else:
             return 0
 
-    def encode(self, tag):
-        if isinstance(self.value, int):
-            value = int(self.value)
-        elif isinstance(self.value, str):
-            value = self._xlate_table[self.value]
-        else:
-            raise TypeError("%s is an invalid enumeration value datatype" % (type(self.value),))
+    def __hash__(self):
+        # the number, which is the same for equal values of the class, the
+        # default value is zero, so do not change the value of a key
+        return hash(self._value if self._value is not None else 0)
 
-        # rip apart the number
-        data = bytearray(struct.pack('>L', value))
+    def encode(self, tag):
+        value = self.get_long()
 
-        # reduce the value to the smallest number of octets
-        while (len(data) > 1) and (data[0] == 0):
-            del data[0]
+        # rip apart the number, reduced to the smallest number of octets
+        data = bytearray(struct.pack('>L', value).lstrip(b'\0') or b'\0')
 
         # encode the tag
         tag.set_app_data(Tag.enumeratedAppTag, data)
@@ -1169,16 +1294,8 @@ class Enumerated(Atomic):
         if len(tag.tagData) == 0:
             raise InvalidTag("invalid tag length")
 
-        # get the data
-        rslt = 0
-        for c in tag.tagData:
-            rslt = (rslt << 8) + c
-
-        # translate to a string if possible
-        rslt = self._xlate_table.get(rslt, rslt)
-
-        # save the result
-        self.value = rslt
+        # get the data, the name is found when it is referenced
+        self._value = int.from_bytes(tag.tagData, 'big')
 
     @classmethod
     def is_valid(cls, arg):
@@ -1191,28 +1308,6 @@ class Enumerated(Atomic):
     def __str__(self):
         return "%s(%s)" % (self.__class__.__name__, self.value)
 
-#
-#   expand_enumerations
-#
-
-def expand_enumerations(klass):
-    # build a value dictionary
-    xlateTable = {}
-
-    for c in klass.__mro__:
-        enumerations = getattr(c, 'enumerations', {})
-        if enumerations:
-            for name, value in enumerations.items():
-                # save the results
-                xlateTable[name] = value
-                xlateTable[value] = name
-
-                # save the name in the class
-                setattr(klass, name, value)
-
-    # save the dictionary in the class
-    setattr(klass, '_xlate_table', xlateTable)
-
 #
 #   Date
 #
@@ -1591,7 +1686,9 @@ class ObjectIdentifier(Atomic):
     maximum_instance_number = 0x003FFFFF
 
     def __init__(self, *args):
-        self.value = ('analogInput', 0)
+        # the value is kept packed, the name of the type is found when it
+        # is referenced
+        self._value = 0
 
         if len(args) == 0:
             pass
@@ -1604,7 +1701,7 @@ class ObjectIdentifier(Atomic):
             elif isinstance(arg, tuple):
                 self.set_tuple(*arg)
             elif isinstance(arg, ObjectIdentifier):
-                self.value = arg.value
+                self._value = arg._value
             else:
                 raise TypeError("invalid constructor datatype")
         elif len(args) == 2:
@@ -1612,15 +1709,27 @@ class ObjectIdentifier(Atomic):
         else:
             raise ValueError("invalid constructor parameters")
 
+    @property
+    def value(self):
+        """The (objType, objInstance) tuple, objType is the name of the type
+        if it has one."""
+        objType = self._value >> 22
+        return (self.objectTypeClass._xlate_table.get(objType, objType), self._value & 0x003FFFFF)
+
+    @value.setter
+    def value(self, value):
+        self.set_tuple(*value)
+
     def set_tuple(self, objType, objInstance):
         # allow a type name as well as an integer
         if isinstance(objType, int):
-            # try and make it pretty
-            objType = self.objectTypeClass._xlate_table.get(objType, objType)
+            pass
         elif isinstance(objType, str):
             # make sure the type is known
-            if objType not in self.objectTypeClass._xlate_table:
+            typeNumber = self.objectTypeClass._xlate_table.get(objType)
+            if typeNumber is None:
                 raise ValueError("unrecognized object type '%s'" % (objType,))
+            objType = typeNumber
         else:
             raise TypeError("invalid datatype for objType: %r, %r" % (type(objType), objType))
 
@@ -1629,46 +1738,23 @@ class ObjectIdentifier(Atomic):
             raise ValueError("instance number out of range")
 
         # pack the components together
-        self.value = (objType, objInstance)
+        self._value = (objType << 22) + objInstance
 
     def get_tuple(self):
         """Return the unsigned integer tuple of the identifier."""
-        objType, objInstance = self.value
-
-        if isinstance(objType, int):
-            pass
-        elif isinstance(objType, str):
-            # turn it back into an integer
-            objType = self.objectTypeClass()[objType]
-        else:
-            raise TypeError("invalid datatype for objType")
-
-        # pack the components together
-        return (objType, objInstance)
+        return (self._value >> 22, self._value & 0x003FFFFF)
 
     def set_long(self, value):
-        # suck out the type
-        objType = (value >> 22) & 0x03FF
-
-        # try and make it pretty
-        objType = self.objectTypeClass()[objType] or objType
-
-        # suck out the instance
-        objInstance = value & 0x003FFFFF
-
-        # save the result
-        self.value = (objType, objInstance)
+        # the type and instance
+        self._value = value & 0xFFFFFFFF
 
     def get_long(self):
         """Return the unsigned integer representation of the identifier."""
-        objType, objInstance = self.get_tuple()
-
-        # pack the components together
-        return ((objType << 22) + objInstance)
+        return self._value
 
     def encode(self, tag):
         # encode the tag
-        tag.set_app_data(Tag.objectIdentifierAppTag, struct.pack('>L', self.get_long()))
+        tag.set_app_data(Tag.objectIdentifierAppTag, struct.pack('>L', self._value))
 
     def decode(self, tag):
         if (tag.tagClass != Tag.applicationTagClass) or (tag.tagNumber != Tag.objectIdentifierAppTag):
@@ -1677,7 +1763,7 @@ class ObjectIdentifier(Atomic):
             raise InvalidTag("invalid tag length")
 
         # extract the data
-        self.set_long(struct.unpack('>L',tag.tagData)[0])
+        self._value = struct.unpack('>L', tag.tagData)[0]
 
     @classmethod
     def is_valid(cls, arg):
@@ -1700,6 +1786,14 @@ class ObjectIdentifier(Atomic):
             typestr = "Vendor %d" % (objType,)
         return "ObjectIdentifier(%s,%d)" % (typestr, objInstance)
 
+    def __eq__(self, other):
+        # hoop jump it
+        if not isinstance(other, self.__class__):
+            other = self.__class__(other)
+
+        # compare the packed values
+        return self._value == other._value
+
     def __hash__(self):
         return hash(self.value)
 
@@ -1733,3 +1827,64 @@ Tag._app_tag_class = \
     , ObjectIdentifier, None, None, None
     ]
 
+#
+#   Tag Cache
+#
+#   Property identifiers, object types, array indexes and priorities are
+#   encoded over and over.  The tags for these values are built once and
+#   encoded into octets once, and the same tag is used again when another
+#   value of the same class and type has the same encoding.  The cache is
+#   emptied when it is full.
+#
+
+_tag_cache = {}
+_tag_cache_size = 4096
+
+# classes and types of values that are cached
+_tag_cache_classes = (Boolean, Unsigned, Enumerated, ObjectIdentifier)
+_tag_cache_value_types = (bool, int, str, tuple)
+
+class _CachedTag(Tag):
+
+    """A tag that has the octets of its encoding.  The same tag is shared by
+    the tag lists of many values and must not be changed."""
+
+    __slots__ = ('tagOctets',)
+
+    def __init__(self, tag):
+        Tag.__init__(self, tag.tagClass, tag.tagNumber, tag.tagLVT, tag.tagData)
+
+        data = PDUData()
+        Tag.encode(self, data)
+        self.tagOctets = bytes(data.pduData)
+
+    def encode(self, pdu):
+        """Encode a tag on the end of the PDU."""
+        pdu.put_data(self.tagOctets)
+
+def cached_tag(klass, value, context=None):
+    """Return an application tag with the value encoded, or a context tag
+    when the context is provided.  The tag may come from the cache and be
+    shared, so it must not be changed."""
+    if value.__class__ in _tag_cache_value_types:
+        key = (klass, context, value.__class__, value)
+        tag = _tag_cache.get(key)
+        if tag is not None:
+            return tag
+    else:
+        key = None
+
+    # build a tag and encode the value into it
+    tag = Tag()
+    klass(value).encode(tag)
+    if context is not None:
+        tag = tag.app_to_context(context)
+    if key is None:
+        return tag
+
+    # save it for next time
+    if len(_tag_cache) >= _tag_cache_size:
+        _tag_cache.clear()
+    tag = _tag_cache[key] = _CachedTag(tag)
+
+    return tag
@@ -7,7 +7,10 @@ Task
 import sys
 
 from time import time as _time
+from math import ceil
 from heapq import heapify, heappush, heappop
+from itertools import count
+from collections import OrderedDict
 
 from .singleton import SingletonLogging
 from .debugging import DebugContents, Logging, ModuleLogger, bacpypes_debugging
@@ -22,6 +25,9 @@ _unscheduled_tasks = []
 
 # only defined for linux platforms
 if sys.platform in ('linux', 'darwin'):
+    import os
+    from threading import get_ident
+
     from .event import WaitableEvent
     #
     #   _Trigger
@@ -30,12 +36,52 @@ if sys.platform in ('linux', 'darwin'):
     #   the asyncore.loop() call.  In this case, handle_read will
     #   immediately "clear" the event.
     #
+    #   The thread running core.run() looks for new tasks and deferred
+    #   functions before it waits, so setting the event from that thread
+    #   does nothing.  Other threads write to the pipe once until the
+    #   loop has read it.
+    #
 
     class _Trigger(WaitableEvent, Logging):
 
+        def __init__(self):
+            WaitableEvent.__init__(self)
+
+            # the thread running the loop
+            self.loopThread = None
+
+            # called instead of writing when the loop thread sets it, for a
+            # loop that runs tasks from callbacks rather than in core.run()
+            self.loopWakeup = None
+
+            # a character has been written and not read
+            self.wakeupPending = False
+
+        def set(self):
+            if self.loopThread == get_ident():
+                if self.loopWakeup:
+                    self.loopWakeup()
+                return
+
+            self.wakeup()
+
+        def wakeup(self):
+            """Break the wait, even when called by the loop thread."""
+            if not self.wakeupPending:
+                self.wakeupPending = True
+                os.write(self._write_fd, b'1')
+
+        def clear(self):
+            self.wakeupPending = False
+            WaitableEvent.clear(self)
+
         def handle_read(self):
             if _debug: _Trigger._debug("handle_read")
 
+            # ready for another wake up before reading, a character
+            # written since then is left to break the next wait
+            self.wakeupPending = False
+
             # read in the character, highlander
             data = self.recv(1)
             if _debug: _Trigger._debug("    - data: %r", data)
@@ -50,6 +96,14 @@ class _Task(DebugContents, Logging):
 
     _debug_contents = ('taskTime', 'isScheduled')
 
+    # true to keep the task in the timing wheel of the task manager, false
+    # to keep it out, None for the task manager default
+    taskCoarse = None
+
+    # entry in the task manager heap or timing wheel when scheduled
+    _taskEntry = None
+    _taskBucket = None
+
     def __init__(self):
         self.taskTime = None
         self.isScheduled = False
@@ -255,10 +309,95 @@ def recurring_function(interval, offset=None):
 
     return recurring_function_decorator
 
+#
+#   TimingWheel
+#
+#   Tasks are kept in buckets, one for each tick of the resolution, and are
+#   processed at the end of the tick, up to one resolution late.  Adding a
+#   task to a bucket and removing it are constant time, only starting a new
+#   bucket pushes the tick on a heap.
+#
+
+@bacpypes_debugging
+class TimingWheel(DebugContents):
+
+    _debug_contents = ('wheelResolution', 'wheelTicks')
+
+    def __init__(self, resolution):
+        if _debug: TimingWheel._debug("__init__ %r", resolution)
+        if resolution <= 0.0:
+            raise ValueError("resolution must be greater than zero")
+
+        self.wheelResolution = resolution
+
+        # tick -> ordered dictionary of tasks, heap of the bucket ticks
+        self.wheelBuckets = {}
+        self.wheelTicks = []
+
+    def add_task(self, task):
+        if _debug: TimingWheel._debug("add_task %r @ %r", task, task.taskTime)
+
+        tick = int(ceil(task.taskTime / self.wheelResolution))
+
+        bucket = self.wheelBuckets.get(tick, None)
+        if bucket is None:
+            bucket = self.wheelBuckets[tick] = OrderedDict()
+            heappush(self.wheelTicks, tick)
+
+        bucket[task] = tick
+        task._taskBucket = bucket
+
+    def remove_task(self, task):
+        """Remove the task and return true if it was in the wheel."""
+        if _debug: TimingWheel._debug("remove_task %r", task)
+
+        bucket = task._taskBucket
+        if bucket is None:
+            return False
+
+        # empty buckets are removed when their tick is reached
+        del bucket[task]
+        task._taskBucket = None
+
+        return True
+
+    def peek_task(self):
+        """Return the time and the task that is next, or (None, None)."""
+        ticks = self.wheelTicks
+        buckets = self.wheelBuckets
+
+        while ticks and not buckets[ticks[0]]:
+            del buckets[heappop(ticks)]
+
+        if not ticks:
+            return (None, None)
+
+        tick = ticks[0]
+        return (tick * self.wheelResolution, next(iter(buckets[tick])))
+
+    def pop_task(self):
+        """Pull off the task that is next."""
+        when, task = self.peek_task()
+        if task:
+            self.wheelBuckets[self.wheelTicks[0]].popitem(last=False)
+            task._taskBucket = None
+
+        return (when, task)
+
+    def clear(self):
+        """Forget all of the tasks."""
+        if _debug: TimingWheel._debug("clear")
+
+        self.wheelBuckets = {}
+        self.wheelTicks = []
+
 #
 #   TaskManager
 #
 
+# compact the heap when more than this fraction of it is suspended tasks
+_suspended_fraction = 0.5
+
 # @bacpypes_debugging - implicit via metaclass
 class TaskManager(SingletonLogging):
 
@@ -266,8 +405,18 @@ class TaskManager(SingletonLogging):
         if _debug: TaskManager._debug("__init__")
         global _task_manager, _unscheduled_tasks
 
-        # initialize
+        # initialize, the heap has [when, sequence, task] entries and the
+        # task is None when it has been suspended
         self.tasks = []
+        self.taskSequence = count()
+        self.suspendedTasks = 0
+
+        # optional timing wheel for coarse tasks
+        self.wheel = None
+        self.wheelDefault = False
+
+        # optional metrics.LoopMetrics updated by process_task()
+        self.metrics = None
         if _Trigger:
             self.trigger = _Trigger()
         else:
@@ -282,6 +431,40 @@ class TaskManager(SingletonLogging):
             for task in _unscheduled_tasks:
                 task.install_task()
 
+    def enable_timing_wheel(self, resolution=0.1, default=False):
+        """Keep coarse tasks in a timing wheel with a resolution in seconds,
+        when the default is true every task that does not set taskCoarse is
+        coarse."""
+        if _debug: TaskManager._debug("enable_timing_wheel %r default=%r", resolution, default)
+
+        if self.wheel and (self.wheel.wheelResolution != resolution):
+            raise RuntimeError("timing wheel already enabled")
+        if not self.wheel:
+            self.wheel = TimingWheel(resolution)
+        self.wheelDefault = default
+
+    def disable_timing_wheel(self):
+        """Stop using the timing wheel, the tasks in it are moved to the heap
+        and processed at their own times."""
+        if _debug: TaskManager._debug("disable_timing_wheel")
+
+        wheel = self.wheel
+        if not wheel:
+            return
+        self.wheel = None
+        self.wheelDefault = False
+
+        for tick in sorted(wheel.wheelBuckets):
+            for task in wheel.wheelBuckets[tick]:
+                task._taskBucket = None
+                task._taskEntry = entry = [task.taskTime, next(self.taskSequence), task]
+                heappush(self.tasks, entry)
+        wheel.clear()
+
+        # the next task may be sooner
+        if self.trigger:
+            self.trigger.set()
+
     def get_time(self):
         if _debug: TaskManager._debug("get_time")
 
@@ -299,9 +482,19 @@ class TaskManager(SingletonLogging):
         if task.isScheduled:
             self.suspend_task(task)
 
-        # save this in the task list
-        heappush( self.tasks, (task.taskTime, task) )
-        if _debug: TaskManager._debug("    - tasks: %r", self.tasks)
+        coarse = task.taskCoarse
+        if coarse is None:
+            coarse = self.wheelDefault
+
+        if self.wheel and coarse:
+            # save this in the timing wheel
+            self.wheel.add_task(task)
+        else:
+            # save this in the task list, the sequence keeps tasks with the
+            # same time in the order they were installed
+            task._taskEntry = entry = [task.taskTime, next(self.taskSequence), task]
+            heappush(self.tasks, entry)
+            if _debug: TaskManager._debug("    - tasks: %r", self.tasks)
 
         task.isScheduled = True
 
@@ -312,15 +505,21 @@ class TaskManager(SingletonLogging):
     def suspend_task(self, task):
         if _debug: TaskManager._debug("suspend_task %r", task)
 
-        # remove this guy
-        for i, (when, curtask) in enumerate(self.tasks):
-            if task is curtask:
-                if _debug: TaskManager._debug("    - task found")
-                del self.tasks[i]
-
-                task.isScheduled = False
-                heapify(self.tasks)
-                break
+        # remove this guy, the entry stays in the heap until it reaches the
+        # top or the heap is compacted
+        entry = task._taskEntry
+        if entry and (entry[2] is task):
+            if _debug: TaskManager._debug("    - task found")
+            entry[2] = None
+            task._taskEntry = None
+            task.isScheduled = False
+
+            self.suspendedTasks += 1
+            if self.suspendedTasks > len(self.tasks) * _suspended_fraction:
+                self.compact_tasks()
+        elif self.wheel and self.wheel.remove_task(task):
+            if _debug: TaskManager._debug("    - task found in wheel")
+            task.isScheduled = False
         else:
             if _debug: TaskManager._debug("    - task not found")
 
@@ -334,6 +533,50 @@ class TaskManager(SingletonLogging):
         # just re-install it
         self.install_task(task)
 
+    def compact_tasks(self):
+        """Remove the entries of suspended tasks from the heap."""
+        if _debug: TaskManager._debug("compact_tasks")
+
+        self.tasks = [entry for entry in self.tasks if entry[2] is not None]
+        heapify(self.tasks)
+        self.suspendedTasks = 0
+
+    def peek_task(self):
+        """Return the time and the task that is next, or (None, None)."""
+        tasks = self.tasks
+
+        # pull off the entries of suspended tasks
+        while tasks and (tasks[0][2] is None):
+            heappop(tasks)
+            self.suspendedTasks -= 1
+
+        if tasks:
+            when, _, task = tasks[0]
+        else:
+            when = task = None
+
+        # the timing wheel may have an earlier one
+        if self.wheel:
+            wheel_when, wheel_task = self.wheel.peek_task()
+            if wheel_task and ((task is None) or (wheel_when < when)):
+                return (wheel_when, wheel_task)
+
+        return (when, task)
+
+    def pop_task(self):
+        """Pull off the task that is next and mark that it is no longer
+        scheduled."""
+        when, task = self.peek_task()
+        if task:
+            if task._taskBucket is not None:
+                self.wheel.pop_task()
+            else:
+                heappop(self.tasks)
+                task._taskEntry = None
+            task.isScheduled = False
+
+        return (when, task)
+
     def get_next_task(self):
         """get the next task if there's one that should be processed,
         and return how long it will be until the next one should be
@@ -346,18 +589,16 @@ class TaskManager(SingletonLogging):
         task = None
         delta = None
 
-        if self.tasks:
-            # look at the first task
-            when, nxttask = self.tasks[0]
+        # look at the first task
+        when, nxttask = self.peek_task()
+        if nxttask:
             if when <= now:
                 # pull it off the list and mark that it's no longer scheduled
-                heappop(self.tasks)
-                task = nxttask
-                task.isScheduled = False
+                when, task = self.pop_task()
 
-                if self.tasks:
-                    when, nxttask = self.tasks[0]
-                    # peek at the next task, return how long to wait
+                # peek at the next task, return how long to wait
+                when, nxttask = self.peek_task()
+                if nxttask:
                     delta = max(when - now, 0.0)
             else:
                 delta = when - now
@@ -368,9 +609,17 @@ class TaskManager(SingletonLogging):
     def process_task(self, task):
         if _debug: TaskManager._debug("process_task %r", task)
 
+        metrics = self.metrics
+        if metrics:
+            lateness = self.get_time() - task.taskTime
+            start = _time()
+
         # process the task
         task.process_task()
 
+        if metrics:
+            metrics.record_task(task, lateness, _time() - start)
+
         # see if it should be rescheduled
         if isinstance(task, RecurringTask):
             task.install_task()
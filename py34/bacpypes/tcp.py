@@ -14,10 +14,11 @@ from io import StringIO
 
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
 
-from .core import deferred
+from .core import deferred, dispatcher_changed
 from .task import FunctionTask, OneShotFunction
 from .comm import PDU, Client, Server
 from .comm import ServiceAccessPoint, ApplicationServiceElement
+from .metrics import TransportMetrics
 
 # some debugging
 _debug = 0
@@ -95,14 +96,29 @@ class PickleActorMixIn:
 class TCPClient(asyncore.dispatcher):
 
     _connect_timeout = CONNECT_TIMEOUT
+    _rcvbuf = None
+    _sndbuf = None
+
+    # actors count the traffic for their director
+    metrics = None
 
     def __init__(self, peer):
         if _debug: TCPClient._debug("__init__ %r", peer)
         asyncore.dispatcher.__init__(self)
 
+        # count the traffic
+        if self.metrics is None:
+            self.metrics = TransportMetrics()
+
         # ask the dispatcher for a socket
         self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
 
+        # set the buffer sizes before connecting, the kernel may adjust them
+        if self._rcvbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._rcvbuf)
+        if self._sndbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self._sndbuf)
+
         # make sure the connection attempt is non-blocking
         self.socket.setblocking(0)
         if _debug: TCPClient._debug("    - non-blocking")
@@ -124,11 +140,13 @@ class TCPClient(asyncore.dispatcher):
                 if _debug: TCPClient._debug("    - in progress")
             elif (rslt == errno.ECONNREFUSED):
                 if _debug: TCPClient._debug("    - connection refused")
+                self.metrics.error(peer)
                 self.handle_error(rslt)
             else:
                 if _debug: TCPClient._debug("    - connect_ex: %r", rslt)
         except socket.error as err:
             if _debug: TCPClient._debug("    - connect socket error: %r", err)
+            self.metrics.error(peer)
 
             # pass along to a handler
             self.handle_error(err)
@@ -153,6 +171,7 @@ class TCPClient(asyncore.dispatcher):
             self.connected = True
         elif (err == errno.ECONNREFUSED):
             if _debug: TCPClient._debug("    - connection to %r refused", self.peer)
+            self.metrics.error(self.peer)
             self.handle_error(socket.error(errno.ECONNREFUSED, "connection refused"))
             return
 
@@ -173,6 +192,8 @@ class TCPClient(asyncore.dispatcher):
             if not self.socket:
                 if _debug: TCPClient._debug("    - socket was closed")
             else:
+                self.metrics.received(self.peer, len(msg))
+
                 # send the data upstream
                 deferred(self.response, PDU(msg))
 
@@ -181,6 +202,7 @@ class TCPClient(asyncore.dispatcher):
                 if _debug: TCPClient._debug("    - connection to %r refused", self.peer)
             else:
                 if _debug: TCPClient._debug("    - recv socket error: %r", err)
+            self.metrics.error(self.peer)
 
             # pass along to a handler
             self.handle_error(err)
@@ -199,8 +221,12 @@ class TCPClient(asyncore.dispatcher):
             if _debug: TCPClient._debug("    - sent %d octets, %d remaining", sent, len(self.request) - sent)
 
             self.request = self.request[sent:]
+            self.metrics.sent(self.peer, sent)
+            self.metrics.queueDepth -= sent
 
         except socket.error as err:
+            self.metrics.error(self.peer)
+
             if (err.args[0] == errno.EPIPE):
                 if _debug: TCPClient._debug("    - broken pipe to %r", self.peer)
                 return
@@ -236,6 +262,7 @@ class TCPClient(asyncore.dispatcher):
             else:
                 socket_error = socket.error(err, "other unknown: %r" % (err,))
             if _debug: TCPClient._debug("    - socket_error: %r", socket_error)
+            self.metrics.error(self.peer)
 
             self.handle_error(socket_error)
             return
@@ -252,6 +279,10 @@ class TCPClient(asyncore.dispatcher):
         # no longer connected
         self.connected = False
 
+        # what has not been sent is gone
+        self.metrics.queueDepth -= len(self.request)
+        self.request = b''
+
         # make sure other routines know the socket is closed
         self.socket = None
 
@@ -272,6 +303,8 @@ class TCPClient(asyncore.dispatcher):
         if _debug: TCPClient._debug("indication %r", pdu)
 
         self.request += pdu.pduData
+        self.metrics.queued(self.metrics.queueDepth + len(pdu.pduData))
+        dispatcher_changed(self)
 
 #
 #   TCPClientActor
@@ -290,6 +323,11 @@ class TCPClientActor(TCPClient):
         self.director = None
         self._connection_error = None
 
+        # share the buffer sizes and counters of the director
+        self._rcvbuf = director.rcvbuf
+        self._sndbuf = director.sndbuf
+        self.metrics = director.metrics
+
         # add a timer
         self._connect_timeout = director.connect_timeout
         if self._connect_timeout:
@@ -453,10 +491,10 @@ class TCPClientDirector(Server, ServiceAccessPoint, DebugContents):
 
     _debug_contents = ('connect_timeout', 'idle_timeout', 'actorClass', 'clients', 'reconnect')
 
-    def __init__(self, connect_timeout=None, idle_timeout=None, actorClass=TCPClientActor, sid=None, sapID=None):
+    def __init__(self, connect_timeout=None, idle_timeout=None, actorClass=TCPClientActor, rcvbuf=None, sndbuf=None, sid=None, sapID=None):
         if _debug:
-            TCPClientDirector._debug("__init__ connect_timeout=%r idle_timeout=%r actorClass=%r sid=%r sapID=%r",
-            connect_timeout, idle_timeout, actorClass, sid, sapID,
+            TCPClientDirector._debug("__init__ connect_timeout=%r idle_timeout=%r actorClass=%r rcvbuf=%r sndbuf=%r sid=%r sapID=%r",
+            connect_timeout, idle_timeout, actorClass, rcvbuf, sndbuf, sid, sapID,
             )
         Server.__init__(self, sid)
         ServiceAccessPoint.__init__(self, sapID)
@@ -470,6 +508,13 @@ class TCPClientDirector(Server, ServiceAccessPoint, DebugContents):
         self.connect_timeout = connect_timeout
         self.idle_timeout = idle_timeout
 
+        # buffer sizes for the actor sockets
+        self.rcvbuf = rcvbuf
+        self.sndbuf = sndbuf
+
+        # the actors count their traffic here
+        self.metrics = TransportMetrics()
+
         # start with an empty client pool
         self.clients = {}
 
@@ -561,10 +606,17 @@ class TCPClientDirector(Server, ServiceAccessPoint, DebugContents):
 @bacpypes_debugging
 class TCPServer(asyncore.dispatcher):
 
+    # actors count the traffic for their director
+    metrics = None
+
     def __init__(self, sock, peer):
         if _debug: TCPServer._debug("__init__ %r %r", sock, peer)
         asyncore.dispatcher.__init__(self, sock)
 
+        # count the traffic
+        if self.metrics is None:
+            self.metrics = TransportMetrics()
+
         # save the peer
         self.peer = peer
 
@@ -588,6 +640,8 @@ class TCPServer(asyncore.dispatcher):
             if not self.socket:
                 if _debug: TCPServer._debug("    - socket was closed")
             else:
+                self.metrics.received(self.peer, len(msg))
+
                 # send the data upstream
                 deferred(self.response, PDU(msg))
 
@@ -596,6 +650,7 @@ class TCPServer(asyncore.dispatcher):
                 if _debug: TCPServer._debug("    - connection to %r refused", self.peer)
             else:
                 if _debug: TCPServer._debug("    - recv socket error: %r", err)
+            self.metrics.error(self.peer)
 
             # pass along to a handler
             self.handle_error(err)
@@ -611,8 +666,12 @@ class TCPServer(asyncore.dispatcher):
             if _debug: TCPServer._debug("    - sent %d octets, %d remaining", sent, len(self.request) - sent)
 
             self.request = self.request[sent:]
+            self.metrics.sent(self.peer, sent)
+            self.metrics.queueDepth -= sent
 
         except socket.error as err:
+            self.metrics.error(self.peer)
+
             if (err.args[0] == errno.ECONNREFUSED):
                 if _debug: TCPServer._debug("    - connection to %r refused", self.peer)
             else:
@@ -634,6 +693,10 @@ class TCPServer(asyncore.dispatcher):
         self.close()
         self.socket = None
 
+        # what has not been sent is gone
+        self.metrics.queueDepth -= len(self.request)
+        self.request = b''
+
     def handle_error(self, error=None):
         """Trap for TCPServer errors, otherwise continue."""
         if _debug: TCPServer._debug("handle_error %r", error)
@@ -646,6 +709,8 @@ class TCPServer(asyncore.dispatcher):
         if _debug: TCPServer._debug("indication %r", pdu)
 
         self.request += pdu.pduData
+        self.metrics.queued(self.metrics.queueDepth + len(pdu.pduData))
+        dispatcher_changed(self)
 
 #
 #   TCPServerActor
@@ -656,6 +721,10 @@ class TCPServerActor(TCPServer):
 
     def __init__(self, director, sock, peer):
         if _debug: TCPServerActor._debug("__init__ %r %r %r", director, sock, peer)
+
+        # share the counters of the director
+        self.metrics = director.metrics
+
         TCPServer.__init__(self, sock, peer)
 
         # keep track of the director
@@ -773,10 +842,10 @@ class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugCo
 
     _debug_contents = ('port', 'idle_timeout', 'actorClass', 'servers')
 
-    def __init__(self, address, listeners=5, idle_timeout=0, reuse=False, actorClass=TCPServerActor, cid=None, sapID=None):
+    def __init__(self, address, listeners=5, idle_timeout=0, reuse=False, actorClass=TCPServerActor, rcvbuf=None, sndbuf=None, cid=None, sapID=None):
         if _debug:
-            TCPServerDirector._debug("__init__ %r listeners=%r idle_timeout=%r reuse=%r actorClass=%r cid=%r sapID=%r"
-                , address, listeners, idle_timeout, reuse, actorClass, cid, sapID
+            TCPServerDirector._debug("__init__ %r listeners=%r idle_timeout=%r reuse=%r actorClass=%r rcvbuf=%r sndbuf=%r cid=%r sapID=%r"
+                , address, listeners, idle_timeout, reuse, actorClass, rcvbuf, sndbuf, cid, sapID
                 )
         Server.__init__(self, cid)
         ServiceAccessPoint.__init__(self, sapID)
@@ -793,6 +862,9 @@ class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugCo
         # start with an empty pool of servers
         self.servers = {}
 
+        # the actors count their traffic here
+        self.metrics = TransportMetrics()
+
         # continue with initialization
         asyncore.dispatcher.__init__(self)
 
@@ -801,6 +873,16 @@ class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugCo
         if reuse:
             self.set_reuse_addr()
 
+        # set the buffer sizes, accepted connections inherit them and the
+        # kernel may adjust them
+        if rcvbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        if sndbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        self.rcvbuf = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        self.sndbuf = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        if _debug: TCPServerDirector._debug("    - rcvbuf, sndbuf: %r, %r", self.rcvbuf, self.sndbuf)
+
         # try to bind, keep trying for a while if its already in use
         hadBindErrors = False
         for i in range(30):
@@ -828,6 +910,7 @@ class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugCo
             client, addr = self.accept()
         except socket.error:
             TCPServerDirector._warning('accept() threw an exception')
+            self.metrics.error()
             return
         except TypeError:
             TCPServerDirector._warning('accept() threw EWOULDBLOCK')
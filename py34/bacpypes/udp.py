@@ -4,24 +4,32 @@
 UDP Communications Module
 """
 
+import sys
 import asyncore
+import errno
 import socket
+import struct
 import pickle
-import queue
 
 from time import time as _time
+from collections import deque
 
 from .debugging import ModuleLogger, bacpypes_debugging
 
-from .core import deferred
+from .core import deferred, dispatcher_changed
 from .task import FunctionTask
 from .comm import PDU, Server
 from .comm import ServiceAccessPoint
+from .metrics import Histogram, TransportMetrics, DEPTH_BOUNDS
 
 # some debugging
 _debug = 0
 _log = ModuleLogger(globals())
 
+# Linux reports the number of datagrams dropped because the socket receive
+# buffer was full with this option
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40 if sys.platform.startswith('linux') else None)
+
 #
 #   UDPActor
 #
@@ -41,11 +49,14 @@ class UDPActor:
         # associated with a peer
         self.peer = peer
 
-        # add a timer
+        # add a timer, it is not rescheduled for each PDU, when it fires
+        # it checks the time of the last one
         self.timeout = director.timeout
+        self.lastActivity = _time()
         if self.timeout > 0:
             self.timer = FunctionTask(self.idle_timeout)
-            self.timer.install_task(_time() + self.timeout)
+            self.timer.taskCoarse = True
+            self.timer.install_task(self.lastActivity + self.timeout)
         else:
             self.timer = None
 
@@ -55,25 +66,32 @@ class UDPActor:
     def idle_timeout(self):
         if _debug: UDPActor._debug("idle_timeout")
 
+        # there has been traffic since the timer was installed
+        when = self.lastActivity + self.timeout
+        if when > _time():
+            if _debug: UDPActor._debug("    - still active")
+            self.timer.install_task(when)
+            return
+
         # tell the director this is gone
         self.director.del_actor(self)
 
     def indication(self, pdu):
         if _debug: UDPActor._debug("indication %r", pdu)
 
-        # reschedule the timer
-        if self.timer:
-            self.timer.install_task(_time() + self.timeout)
+        # the timer checks this when it fires
+        self.lastActivity = _time()
 
         # put it in the outbound queue for the director
-        self.director.request.put(pdu)
+        self.director.request.append(pdu)
+        self.director.metrics.queued(len(self.director.request))
+        dispatcher_changed(self.director)
 
     def response(self, pdu):
         if _debug: UDPActor._debug("response %r", pdu)
 
-        # reschedule the timer
-        if self.timer:
-            self.timer.install_task(_time() + self.timeout)
+        # the timer checks this when it fires
+        self.lastActivity = _time()
 
         # process this as a response from the director
         self.director.response(pdu)
@@ -118,6 +136,64 @@ class UDPPickleActor(UDPActor):
         # continue as usual
         UDPActor.response(self, pdu)
 
+#
+#   BufferPool
+#
+#   Datagrams are read into these buffers and the PDUs refer to them with a
+#   memoryview, so decoding does not copy the octets.  The director returns
+#   a buffer to the pool when the PDUs read into it have been routed, so
+#   anything that keeps one of those PDUs longer should copy its data first.
+#   A buffer that is still referenced by a view is left to it rather than
+#   reused.
+#
+
+@bacpypes_debugging
+class BufferPool:
+
+    def __init__(self, size=2048, count=64):
+        """Pool up to count buffers of size octets, larger datagrams are
+        truncated so size should be at least the largest expected."""
+        if _debug: BufferPool._debug("__init__ size=%r count=%r", size, count)
+
+        self.size = size
+        self.count = count
+
+        self.buffers = []
+        self.allocated = 0
+
+        # number of buffers allocated when every pooled one was in use, and
+        # the number returned while they were still referenced
+        self.misses = 0
+        self.kept = 0
+
+    def get(self):
+        """Return a free buffer, the caller gives it back with put()."""
+        if self.buffers:
+            return self.buffers.pop()
+
+        if self.allocated < self.count:
+            self.allocated += 1
+        else:
+            self.misses += 1
+        if _debug: BufferPool._debug("    - new buffer, %d allocated", self.allocated)
+
+        return bytearray(self.size)
+
+    def put(self, buff):
+        """Return a buffer from get() when its PDUs are finished."""
+        try:
+            # a buffer cannot be resized while there are views of it
+            buff.append(0)
+        except BufferError:
+            if _debug: BufferPool._debug("    - buffer kept")
+            self.kept += 1
+            self.allocated -= 1
+            return
+        del buff[-1]
+
+        if len(self.buffers) < self.count:
+            self.buffers.append(buff)
+
 #
 #   UDPDirector
 #
@@ -125,8 +201,8 @@ class UDPPickleActor(UDPActor):
 @bacpypes_debugging
 class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
 
-    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None):
-        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r", address, timeout, reuse, actorClass, sid, sapID)
+    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, batch=1, pool=None, rcvbuf=None, sndbuf=None, sid=None, sapID=None):
+        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r batch=%r pool=%r rcvbuf=%r sndbuf=%r sid=%r sapID=%r", address, timeout, reuse, actorClass, batch, pool, rcvbuf, sndbuf, sid, sapID)
         Server.__init__(self, sid)
         ServiceAccessPoint.__init__(self, sapID)
 
@@ -141,6 +217,22 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # save the address
         self.address = address
 
+        # the most datagrams read each time the socket is readable, and
+        # how many were read when there can be more than one
+        self.batch = batch
+        self.readBatches = Histogram(DEPTH_BOUNDS)
+
+        # datagrams are read into buffers from this pool when there is one
+        self.pool = pool
+
+        # how many datagrams were sent each time the socket was writable,
+        # and how many times the socket buffer was full
+        self.writeBatches = Histogram(DEPTH_BOUNDS)
+        self.writeBlocked = 0
+
+        # count the traffic
+        self.metrics = TransportMetrics()
+
         asyncore.dispatcher.__init__(self)
 
         # ask the dispatcher for a socket
@@ -157,8 +249,27 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # allow it to send broadcasts
         self.socket.setsockopt( socket.SOL_SOCKET, socket.SO_BROADCAST, 1 )
 
-        # create the request queue
-        self.request = queue.Queue()
+        # set the buffer sizes, the kernel may adjust them
+        if rcvbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        if sndbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        self.rcvbuf = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        self.sndbuf = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        if _debug: UDPDirector._debug("    - rcvbuf, sndbuf: %r, %r", self.rcvbuf, self.sndbuf)
+
+        # ask for the number of dropped datagrams with each one received
+        self._ancbufsize = 0
+        if SO_RXQ_OVFL is not None:
+            try:
+                self.socket.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+                self._ancbufsize = socket.CMSG_SPACE(4)
+                self.metrics.kernelDrops = 0
+            except socket.error as err:
+                if _debug: UDPDirector._debug("    - no receive queue overflow: %s", err)
+
+        # create the request queue, any thread can append to it
+        self.request = deque()
 
         # start with an empty peer pool
         self.peers = {}
@@ -202,12 +313,50 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
     def handle_read(self):
         if _debug: UDPDirector._debug("handle_read")
 
-        try:
-            msg, addr = self.socket.recvfrom(65536)
-            if _debug: UDPDirector._debug("    - received %d octets from %s", len(msg), addr)
+        metrics = self.metrics
+        ancbufsize = self._ancbufsize
 
-            # send the PDU up to the client
-            deferred(self._response, PDU(msg, source=addr))
+        pdus = []
+        buffers = []
+        try:
+            # the socket does not block, read until there are no more
+            # datagrams or the batch is full, truncated datagrams count
+            for i in range(self.batch):
+                if self.pool:
+                    buff = self.pool.get()
+                    try:
+                        if ancbufsize:
+                            nbytes, ancdata, flags, addr = self.socket.recvmsg_into([buff], ancbufsize)
+                            if ancdata:
+                                self._kernel_drops(ancdata)
+                        else:
+                            nbytes, addr = self.socket.recvfrom_into(buff)
+                    except:
+                        self.pool.put(buff)
+                        raise
+                    if _debug: UDPDirector._debug("    - received %d octets from %s", nbytes, addr)
+
+                    metrics.received(addr, nbytes)
+
+                    if nbytes >= len(buff):
+                        UDPDirector._warning("datagram from %s truncated", addr)
+                        self.pool.put(buff)
+                        continue
+
+                    buffers.append(buff)
+                    msg = memoryview(buff)[:nbytes]
+                else:
+                    if ancbufsize:
+                        msg, ancdata, flags, addr = self.socket.recvmsg(65536, ancbufsize)
+                        if ancdata:
+                            self._kernel_drops(ancdata)
+                    else:
+                        msg, addr = self.socket.recvfrom(65536)
+                    if _debug: UDPDirector._debug("    - received %d octets from %s", len(msg), addr)
+
+                    metrics.received(addr, len(msg))
+
+                pdus.append(PDU(msg, source=addr))
 
         except socket.timeout as err:
             if _debug: UDPDirector._debug("    - socket timeout: %s", err)
@@ -217,35 +366,74 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
                 pass
             else:
                 if _debug: UDPDirector._debug("    - socket error: %s", err)
+                metrics.error()
 
                 # pass along to a handler
                 self.handle_error(err)
 
+        if self.batch > 1:
+            self.readBatches.record(len(pdus))
+
+        # send the PDUs up to the client
+        if buffers:
+            deferred(self._response_pooled, pdus, buffers)
+        elif len(pdus) == 1:
+            deferred(self._response, pdus[0])
+        elif pdus:
+            deferred(self._response_batch, pdus)
+
+    def _kernel_drops(self, ancdata):
+        # the option value is the running total for the socket
+        for level, kind, data in ancdata:
+            if (level == socket.SOL_SOCKET) and (kind == SO_RXQ_OVFL):
+                self.metrics.kernelDrops = struct.unpack('=I', data[:4])[0]
+                if _debug: UDPDirector._debug("    - kernel drops: %d", self.metrics.kernelDrops)
+
     def writable(self):
         """Return true iff there is a request pending."""
-        return (not self.request.empty())
+        return (len(self.request) != 0)
 
     def handle_write(self):
-        """get a PDU from the queue and send it."""
+        """Send the PDUs in the queue until it is empty or the socket
+        buffer is full."""
         if _debug: UDPDirector._debug("handle_write")
 
-        try:
-            pdu = self.request.get()
+        request = self.request
+        metrics = self.metrics
+        count = 0
+        while request:
+            pdu = request.popleft()
 
-            sent = self.socket.sendto(pdu.pduData, pdu.pduDestination)
-            if _debug: UDPDirector._debug("    - sent %d octets to %s", sent, pdu.pduDestination)
+            try:
+                sent = self.socket.sendto(pdu.pduData, pdu.pduDestination)
+                if _debug: UDPDirector._debug("    - sent %d octets to %s", sent, pdu.pduDestination)
 
-        except socket.error as err:
-            if _debug: UDPDirector._debug("    - socket error: %s", err)
+                metrics.sent(pdu.pduDestination, sent)
+                count += 1
 
-            # get the peer
-            peer = self.peers.get(pdu.pduDestination, None)
-            if peer:
-                # let the actor handle the error
-                peer.handle_error(err)
-            else:
-                # let the director handle the error
-                self.handle_error(err)
+            except socket.error as err:
+                if err.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    if _debug: UDPDirector._debug("    - socket buffer full, %d pending", len(request) + 1)
+
+                    # try again when the socket is writable
+                    request.appendleft(pdu)
+                    self.writeBlocked += 1
+                    break
+
+                if _debug: UDPDirector._debug("    - socket error: %s", err)
+                metrics.error(pdu.pduDestination)
+
+                # get the peer
+                peer = self.peers.get(pdu.pduDestination, None)
+                if peer:
+                    # let the actor handle the error
+                    peer.handle_error(err)
+                else:
+                    # let the director handle the error
+                    self.handle_error(err)
+
+        self.writeBatches.record(count)
+        metrics.queueDepth = len(request)
 
     def close_socket(self):
         """Close the socket."""
@@ -294,3 +482,24 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
 
         # send the message
         peer.response(pdu)
+
+    def _response_batch(self, pdus):
+        """Incoming datagrams read together are routed one at a time."""
+        if _debug: UDPDirector._debug("_response_batch %r", len(pdus))
+
+        for pdu in pdus:
+            try:
+                self._response(pdu)
+            except Exception as err:
+                UDPDirector._exception("response error: %r", err)
+
+    def _response_pooled(self, pdus, buffers):
+        """Route the datagrams read into pooled buffers and return them."""
+        if _debug: UDPDirector._debug("_response_pooled %r %r", len(pdus), len(buffers))
+
+        self._response_batch(pdus)
+
+        # release the views of the buffers before they go back
+        del pdus[:]
+        for buff in buffers:
+            self.pool.put(buff)
@@ -22,6 +22,7 @@ from . import test_utilities
 from . import test_vlan
 
 from . import test_bvll
+from . import test_udp
 
 from . import test_service
 
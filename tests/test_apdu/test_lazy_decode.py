@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Lazy APDU Decoding
+-----------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.errors import DecodingError, InvalidTag
+from bacpypes.apdu import ConfirmedRequestPDU, UnconfirmedRequestPDU, \
+    ReadPropertyRequest, WhoHasRequest
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def read_property_request(data):
+    """Return a confirmed request PDU with the header of a ReadProperty
+    request and the data."""
+    apdu = ConfirmedRequestPDU(ReadPropertyRequest.serviceChoice)
+    apdu.apduInvokeID = 12
+    apdu.put_data(data)
+    return apdu
+
+
+@bacpypes_debugging
+class TestLazyDecode(unittest.TestCase):
+
+    def test_lazy_decode(self):
+        if _debug: TestLazyDecode._debug("test_lazy_decode")
+
+        # analogInput:1, presentValue
+        apdu = read_property_request(xtob('0c000000011955'))
+
+        request = ReadPropertyRequest()
+        request.lazy_decode(apdu)
+        if _debug: TestLazyDecode._debug("    - request: %r", request)
+
+        # the header is decoded, the elements are not
+        assert request.apduInvokeID == 12
+        assert request._lazy_data is not None
+        assert 'objectIdentifier' not in request.__dict__
+
+        # referencing an element decodes all of them
+        assert request.propertyIdentifier == 'presentValue'
+        assert request.objectIdentifier == ('analogInput', 1)
+        assert request.propertyArrayIndex is None
+        assert request._lazy_data is None
+
+        # other attributes are not found
+        with self.assertRaises(AttributeError):
+            request.some_attribute
+
+    def test_lazy_decode_error(self):
+        if _debug: TestLazyDecode._debug("test_lazy_decode_error")
+
+        # the object identifier is application tagged
+        apdu = read_property_request(xtob('c4000000011955'))
+
+        # no error until an element is referenced
+        request = ReadPropertyRequest()
+        request.lazy_decode(apdu)
+
+        with self.assertRaises(InvalidTag):
+            request.objectIdentifier
+
+        # and again, the data is kept
+        with self.assertRaises(InvalidTag):
+            request.propertyIdentifier
+
+    def test_lazy_decode_missing_choice(self):
+        if _debug: TestLazyDecode._debug("test_lazy_decode_missing_choice")
+
+        # context tag 4 is neither choice of the object
+        apdu = UnconfirmedRequestPDU(WhoHasRequest.serviceChoice)
+        apdu.put_data(xtob('4a0001'))
+
+        request = WhoHasRequest()
+        request.lazy_decode(apdu)
+
+        # a decoding error, not a missing attribute
+        with self.assertRaises(DecodingError):
+            request.object
+
+        # nothing is left partly decoded
+        assert 'limits' not in request.__dict__
+        with self.assertRaises(DecodingError):
+            request.limits
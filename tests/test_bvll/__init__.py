@@ -9,3 +9,4 @@ from . import test_simple
 from . import test_foreign
 from . import test_bbmd
 
+from . import test_shard
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Shard Steering
+-------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.comm import bind
+from bacpypes.pdu import Address
+from bacpypes.bvll import ForwardedNPDU, OriginalBroadcastNPDU, OriginalUnicastNPDU
+from bacpypes.shard import ShardSteering, initiating_device, shard_address, shard_of
+
+from ..trapped_classes import TrappedClient, TrappedServer
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# I-Am from device 5, an unconfirmed COV notification from device 7 and
+# a Who-Is, each with an NPCI
+i_am_5 = xtob('01.00.10.00.c4.02000005.22.0400.91.00.21.0f')
+cov_7 = xtob('01.00.10.02.09.01.1c.02000007.2c.00000001')
+who_is = xtob('01.00.10.08')
+
+# a confirmed request with an invalid maximum APDU length
+bad_request = xtob('01.04.00.0f.01.0c.0c.02000005.19.4d')
+
+
+@bacpypes_debugging
+class TestShardSteering(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestShardSteering._debug("setup_method %r", method)
+
+        # three shards, the primary is the first
+        self.addresses = [shard_address('192.168.0.10/24', i) for i in range(3)]
+
+        # minature trapped stack
+        self.client = TrappedClient()
+        self.steering = ShardSteering(self.addresses)
+        self.server = TrappedServer()
+        bind(self.client, self.steering, self.server)
+
+        self.source = Address('192.168.0.20')
+
+    def test_shard_address(self):
+        if _debug: TestShardSteering._debug("test_shard_address")
+
+        assert self.addresses[0] == Address('192.168.0.10')
+        assert self.addresses[2] == Address('192.168.0.10:47810')
+        assert shard_of(5, 3) == 2
+
+    def test_initiating_device(self):
+        if _debug: TestShardSteering._debug("test_initiating_device")
+
+        assert initiating_device(OriginalBroadcastNPDU(i_am_5)) == 5
+        assert initiating_device(OriginalUnicastNPDU(cov_7)) == 7
+        assert initiating_device(OriginalBroadcastNPDU(who_is)) is None
+        assert initiating_device(OriginalBroadcastNPDU(xtob('01.00.10'))) is None
+        assert initiating_device(OriginalUnicastNPDU(bad_request)) is None
+
+    def test_steer_i_am(self):
+        if _debug: TestShardSteering._debug("test_steer_i_am")
+
+        self.server.response(OriginalBroadcastNPDU(i_am_5, source=self.source))
+
+        # forwarded to shard 2 with the real source, not processed here
+        pdu = self.server.indication_received
+        assert isinstance(pdu, ForwardedNPDU)
+        assert pdu.pduDestination == self.addresses[2]
+        assert pdu.bvlciAddress == self.source
+        assert pdu.pduData == i_am_5
+        assert self.client.confirmation_received is None
+
+    def test_primary_cov(self):
+        if _debug: TestShardSteering._debug("test_primary_cov")
+
+        # device 6 belongs to the primary
+        cov_6 = xtob('01.00.10.02.09.01.1c.02000006')
+        self.server.response(OriginalUnicastNPDU(cov_6, source=self.source))
+
+        assert self.server.indication_received is None
+        assert isinstance(self.client.confirmation_received, OriginalUnicastNPDU)
+
+    def test_malformed_request(self):
+        if _debug: TestShardSteering._debug("test_malformed_request")
+
+        # not steered, the primary handles it as usual
+        self.server.response(OriginalUnicastNPDU(bad_request, source=self.source))
+        assert self.server.indication_received is None
+        assert self.client.confirmation_received.pduData == bad_request
+
+    def test_fanout(self):
+        if _debug: TestShardSteering._debug("test_fanout")
+
+        # processed by the primary only
+        self.server.response(OriginalBroadcastNPDU(who_is, source=self.source))
+        assert self.server.indication_received is None
+        assert isinstance(self.client.confirmation_received, OriginalBroadcastNPDU)
+
+        # also sent to every shard
+        self.steering.fanout = True
+        self.server.response(OriginalBroadcastNPDU(who_is, source=self.source))
+        assert self.server.indication_received.pduDestination == self.addresses[2]
+        assert self.server.indication_received.bvlciAddress == self.source
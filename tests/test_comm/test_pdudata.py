@@ -1 +1,147 @@
-# placeholder
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+BACpypes PDUData Testing
+------------------------
+"""
+
+import sys
+import unittest
+
+from bacpypes.errors import DecodingError
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes.comm import PDUData
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestPDUData(unittest.TestCase):
+
+    def test_get(self):
+        if _debug: TestPDUData._debug("test_get")
+
+        pdu = PDUData(xtob('01020304050607'))
+        assert pdu.get() == 1
+        assert pdu.get_short() == 0x0203
+        assert pdu.get_long() == 0x04050607
+        assert pdu.remaining() == 0
+
+        with self.assertRaises(DecodingError):
+            pdu.get()
+
+    def test_get_data(self):
+        if _debug: TestPDUData._debug("test_get_data")
+
+        pdu = PDUData(xtob('0102030405'))
+        assert pdu.get_data(2) == xtob('0102')
+        assert pdu.remaining() == 3
+
+        # the attribute is what has not been decoded yet
+        assert pdu.pduData == xtob('030405')
+        assert pdu.get() == 3
+        assert pdu.pduData == xtob('0405')
+
+        with self.assertRaises(DecodingError):
+            pdu.get_data(3)
+        with self.assertRaises(DecodingError):
+            pdu.get_long()
+
+    def test_put_after_get(self):
+        if _debug: TestPDUData._debug("test_put_after_get")
+
+        pdu = PDUData(xtob('0102'))
+        assert pdu.get() == 1
+
+        pdu.put(3)
+        pdu.put_short(0x0405)
+        assert pdu.pduData == xtob('02030405')
+
+    def test_take_data(self):
+        if _debug: TestPDUData._debug("test_take_data")
+
+        pdu = PDUData(xtob('01020304'))
+        assert pdu.get() == 1
+
+        other = PDUData()
+        other.take_data(pdu)
+        assert pdu.remaining() == 0
+        assert pdu.pduData == xtob('')
+
+        assert other.remaining() == 3
+        assert other.get() == 2
+        assert other.pduData == xtob('0304')
+
+    def test_put_pdu(self):
+        if _debug: TestPDUData._debug("test_put_pdu")
+
+        # data with room for headers
+        body = PDUData()
+        body.reserve(8)
+        body.put_data(xtob('0304'))
+        assert body.remaining() == 2
+
+        # header written in front
+        pdu = PDUData()
+        pdu.put_data(xtob('0102'))
+        pdu.put_pdu(body)
+        assert pdu.pduData == xtob('01020304')
+
+        # the body is unchanged and can be sent again
+        other = PDUData()
+        other.put_data(xtob('05'))
+        other.put_pdu(body)
+        assert other.pduData == xtob('050304')
+        assert pdu.pduData == xtob('01020304')
+
+    def test_put_pdu_shared(self):
+        if _debug: TestPDUData._debug("test_put_pdu_shared")
+
+        body = PDUData()
+        body.reserve(8)
+        body.put_data(xtob('0304'))
+
+        # copy constructor shares the data
+        pdu = PDUData(body)
+        assert pdu.remaining() == 2
+
+        # changing one does not change the other
+        pdu.put(5)
+        body.put(6)
+        assert pdu.pduData == xtob('030405')
+        assert body.pduData == xtob('030406')
+
+    @unittest.skipIf(sys.version_info[0] < 3, "receive buffers are Python 3 only")
+    def test_memoryview(self):
+        if _debug: TestPDUData._debug("test_memoryview")
+
+        # a view of a receive buffer is decoded in place
+        buff = bytearray(xtob('0102030405'))
+        pdu = PDUData(memoryview(buff)[:4])
+        assert pdu.peek() == 1
+        assert pdu.get() == 1
+
+        # decoded data is a copy
+        data = pdu.get_data(2)
+        assert isinstance(data, bytearray)
+        assert data == xtob('0203')
+
+        # changing it copies the rest and leaves the buffer alone
+        pdu.put(6)
+        assert pdu.pduData == xtob('0406')
+        assert buff == xtob('0102030405')
+
+    @unittest.skipIf(sys.version_info[0] < 3, "receive buffers are Python 3 only")
+    def test_copy_view(self):
+        if _debug: TestPDUData._debug("test_copy_view")
+
+        # the rest of a view is copied so the buffer can be reused
+        buff = bytearray(xtob('0102030405'))
+        pdu = PDUData(memoryview(buff)[:4])
+        pdu.get()
+        pdu.copy_view()
+        buff[:] = xtob('0000000000')
+        assert pdu.get_data(3) == xtob('020304')
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Constructed Data Codecs
+----------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.errors import MissingRequiredParameter, InvalidTag
+from bacpypes.primitivedata import Boolean, Integer, Unsigned, ClosingTag, \
+    TagList
+from bacpypes.constructeddata import Element, Sequence, SequenceOf, Choice, \
+    compile_codec, _codec_map
+
+from bacpypes.apdu import ReadPropertyMultipleACK, ReadAccessResult
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class CodecChoice(Choice):
+    choiceElements = [
+        Element('neon', Integer, 0),
+        Element('sodium', Boolean, 1),
+        ]
+
+class CodecSequence(Sequence):
+    sequenceElements = [
+        Element('hydrogen', Boolean),
+        Element('helium', Unsigned, 0, True),
+        Element('lithium', SequenceOf(Integer), 1),
+        Element('beryllium', CodecChoice, 2, True),
+        ]
+
+class UntaggedChoice(Choice):
+    choiceElements = [
+        Element('boron', CodecSequence),
+        ]
+
+
+def interpreted(cls, fn):
+    """Call a function with the codec for a class removed."""
+    codec = _codec_map.pop(cls)
+    try:
+        return fn()
+    finally:
+        _codec_map[cls] = codec
+
+
+@bacpypes_debugging
+class TestCodec(unittest.TestCase):
+
+    def test_compile(self):
+        if _debug: TestCodec._debug("test_compile")
+
+        # the element classes have codecs too
+        assert compile_codec(CodecSequence) is not None
+        assert _codec_map[CodecChoice] is not None
+        assert _codec_map[SequenceOf(Integer)] is not None
+
+        # registered classes are compiled
+        assert _codec_map[ReadPropertyMultipleACK] is not None
+        assert _codec_map[ReadAccessResult] is not None
+
+        # choices that must be interpreted
+        assert compile_codec(UntaggedChoice) is None
+
+    def test_encode(self):
+        if _debug: TestCodec._debug("test_encode")
+        compile_codec(CodecSequence)
+
+        for seq in (
+                CodecSequence(hydrogen=True, lithium=[1, 2]),
+                CodecSequence(hydrogen=False, helium=3, lithium=[],
+                    beryllium=CodecChoice(sodium=True)),
+                ):
+            tag_list = TagList()
+            seq.encode(tag_list)
+            if _debug: TestCodec._debug("    - tag_list: %r", tag_list)
+
+            # same tags as the interpreted encoder
+            other_list = TagList()
+            interpreted(CodecSequence, lambda: seq.encode(other_list))
+            assert tag_list.tagList == other_list.tagList
+
+            # decode it
+            new_seq = CodecSequence()
+            new_seq.decode(tag_list)
+            if _debug: TestCodec._debug("    - new_seq: %r", new_seq)
+
+            assert new_seq.hydrogen == seq.hydrogen
+            assert new_seq.helium == seq.helium
+            assert new_seq.lithium == seq.lithium
+            if seq.beryllium:
+                assert new_seq.beryllium.sodium == seq.beryllium.sodium
+                assert new_seq.beryllium.neon is None
+
+    def test_errors(self):
+        if _debug: TestCodec._debug("test_errors")
+        compile_codec(CodecSequence)
+
+        # missing required element
+        with self.assertRaises(MissingRequiredParameter):
+            CodecSequence(hydrogen=True).encode(TagList())
+
+        # wrong type of structure
+        with self.assertRaises(TypeError):
+            CodecSequence(hydrogen=True, lithium=[], beryllium=12).encode(TagList())
+
+        # list with the wrong closing tag
+        tag_list = TagList()
+        CodecSequence(hydrogen=True, lithium=[1]).encode(tag_list)
+        tag_list.tagList[-1] = ClosingTag(3)
+        with self.assertRaises(InvalidTag):
+            CodecSequence().decode(tag_list)
+
+        # choice not found
+        with self.assertRaises(AttributeError):
+            CodecChoice().decode(TagList())
@@ -12,3 +12,4 @@ from . import test_iocontroller
 from . import test_ioqcontroller
 from . import test_clientcontroller
 from . import test_sieveclientcontroller
+from . import test_deferred
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Deferred IOCB
+------------------
+"""
+
+import unittest
+import threading
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.iocb import COMPLETED, ABORTED, deferred_iocb
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestDeferredIOCB(unittest.TestCase):
+
+    def test_deferred_complete(self):
+        if _debug: TestDeferredIOCB._debug("test_deferred_complete")
+
+        # not called until the core runs
+        iocb = deferred_iocb(pow, 2, 10)
+        assert not iocb.ioComplete.isSet()
+
+        reset_time_machine()
+        run_time_machine(1.0)
+
+        assert iocb.ioState == COMPLETED
+        assert iocb.ioResponse == 1024
+
+    def test_deferred_abort(self):
+        if _debug: TestDeferredIOCB._debug("test_deferred_abort")
+
+        # the exception is the error
+        iocb = deferred_iocb(int, 'x')
+
+        reset_time_machine()
+        run_time_machine(1.0)
+
+        assert iocb.ioState == ABORTED
+        assert isinstance(iocb.ioError, ValueError)
+
+    def test_deferred_threads(self):
+        if _debug: TestDeferredIOCB._debug("test_deferred_threads")
+
+        calls = []
+        iocbs = []
+
+        def submit(n):
+            for i in range(100):
+                iocbs.append(deferred_iocb(calls.append, (n, i)))
+
+        # lots of threads at the same time
+        threads = [threading.Thread(target=submit, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reset_time_machine()
+        run_time_machine(1.0)
+
+        # all called once, in order for each thread
+        assert len(calls) == 2000
+        for n in range(20):
+            assert [i for m, i in calls if m == n] == list(range(100))
+        assert all(iocb.ioState == COMPLETED for iocb in iocbs)
@@ -6,11 +6,13 @@ Nose Test PDU Address
 ---------------------
 """
 
+import copy
 import unittest
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes import pdu
 from bacpypes.pdu import Address, LocalStation, RemoteStation, \
-    LocalBroadcast, RemoteBroadcast, GlobalBroadcast
+    LocalBroadcast, RemoteBroadcast, GlobalBroadcast, _address_cache
 
 # some debugging
 _debug = 0
@@ -520,3 +522,92 @@ class TestAddressEquality(unittest.TestCase, MatchAddressMixin):
         assert Address(u"5:*") == RemoteBroadcast(5)
         assert Address(u"*:*") == GlobalBroadcast()
 
+
+@bacpypes_debugging
+class TestAddressCache(unittest.TestCase, MatchAddressMixin):
+
+    def test_address_cache(self):
+        if _debug: TestAddressCache._debug("test_address_cache")
+
+        # addresses built from the same arguments are parsed once
+        test_addr = Address("1:192.168.0.10:47809")
+        other_addr = Address("1:192.168.0.10:47809")
+        assert other_addr is not test_addr
+        assert other_addr == test_addr
+        assert test_addr.addrTuple == ('192.168.0.10', 47809)
+
+        # changing one does not change the others
+        mask_addr = Address(('10.0.0.1', 47808))
+        mask_addr.addrMask = 0xFFFFFF00
+        assert Address(('10.0.0.1', 47808)).addrMask == 0xFFFFFFFF
+
+        # copies are not shared
+        copy_addr = copy.deepcopy(test_addr)
+        assert copy_addr is not test_addr
+        assert copy_addr == test_addr
+        assert hash(copy_addr) == hash(test_addr)
+        assert copy_addr.addrTuple == ('192.168.0.10', 47809)
+        assert Address() is not Address()
+
+        # the class of the argument is part of the key
+        assert Address(True) == Address(1)
+        assert (bool, True) in _address_cache
+        assert (int, 1) in _address_cache
+
+        # errors are not cached
+        for i in range(2):
+            with self.assertRaises(ValueError):
+                Address("1:*:2")
+        with self.assertRaises(TypeError):
+            Address(1.5)
+
+    def test_address_interface(self):
+        if _debug: TestAddressCache._debug("test_address_interface")
+
+        class SampleInterfaces:
+            """Stands in for netifaces with one interface."""
+            AF_INET = 2
+            addr = '10.0.0.1'
+
+            def interfaces(self):
+                return ['sample0']
+
+            def ifaddresses(self, interface):
+                return {self.AF_INET: [{'addr': self.addr, 'netmask': '255.255.255.0'}]}
+
+        save_netifaces = pdu.netifaces
+        pdu.netifaces = interfaces = SampleInterfaces()
+        try:
+            # the interface is looked up each time
+            assert Address("sample0:47809").addrTuple == ('10.0.0.1', 47809)
+            interfaces.addr = '10.0.0.2'
+            assert Address("sample0:47809").addrTuple == ('10.0.0.2', 47809)
+            assert (str, "sample0:47809") not in _address_cache
+
+            # other addresses are still cached
+            Address("10.0.0.3")
+            assert (str, "10.0.0.3") in _address_cache
+        finally:
+            pdu.netifaces = save_netifaces
+
+    def test_address_hash(self):
+        if _debug: TestAddressCache._debug("test_address_hash")
+
+        # subclasses have the same hash as the address they match
+        for test_addr, other_addr in (
+                (Address(1), LocalStation(1)),
+                (Address("3:4"), RemoteStation(3, 4)),
+                (Address("*"), LocalBroadcast()),
+                (Address("5:*"), RemoteBroadcast(5)),
+                (Address("*:*"), GlobalBroadcast()),
+                ):
+            assert hash(test_addr) == hash(other_addr)
+            assert test_addr == other_addr
+
+        # addresses compare with the arguments of the constructor
+        test_addr = Address("192.168.0.10")
+        assert test_addr == test_addr
+        assert test_addr == "192.168.0.10"
+        assert test_addr == ("192.168.0.10", 47808)
+        assert test_addr != "192.168.0.11"
+        assert {test_addr: 1}[Address(("192.168.0.10", 47808))] == 1
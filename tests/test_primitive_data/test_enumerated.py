@@ -159,6 +159,32 @@ class TestEnumerated(unittest.TestCase):
         obj2 = Enumerated(obj1)
         assert obj2.value == 12
 
+    def test_enumerated_table(self):
+        if _debug: TestEnumerated._debug("test_enumerated_table")
+
+        # the table is built when the class is created
+        assert QuickBrownFox.__dict__['_xlate_table']['fox'] == 2
+        assert QuickBrownFox.fox == 2
+
+        # names are translated when they are referenced
+        obj = QuickBrownFox(enumerated_tag('01'))
+        assert obj.get_long() == 1
+        assert obj.value == 'brown'
+
+        # compared with the names or numbers, hashed with the numbers
+        assert obj == 'brown'
+        assert obj == 1
+        assert obj == QuickBrownFox('brown')
+        assert hash(obj) == hash(1) == hash(QuickBrownFox('brown'))
+        assert {1: 'brown'}[obj] == 'brown'
+        assert obj in set([QuickBrownFox('brown')])
+
+        # the value can be changed by name or number
+        obj.value = 'fox'
+        assert obj.get_long() == 2
+        obj.value = 0
+        assert obj.value == 'quick'
+
     def test_enumerated_endec(self):
         if _debug: TestEnumerated._debug("test_enumerated_endec")
 
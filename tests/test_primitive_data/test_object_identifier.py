@@ -134,6 +134,32 @@ class TestObjectIdentifier(unittest.TestCase):
         obj2 = ObjectIdentifier(obj1)
         assert obj2.value == ('analogInput', 1)
 
+    def test_object_identifier_long(self):
+        if _debug: TestObjectIdentifier._debug("test_object_identifier_long")
+
+        # the packed value is kept
+        obj = ObjectIdentifier(('device', 12))
+        assert obj.get_long() == (8 << 22) + 12
+        assert obj.get_tuple() == (8, 12)
+        assert obj.value == ('device', 12)
+
+        # compared and hashed with tuples
+        assert obj == ('device', 12)
+        assert obj == (8, 12)
+        assert obj == ObjectIdentifier((8 << 22) + 12)
+        assert obj != ('device', 13)
+        assert {('device', 12): 1}[obj] == 1
+
+        # unknown types are kept as integers
+        obj = ObjectIdentifier(200, 1)
+        assert obj.value == (200, 1)
+
+        # the value is checked when it is changed
+        obj.value = ('analogValue', 3)
+        assert obj.get_long() == (2 << 22) + 3
+        with self.assertRaises(ValueError):
+            obj.value = ('unknownType', 1)
+
     def test_object_identifier_endec(self):
         if _debug: TestObjectIdentifier._debug("test_object_identifier_endec")
 
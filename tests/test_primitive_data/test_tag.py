@@ -528,6 +528,83 @@ class TestTagList(unittest.TestCase):
         if _debug: TestTagList._debug("    - context_3: %r", context_3)
         assert taglist.get_context(3) is None
 
+    def test_cursor(self):
+        """Test taking tags off the front and putting them back.
+        """
+        if _debug: TestTagList._debug("test_cursor")
+
+        tags = [IntegerTag(i) for i in range(4)]
+        taglist = TagList(tags[:])
+
+        assert taglist.Pop() == tags[0]
+        assert taglist.Pop() == tags[1]
+        assert len(taglist) == 2
+        assert taglist[0] == tags[2]
+        assert taglist.tagList == tags[2:]
+
+        # save the position and take the rest
+        state = taglist.save_state()
+        assert taglist.Pop() == tags[2]
+        assert taglist.Pop() == tags[3]
+        assert taglist.Pop() is None
+        assert taglist.Peek() is None
+        assert len(taglist) == 0
+
+        # put back the last one, then everything since the save
+        taglist.push(tags[3])
+        assert taglist.tagList == tags[3:]
+        taglist.restore_state(state)
+        assert taglist.tagList == tags[2:]
+
+        # push something that was not popped
+        taglist.push(tags[0])
+        assert taglist.tagList == [tags[0]] + tags[2:]
+
+    def test_cursor_index(self):
+        """Test indexing and iterating from the cursor.
+        """
+        if _debug: TestTagList._debug("test_cursor_index")
+
+        tags = [IntegerTag(i) for i in range(4)]
+        taglist = TagList(tags[:])
+        taglist.Pop()
+
+        assert taglist[0] == tags[1]
+        assert taglist[-1] == tags[3]
+        assert taglist[1:] == tags[2:]
+        assert list(taglist) == tags[1:]
+        with self.assertRaises(IndexError):
+            taglist[3]
+        with self.assertRaises(IndexError):
+            taglist[-4]
+
+    def test_get_context_cursor(self):
+        """Test extracting context encoded content after tags are popped.
+        """
+        if _debug: TestTagList._debug("test_get_context_cursor")
+
+        tag_list_data = [
+            ContextTag(0, xtob('00')),
+            OpeningTag(1),
+            ContextTag(0, xtob('01')),
+            ClosingTag(1),
+            ContextTag(0, xtob('02')),
+            ClosingTag(2),
+        ]
+        taglist = TagList(tag_list_data)
+
+        # the first match
+        assert taglist.get_context(0) == tag_list_data[0]
+        assert taglist.get_context(1).tagList == tag_list_data[2:3]
+
+        # the search starts at the front of the list
+        taglist.Pop()
+        assert taglist.get_context(0) == tag_list_data[4]
+
+        # a closing tag stops the search
+        with self.assertRaises(InvalidTag):
+            taglist.get_context(2)
+
     def test_endec_0(self):
         """Test empty tag list encoding and decoding.
         """
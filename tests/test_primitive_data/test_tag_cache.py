@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Tag Cache
+--------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.primitivedata import Tag, Boolean, Unsigned, Enumerated, \
+    ObjectIdentifier, ObjectType, CharacterString, cached_tag
+from bacpypes.pdu import PDUData
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def tag_encode(tag):
+    """Return the octets of a tag."""
+    data = PDUData()
+    tag.encode(data)
+    return data.pduData
+
+
+def atomic_tag(klass, value, context=None):
+    """Return a tag built without the cache."""
+    tag = Tag()
+    klass(value).encode(tag)
+    if context is not None:
+        tag = tag.app_to_context(context)
+    return tag
+
+
+@bacpypes_debugging
+class TestTagCache(unittest.TestCase):
+
+    def test_cached_tag(self):
+        if _debug: TestTagCache._debug("test_cached_tag")
+
+        for klass, value in (
+                (Boolean, True),
+                (Unsigned, 12),
+                (Enumerated, 3),
+                (ObjectType, 'analogValue'),
+                (ObjectIdentifier, ('device', 1)),
+                (CharacterString, 'hello'),
+                ):
+            for context in (None, 2):
+                tag = cached_tag(klass, value, context)
+                if _debug: TestTagCache._debug("    - tag: %r", tag)
+
+                # same tag and same octets
+                other = atomic_tag(klass, value, context)
+                assert tag == other
+                assert tag_encode(tag) == tag_encode(other)
+
+                # same again
+                assert tag_encode(cached_tag(klass, value, context)) == tag_encode(other)
+
+    def test_shared(self):
+        if _debug: TestTagCache._debug("test_shared")
+
+        # the same tag is returned
+        tag = cached_tag(Unsigned, 5, 1)
+        assert cached_tag(Unsigned, 5, 1) is tag
+        assert tag_encode(tag) == xtob('1905')
+
+        # class, context and type of the value are part of the key
+        assert cached_tag(Unsigned, 5) is not tag
+        assert cached_tag(Enumerated, 5, 1) is not tag
+        assert cached_tag(Unsigned, True) is not cached_tag(Unsigned, 1)
+
+    def test_invalid(self):
+        if _debug: TestTagCache._debug("test_invalid")
+
+        # errors are raised every time
+        for i in range(2):
+            with self.assertRaises(ValueError):
+                cached_tag(Unsigned, -1)
@@ -8,4 +8,5 @@ from . import test_cov
 from . import test_device
 from . import test_file
 from . import test_object
+from . import test_executor
 
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Helper Function Executor
+-----------------------------
+"""
+
+import unittest
+import threading
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.apdu import ReadPropertyRequest, ReadPropertyACK, Error, \
+    AbortPDU
+from bacpypes.primitivedata import CharacterString
+from bacpypes.object import register_object_type, ReadableProperty, Object
+
+from bacpypes.service.object import ReadWritePropertyServices
+
+from ..time_machine import run_time_machine
+from .helpers import ApplicationNetwork
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# the threads that ran a helper function or read a property
+helper_threads = []
+
+
+@bacpypes_debugging
+class ThreadExecutor:
+
+    """Run each function in a new thread and wait for it to finish."""
+
+    def submit(self, fn, *args, **kwargs):
+        if _debug: ThreadExecutor._debug("submit %r %r %r", fn, args, kwargs)
+
+        def run():
+            helper_threads.append(threading.current_thread())
+            fn(*args, **kwargs)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+
+@bacpypes_debugging
+class HeldExecutor:
+
+    """Run each function in a new thread that waits until it is released,
+    so the core goes on while the helper function has not finished."""
+
+    def __init__(self):
+        if _debug: HeldExecutor._debug("__init__")
+
+        self.released = threading.Event()
+        self.threads = []
+
+    def submit(self, fn, *args, **kwargs):
+        if _debug: HeldExecutor._debug("submit %r %r %r", fn, args, kwargs)
+
+        def run():
+            self.released.wait()
+            helper_threads.append(threading.current_thread())
+            fn(*args, **kwargs)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        self.threads.append(thread)
+
+    def release(self):
+        if _debug: HeldExecutor._debug("release")
+
+        self.released.set()
+        for thread in self.threads:
+            thread.join()
+
+
+@bacpypes_debugging
+class ShutdownExecutor:
+
+    """Refuse every function like an executor that has been shut down."""
+
+    def submit(self, fn, *args, **kwargs):
+        if _debug: ShutdownExecutor._debug("submit %r %r %r", fn, args, kwargs)
+
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+
+@bacpypes_debugging
+class OffloadedProperty(ReadableProperty):
+
+    offload = True
+
+    def ReadProperty(self, obj, arrayIndex=None):
+        if _debug: OffloadedProperty._debug("ReadProperty %r %r", obj, arrayIndex)
+
+        helper_threads.append(threading.current_thread())
+        return ReadableProperty.ReadProperty(self, obj, arrayIndex)
+
+
+@bacpypes_debugging
+@register_object_type(vendor_id=999)
+class SampleOffloadedDescription(Object):
+
+    objectType = 128
+    properties = [
+        OffloadedProperty('description', CharacterString),
+        ]
+
+    def __init__(self, **kwargs):
+        if _debug: SampleOffloadedDescription._debug("__init__ %r", kwargs)
+        Object.__init__(self, **kwargs)
+
+
+@bacpypes_debugging
+class TestExecutor(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestExecutor._debug("setup_method %r", method)
+        del helper_threads[:]
+
+    def test_offloaded_helper(self):
+        """Test a helper function running in the executor."""
+        if _debug: TestExecutor._debug("test_offloaded_helper")
+
+        # create a network
+        anet = ApplicationNetwork()
+
+        # add the service capability to the IUT, reading properties is
+        # done by the executor
+        anet.iut.add_capability(ReadWritePropertyServices)
+        anet.iut.set_executor(ThreadExecutor(), ['do_ReadPropertyRequest'])
+
+        # read the device object name
+        anet.td.start_state.doc("1-1-0") \
+            .send(ReadPropertyRequest(
+                objectIdentifier=('device', 20),
+                propertyIdentifier='objectName',
+                destination=anet.iut.address,
+                )).doc("1-1-1") \
+            .receive(ReadPropertyACK, pduSource=anet.iut.address).doc("1-1-2") \
+            .success()
+
+        # no IUT application layer matching
+        anet.iut.start_state.success()
+
+        # run the group
+        anet.run()
+
+        # run by another thread
+        assert len(helper_threads) == 1
+        assert helper_threads[0] is not threading.current_thread()
+
+    def test_offloaded_error(self):
+        """Test an error from a helper function running in the executor."""
+        if _debug: TestExecutor._debug("test_offloaded_error")
+
+        # create a network
+        anet = ApplicationNetwork()
+
+        # add the service capability to the IUT
+        anet.iut.add_capability(ReadWritePropertyServices)
+        anet.iut.set_executor(ThreadExecutor(), ['do_ReadPropertyRequest'])
+
+        # read an object that does not exist
+        anet.td.start_state.doc("2-1-0") \
+            .send(ReadPropertyRequest(
+                objectIdentifier=('analogValue', 99),
+                propertyIdentifier='objectName',
+                destination=anet.iut.address,
+                )).doc("2-1-1") \
+            .receive(Error, pduSource=anet.iut.address,
+                errorClass='object', errorCode='unknownObject',
+                ).doc("2-1-2") \
+            .success()
+
+        # no IUT application layer matching
+        anet.iut.start_state.success()
+
+        # run the group
+        anet.run()
+
+        assert len(helper_threads) == 1
+
+    def test_offloaded_property(self):
+        """Test a property that is read in the executor."""
+        if _debug: TestExecutor._debug("test_offloaded_property")
+
+        # create a network
+        anet = ApplicationNetwork()
+
+        # add the service capability to the IUT, no helper functions are
+        # given to the executor
+        anet.iut.add_capability(ReadWritePropertyServices)
+        anet.iut.set_executor(ThreadExecutor())
+
+        # add an object with a property read by the executor
+        anet.iut.add_object(SampleOffloadedDescription(
+            objectIdentifier=(128, 1),
+            objectName='sample',
+            description='offloaded',
+            ))
+
+        # read the property and one that is not offloaded
+        anet.td.start_state.doc("3-1-0") \
+            .send(ReadPropertyRequest(
+                objectIdentifier=(128, 1),
+                propertyIdentifier='description',
+                destination=anet.iut.address,
+                )).doc("3-1-1") \
+            .receive(ReadPropertyACK, pduSource=anet.iut.address).doc("3-1-2") \
+            .send(ReadPropertyRequest(
+                objectIdentifier=(128, 1),
+                propertyIdentifier='objectName',
+                destination=anet.iut.address,
+                )).doc("3-1-3") \
+            .receive(ReadPropertyACK, pduSource=anet.iut.address).doc("3-1-4") \
+            .success()
+
+        # no IUT application layer matching
+        anet.iut.start_state.success()
+
+        # run the group
+        anet.run()
+
+        # the executor thread read the property
+        assert len(helper_threads) == 2
+        assert helper_threads[0] is helper_threads[1]
+
+    def test_application_timeout(self):
+        """Test a helper function that is still running when the server
+        transaction times out."""
+        if _debug: TestExecutor._debug("test_application_timeout")
+
+        # create a network
+        anet = ApplicationNetwork()
+
+        # add the service capability to the IUT, the helper function does
+        # not finish until it is released
+        executor = HeldExecutor()
+        anet.iut.add_capability(ReadWritePropertyServices)
+        anet.iut.set_executor(executor, ['do_ReadPropertyRequest'])
+
+        # the client does not retry, the server gives up first
+        anet.td.smap.retryCount = 0
+        anet.iut.smap.applicationTimeout = 1000
+
+        # read the device object name, there is no response
+        anet.td.start_state.doc("4-1-0") \
+            .send(ReadPropertyRequest(
+                objectIdentifier=('device', 20),
+                propertyIdentifier='objectName',
+                destination=anet.iut.address,
+                )).doc("4-1-1") \
+            .receive(AbortPDU).doc("4-1-2") \
+            .success()
+
+        # the IUT gets the request
+        anet.iut.start_state.doc("4-2-0") \
+            .receive(ReadPropertyRequest).doc("4-2-1") \
+            .success()
+
+        # run the group, the server transaction has timed out while the
+        # helper function has not run
+        anet.run()
+        assert helper_threads == []
+        assert anet.iut.smap.serverTransactions == []
+
+        # the late response is passed to the core and dropped
+        executor.release()
+        assert len(helper_threads) == 1
+        run_time_machine(1.0)
+        assert anet.iut.smap.serverTransactions == []
+
+    def test_submit_error(self):
+        """Test an executor that refuses the helper function."""
+        if _debug: TestExecutor._debug("test_submit_error")
+
+        # create a network
+        anet = ApplicationNetwork()
+
+        # add the service capability to the IUT
+        anet.iut.add_capability(ReadWritePropertyServices)
+        anet.iut.set_executor(ShutdownExecutor(), ['do_ReadPropertyRequest'])
+
+        # the request fails like the helper function did
+        anet.td.start_state.doc("5-1-0") \
+            .send(ReadPropertyRequest(
+                objectIdentifier=('device', 20),
+                propertyIdentifier='objectName',
+                destination=anet.iut.address,
+                )).doc("5-1-1") \
+            .receive(Error, pduSource=anet.iut.address,
+                errorClass='device', errorCode='operationalProblem',
+                ).doc("5-1-2") \
+            .success()
+
+        # no IUT application layer matching
+        anet.iut.start_state.success()
+
+        # run the group
+        anet.run()
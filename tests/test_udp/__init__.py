@@ -0,0 +1,9 @@
+#!/usr/bin/python
+
+"""
+Test UDP Module
+"""
+
+from . import test_director
+from . import test_actor
+from . import test_pool
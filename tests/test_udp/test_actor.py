@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test UDP Actor
+--------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes import udp
+from bacpypes.comm import PDU
+from bacpypes.task import FunctionTask
+from bacpypes.udp import UDPDirector
+
+from ..time_machine import TimeMachine, reset_time_machine, run_time_machine
+from .test_director import FakeSocket, PEER
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# reference to time machine
+time_machine = None
+
+
+@bacpypes_debugging
+def setup_module(module):
+    if _debug: setup_module._debug("setup_module %r", module)
+    global time_machine
+
+    # this is a singleton
+    time_machine = TimeMachine()
+
+
+@bacpypes_debugging
+def teardown_module():
+    if _debug: teardown_module._debug("teardown_module")
+    global time_machine
+
+    # all done
+    time_machine = None
+
+
+@bacpypes_debugging
+class TestUDPActor(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestUDPActor._debug("setup_method %r", method)
+
+        reset_time_machine()
+
+        # the actors read the clock of the time machine
+        self.save_time = udp._time
+        udp._time = time_machine.get_time
+
+        self.director = UDPDirector(('127.0.0.1', 0), timeout=10.0)
+        self.real_socket = self.director.socket
+        self.director.socket = FakeSocket()
+
+    def teardown_method(self, method):
+        if _debug: TestUDPActor._debug("teardown_method %r", method)
+
+        udp._time = self.save_time
+
+        self.director.socket = self.real_socket
+        self.director.close_socket()
+
+    def send(self):
+        self.director.indication(PDU(xtob('01'), destination=PEER))
+
+    def test_idle(self):
+        if _debug: TestUDPActor._debug("test_idle")
+
+        self.send()
+        assert PEER in self.director.peers
+
+        # deleted one timeout after the last PDU
+        run_time_machine(9.5)
+        assert PEER in self.director.peers
+        run_time_machine(1.0)
+        assert PEER not in self.director.peers
+
+    def test_active(self):
+        if _debug: TestUDPActor._debug("test_active")
+
+        self.send()
+
+        # traffic in both directions while the timer is installed
+        FunctionTask(self.send).install_task(4.0)
+        FunctionTask(self.director._response, PDU(xtob('02'), source=PEER)).install_task(8.0)
+
+        # still there when the first timeout has passed
+        run_time_machine(17.5)
+        assert PEER in self.director.peers
+
+        # deleted one timeout after the last one
+        run_time_machine(1.0)
+        assert PEER not in self.director.peers
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test UDP Director
+-----------------
+"""
+
+import errno
+import socket
+import unittest
+
+from collections import deque
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.comm import PDU, Client, bind
+from bacpypes.udp import UDPDirector
+
+from ..time_machine import TimeMachine, reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# reference to time machine
+time_machine = None
+
+# a peer of the director
+PEER = ('192.168.0.20', 47808)
+
+
+@bacpypes_debugging
+def setup_module(module):
+    if _debug: setup_module._debug("setup_module %r", module)
+    global time_machine
+
+    # this is a singleton
+    time_machine = TimeMachine()
+
+
+@bacpypes_debugging
+def teardown_module():
+    if _debug: teardown_module._debug("teardown_module")
+    global time_machine
+
+    # all done
+    time_machine = None
+
+
+#
+#   FakeSocket
+#
+
+@bacpypes_debugging
+class FakeSocket:
+
+    """Stands in for the socket of the director, datagrams to receive are
+    appended to the incoming queue and the socket buffer is full when it
+    runs out."""
+
+    def __init__(self):
+        if _debug: FakeSocket._debug("__init__")
+
+        self.incoming = deque()
+        self.reads = 0
+
+        # datagrams sent and the number that can be sent before the
+        # socket buffer is full, None for no limit
+        self.sent = []
+        self.room = None
+
+    def _would_block(self):
+        return socket.error(errno.EAGAIN, "Resource temporarily unavailable")
+
+    def recvfrom(self, bufsize):
+        self.reads += 1
+        if not self.incoming:
+            raise self._would_block()
+        return self.incoming.popleft()
+
+    def recvmsg(self, bufsize, ancbufsize=0):
+        data, addr = self.recvfrom(bufsize)
+        return data, [], 0, addr
+
+    def recvfrom_into(self, buff):
+        data, addr = self.recvfrom(len(buff))
+        buff[:len(data)] = data
+        return len(data), addr
+
+    def recvmsg_into(self, buffers, ancbufsize=0):
+        nbytes, addr = self.recvfrom_into(buffers[0])
+        return nbytes, [], 0, addr
+
+    def sendto(self, data, addr):
+        if self.room is not None:
+            if not self.room:
+                raise self._would_block()
+            self.room -= 1
+
+        self.sent.append((bytes(data), addr))
+        return len(data)
+
+
+#
+#   SampleClient
+#
+
+@bacpypes_debugging
+class SampleClient(Client):
+
+    def __init__(self):
+        if _debug: SampleClient._debug("__init__")
+        Client.__init__(self)
+
+        self.received = []
+
+    def confirmation(self, pdu):
+        if _debug: SampleClient._debug("confirmation %r", pdu)
+
+        self.received.append((pdu.pduData, pdu.pduSource))
+
+
+@bacpypes_debugging
+class TestUDPDirector(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestUDPDirector._debug("setup_method %r", method)
+
+        reset_time_machine()
+
+        self.director = UDPDirector(('127.0.0.1', 0), batch=4)
+        self.client = SampleClient()
+        bind(self.client, self.director)
+
+        # swap in the fake socket
+        self.real_socket = self.director.socket
+        self.director.socket = self.fake_socket = FakeSocket()
+
+    def teardown_method(self, method):
+        if _debug: TestUDPDirector._debug("teardown_method %r", method)
+
+        self.director.socket = self.real_socket
+        self.director.close_socket()
+
+    def test_read_batch(self):
+        if _debug: TestUDPDirector._debug("test_read_batch")
+
+        datagrams = [(bytes(bytearray([i])), PEER) for i in range(6)]
+        self.fake_socket.incoming.extend(datagrams)
+
+        # no more than the batch in one read
+        self.director.handle_read()
+        assert self.fake_socket.reads == 4
+        assert len(self.fake_socket.incoming) == 2
+
+        # then stop when the socket would block
+        self.director.handle_read()
+        assert self.fake_socket.reads == 7
+        assert not self.fake_socket.incoming
+
+        # all of them go up in order
+        run_time_machine(1.0)
+        assert self.client.received == [(bytearray(data), addr) for data, addr in datagrams]
+        assert (self.director.readBatches.count, self.director.readBatches.maximum) == (2, 4)
+
+    def test_read_one(self):
+        if _debug: TestUDPDirector._debug("test_read_one")
+
+        self.director.batch = 1
+        self.fake_socket.incoming.extend([(b'\x01', PEER), (b'\x02', PEER)])
+
+        self.director.handle_read()
+        assert self.fake_socket.reads == 1
+
+        run_time_machine(1.0)
+        assert self.client.received == [(bytearray(b'\x01'), PEER)]
+
+    def test_write_drain(self):
+        if _debug: TestUDPDirector._debug("test_write_drain")
+
+        for i in range(3):
+            self.director.indication(PDU(xtob('%02x' % (i,)), destination=PEER))
+        assert len(self.director.request) == 3
+
+        # one writable event sends all of them
+        self.director.handle_write()
+        assert self.fake_socket.sent == [(bytes(bytearray([i])), PEER) for i in range(3)]
+        assert not self.director.request
+        assert not self.director.writable()
+        assert (self.director.writeBatches.count, self.director.writeBatches.total) == (1, 3)
+
+    def test_write_blocked(self):
+        if _debug: TestUDPDirector._debug("test_write_blocked")
+
+        for i in range(3):
+            self.director.indication(PDU(xtob('%02x' % (i,)), destination=PEER))
+
+        # the socket buffer is full after the first one
+        self.fake_socket.room = 1
+        self.director.handle_write()
+        assert self.fake_socket.sent == [(b'\x00', PEER)]
+        assert self.director.writeBlocked == 1
+
+        # the one that would block is first in line
+        assert [pdu.pduData for pdu in self.director.request] == [bytearray(b'\x01'), bytearray(b'\x02')]
+        assert self.director.writable()
+
+        # the rest are sent when there is room
+        self.fake_socket.room = None
+        self.director.handle_write()
+        assert [data for data, addr in self.fake_socket.sent] == [b'\x00', b'\x01', b'\x02']
+        assert not self.director.request
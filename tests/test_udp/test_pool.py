@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test UDP Buffer Pool
+--------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Client, bind
+from bacpypes.udp import UDPDirector
+
+# receive buffers are only decoded in place in Python 3
+try:
+    from bacpypes.udp import BufferPool
+except ImportError:
+    BufferPool = None
+
+from ..time_machine import TimeMachine, reset_time_machine, run_time_machine
+from .test_director import FakeSocket, SampleClient, PEER
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# reference to time machine
+time_machine = None
+
+
+@bacpypes_debugging
+def setup_module(module):
+    if _debug: setup_module._debug("setup_module %r", module)
+    global time_machine
+
+    # this is a singleton
+    time_machine = TimeMachine()
+
+
+@bacpypes_debugging
+def teardown_module():
+    if _debug: teardown_module._debug("teardown_module")
+    global time_machine
+
+    # all done
+    time_machine = None
+
+
+#
+#   KeepingClient
+#
+
+@bacpypes_debugging
+class KeepingClient(Client):
+
+    """Keep the PDUs themselves, so their views of the buffers remain."""
+
+    def __init__(self):
+        if _debug: KeepingClient._debug("__init__")
+        Client.__init__(self)
+
+        self.received = []
+
+    def confirmation(self, pdu):
+        if _debug: KeepingClient._debug("confirmation %r", pdu)
+
+        self.received.append(pdu)
+
+
+@bacpypes_debugging
+@unittest.skipIf(BufferPool is None, "receive buffers are Python 3 only")
+class TestBufferPool(unittest.TestCase):
+
+    def test_reuse(self):
+        if _debug: TestBufferPool._debug("test_reuse")
+
+        pool = BufferPool(size=16, count=2)
+
+        # a returned buffer is the next one out
+        buff = pool.get()
+        assert len(buff) == 16
+        pool.put(buff)
+        assert pool.get() is buff
+        assert (pool.allocated, pool.misses, pool.kept) == (1, 0, 0)
+
+    def test_exhausted(self):
+        if _debug: TestBufferPool._debug("test_exhausted")
+
+        pool = BufferPool(size=16, count=2)
+
+        # one more than the pool is a miss
+        buffers = [pool.get() for i in range(3)]
+        assert (pool.allocated, pool.misses) == (2, 1)
+
+        # no more than the count are kept for reuse
+        for buff in buffers:
+            pool.put(buff)
+        assert len(pool.buffers) == 2
+
+        # so the next ones are not misses
+        buffers = [pool.get() for i in range(2)]
+        assert pool.misses == 1
+
+    def test_viewed(self):
+        if _debug: TestBufferPool._debug("test_viewed")
+
+        pool = BufferPool(size=16, count=2)
+
+        # a buffer that is still viewed is not reused
+        buff = pool.get()
+        view = memoryview(buff)[:4]
+        pool.put(buff)
+        assert pool.get() is not buff
+        assert pool.kept == 1
+
+        # and it is not changed
+        assert len(view) == 4 and len(buff) == 16
+
+
+@bacpypes_debugging
+@unittest.skipIf(BufferPool is None, "receive buffers are Python 3 only")
+class TestPooledDirector(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestPooledDirector._debug("setup_method %r", method)
+
+        reset_time_machine()
+
+        self.pool = BufferPool(size=16, count=4)
+        self.director = UDPDirector(('127.0.0.1', 0), batch=4, pool=self.pool)
+        self.client = KeepingClient()
+        bind(self.client, self.director)
+
+        # swap in the fake socket
+        self.real_socket = self.director.socket
+        self.director.socket = self.fake_socket = FakeSocket()
+
+    def teardown_method(self, method):
+        if _debug: TestPooledDirector._debug("teardown_method %r", method)
+
+        self.director.socket = self.real_socket
+        self.director.close_socket()
+
+    def test_returned(self):
+        if _debug: TestPooledDirector._debug("test_returned")
+
+        self.fake_socket.incoming.extend([(b'\x01\x02', PEER), (b'\x03', PEER)])
+
+        # the buffers are out while the PDUs wait to be routed, the one for
+        # the read that would block is back already
+        self.director.handle_read()
+        assert (self.pool.allocated, len(self.pool.buffers)) == (3, 1)
+
+        # this client copies the data, so they all come back
+        self.client = SampleClient()
+        bind(self.client, self.director)
+        run_time_machine(1.0)
+        assert self.client.received == [(bytearray(b'\x01\x02'), PEER), (bytearray(b'\x03'), PEER)]
+        assert len(self.pool.buffers) == 3
+        assert self.pool.kept == 0
+
+        # and they are read into again
+        self.fake_socket.incoming.append((b'\x04', PEER))
+        self.director.handle_read()
+        run_time_machine(1.0)
+        assert self.client.received[-1] == (bytearray(b'\x04'), PEER)
+        assert self.pool.allocated == 3
+
+    def test_kept(self):
+        if _debug: TestPooledDirector._debug("test_kept")
+
+        self.fake_socket.incoming.append((b'\x01\x02', PEER))
+        self.director.handle_read()
+
+        # the client keeps the PDU which keeps its buffer
+        run_time_machine(1.0)
+        assert self.pool.kept == 1
+        assert len(self.pool.buffers) == 1
+
+        # the data is still there after the next read
+        self.fake_socket.incoming.append((b'\x03\x04', PEER))
+        self.director.handle_read()
+        run_time_machine(1.0)
+        assert [pdu.pduData for pdu in self.client.received] == [bytearray(b'\x01\x02'), bytearray(b'\x03\x04')]
+
+    def test_truncated(self):
+        if _debug: TestPooledDirector._debug("test_truncated")
+
+        self.fake_socket.incoming.extend([(bytes(16), PEER)] * 5)
+
+        # dropped, each buffer is back before the next read and they count
+        # against the batch
+        self.director.handle_read()
+        assert self.fake_socket.reads == 4
+        assert (self.pool.allocated, len(self.pool.buffers)) == (1, 1)
+        assert self.director.metrics.packetsIn == 4
+
+        run_time_machine(1.0)
+        assert self.client.received == []
@@ -9,6 +9,8 @@ This module tests the test utilities.
 
 from . import test_state_machine
 from . import test_time_machine
+from . import test_core
+from . import test_metrics
 from . import test_extended_tag_list
 
 from . import test_client_state_machine
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Utilities Core
+-------------------
+"""
+
+import socket
+import asyncore
+import unittest
+import threading
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+import bacpypes.core as core
+from bacpypes.task import FunctionTask
+
+# only Python 3 has selectors and asyncio
+try:
+    import selectors
+except ImportError:
+    selectors = None
+try:
+    import asyncio
+    from bacpypes.aiocore import AsyncioCore
+except ImportError:
+    asyncio = None
+
+from ..time_machine import TimeMachine, reset_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# reference to time machine
+time_machine = None
+
+
+@bacpypes_debugging
+def setup_module(module):
+    if _debug: setup_module._debug("setup_module %r", module)
+    global time_machine
+
+    # this is a singleton
+    time_machine = TimeMachine()
+
+
+@bacpypes_debugging
+def teardown_module():
+    if _debug: teardown_module._debug("teardown_module")
+    global time_machine
+
+    # all done
+    time_machine = None
+
+
+@bacpypes_debugging
+class SampleDispatcher(asyncore.dispatcher):
+
+    """Send what has been queued and count the checks of its interest."""
+
+    def __init__(self, sock):
+        if _debug: SampleDispatcher._debug("__init__ %r", sock)
+        asyncore.dispatcher.__init__(self, sock)
+
+        self.request = b''
+        self.received = b''
+        self.checks = 0
+
+    def readable(self):
+        self.checks += 1
+        return True
+
+    def writable(self):
+        return bool(self.request)
+
+    def handle_read(self):
+        self.received += self.recv(1024)
+
+    def handle_write(self):
+        sent = self.send(self.request)
+        self.request = self.request[sent:]
+
+
+@bacpypes_debugging
+class TestDispatcherChanged(unittest.TestCase):
+
+    def test_wakeup(self):
+        if _debug: TestDispatcherChanged._debug("test_wakeup")
+
+        # only on some platforms
+        trigger = time_machine.trigger
+        if not trigger:
+            return
+
+        save_task_manager = core.taskManager
+        core.taskManager = time_machine
+        trigger.clear()
+        try:
+            # changed by the loop thread, it looks before it waits
+            trigger.loopThread = threading.current_thread().ident
+            core.dispatcher_changed(None)
+            assert not trigger.isSet()
+
+            # changed by another thread, the wait is broken
+            trigger.loopThread = None
+            core.dispatcher_changed(None)
+            assert trigger.isSet()
+
+            trigger.handle_read()
+        finally:
+            trigger.loopThread = None
+            core.taskManager = save_task_manager
+
+
+@bacpypes_debugging
+@unittest.skipIf(selectors is None, "selectors are Python 3 only")
+class TestSelectorLoop(unittest.TestCase):
+
+    def test_selector_loop(self):
+        if _debug: TestSelectorLoop._debug("test_selector_loop")
+
+        selector_loop = core.SelectorLoop(rescan=None)
+
+        sock, other = socket.socketpair()
+        sender = SampleDispatcher(sock)
+        idle = SampleDispatcher(other)
+        sender_fd, idle_fd = sender._fileno, idle._fileno
+        try:
+            # added dispatchers are registered for what they want
+            selector_loop.poll(0.0)
+            assert selector_loop.registered[sender_fd] == (sender, selectors.EVENT_READ)
+            assert selector_loop.registered[idle_fd] == (idle, selectors.EVENT_READ)
+
+            # writable after it is changed, sent and back to readable
+            sender.request = b'hello'
+            selector_loop.dispatcher_changed(sender)
+            selector_loop.poll(0.0)
+            assert sender.request == b''
+            assert selector_loop.registered[sender_fd] == (sender, selectors.EVENT_READ)
+
+            # the other end is readable
+            selector_loop.poll(1.0)
+            assert idle.received == b'hello'
+
+            # not checked again without an event or a change
+            checks = sender.checks
+            selector_loop.poll(0.0)
+            assert sender.checks == checks
+
+            # closed dispatchers are unregistered
+            sender.close()
+            selector_loop.poll(0.0)
+            assert sender_fd not in selector_loop.registered
+        finally:
+            sender.close()
+            idle.close()
+            selector_loop.poll(0.0)
+            selector_loop.selector.close()
+
+
+@bacpypes_debugging
+@unittest.skipIf(asyncio is None, "asyncio is Python 3 only")
+class TestAsyncioCore(unittest.TestCase):
+
+    def test_queued_by_callback(self):
+        if _debug: TestAsyncioCore._debug("test_queued_by_callback")
+
+        reset_time_machine()
+
+        # one end queues data, the other end is idle
+        sock, other = socket.socketpair()
+        sender = SampleDispatcher(sock)
+        idle = SampleDispatcher(other)
+
+        loop = asyncio.new_event_loop()
+        runner = AsyncioCore(loop, rescan=None)
+        save_task_manager = core.taskManager
+        try:
+            runner.start()
+            checks = []
+
+            def send():
+                checks.append(idle.checks)
+
+                # sent without waiting for the next task
+                sender.request = b'hello'
+                core.dispatcher_changed(sender)
+
+            def received(count=100):
+                if idle.received or not count:
+                    core.stop()
+                else:
+                    loop.call_later(0.01, received, count - 1)
+
+            # callbacks of the event loop
+            loop.call_soon(send)
+            loop.call_soon(received)
+            loop.run_until_complete(runner.done)
+            assert idle.received == b'hello'
+
+            # the idle dispatcher was only checked after its read
+            assert idle.checks == checks[0] + 1
+        finally:
+            runner.close()
+            loop.close()
+            sender.close()
+            idle.close()
+            core.taskManager = save_task_manager
+
+    def test_task_from_callback(self):
+        if _debug: TestAsyncioCore._debug("test_task_from_callback")
+
+        # only on some platforms
+        trigger = time_machine.trigger
+        if not trigger:
+            return
+
+        reset_time_machine()
+        time_machine.time_limit = 10.0
+        trigger.clear()
+
+        loop = asyncio.new_event_loop()
+        runner = AsyncioCore(loop, rescan=None)
+        save_task_manager = core.taskManager
+        try:
+            runner.start()
+            assert trigger.loopThread == threading.current_thread().ident
+            processed = []
+
+            def process():
+                processed.append(time_machine.current_time)
+                core.stop()
+
+            def install():
+                # there is no pass scheduled, the trigger asks for one
+                # without writing to the pipe
+                FunctionTask(process).install_task(1.0)
+                assert not trigger.wakeupPending
+
+            # give up if it is never processed
+            loop.call_soon(install)
+            loop.call_later(1.0, core.stop)
+            loop.run_until_complete(runner.done)
+            assert processed == [1.0]
+        finally:
+            runner.close()
+            loop.close()
+            core.taskManager = save_task_manager
+
+        # the loop thread is forgotten
+        assert trigger.loopThread is None
+        assert trigger.loopWakeup is None
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Utilities Metrics
+----------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.task import OneShotTask, RecurringTask
+from bacpypes.metrics import Histogram, LoopMetrics, TransportMetrics
+from ..time_machine import TimeMachine, reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# reference to time machine
+time_machine = None
+
+
+@bacpypes_debugging
+def setup_module(module):
+    if _debug: setup_module._debug("setup_module %r", module)
+    global time_machine
+
+    # this is a singleton
+    time_machine = TimeMachine()
+
+
+@bacpypes_debugging
+def teardown_module():
+    if _debug: teardown_module._debug("teardown_module")
+    global time_machine
+
+    # all done
+    time_machine = None
+
+
+@bacpypes_debugging
+class SampleOneShotTask(OneShotTask):
+
+    def process_task(self):
+        if _debug: SampleOneShotTask._debug("process_task")
+
+
+@bacpypes_debugging
+class SampleRecurringTask(RecurringTask):
+
+    def process_task(self):
+        if _debug: SampleRecurringTask._debug("process_task")
+
+
+@bacpypes_debugging
+class TestHistogram(unittest.TestCase):
+
+    def test_histogram(self):
+        if _debug: TestHistogram._debug("test_histogram")
+
+        histogram = Histogram((1, 2, 4))
+        assert histogram.percentile(50) is None
+
+        for value in (0.5, 1, 1.5, 3, 3, 10):
+            histogram.record(value)
+
+        assert histogram.counts == [2, 1, 2, 1]
+        assert histogram.count == 6
+        assert histogram.maximum == 10
+        assert histogram.percentile(50) == 2
+        assert histogram.percentile(99) == 10
+
+
+@bacpypes_debugging
+class TestLoopMetrics(unittest.TestCase):
+
+    def test_task_classes(self):
+        if _debug: TestLoopMetrics._debug("test_task_classes")
+
+        # tasks are counted by class while the metrics are set
+        time_machine.metrics = metrics = LoopMetrics()
+        try:
+            reset_time_machine()
+            SampleOneShotTask().install_task(1.0)
+            SampleOneShotTask().install_task(2.0)
+            SampleRecurringTask().install_task(1000.0)
+            run_time_machine(3.5)
+        finally:
+            time_machine.metrics = None
+
+        assert metrics.lateness.count == 5
+        assert metrics.lateness.maximum == 0.0
+
+        name = __name__ + '.SampleOneShotTask'
+        assert metrics.taskClasses[name][0] == 2
+        assert metrics.snapshot()['taskClasses'][name][0] == 2
+
+        name = __name__ + '.SampleRecurringTask'
+        assert metrics.taskClasses[name][0] == 3
+
+
+@bacpypes_debugging
+class TestTransportMetrics(unittest.TestCase):
+
+    def test_transport_metrics(self):
+        if _debug: TestTransportMetrics._debug("test_transport_metrics")
+
+        metrics = TransportMetrics()
+        peer = ('192.168.0.20', 47808)
+
+        metrics.received(peer, 24)
+        metrics.received(peer, 12)
+        metrics.sent(peer, 8)
+        metrics.error(peer)
+        metrics.error()
+        assert (metrics.packetsIn, metrics.bytesIn) == (2, 36)
+        assert (metrics.packetsOut, metrics.bytesOut) == (1, 8)
+        assert metrics.errors == 2
+        assert metrics.snapshot()['peers'][peer] == (2, 36, 1, 8, 1)
+
+        # the high-water mark stays when the queue drains
+        metrics.queued(3)
+        metrics.queued(1)
+        assert (metrics.queueDepth, metrics.queueHighWater) == (1, 3)
+
+        metrics.reset()
+        assert metrics.packetsIn == 0
+        assert metrics.peers == {}
+
+    def test_max_peers(self):
+        if _debug: TestTransportMetrics._debug("test_max_peers")
+
+        metrics = TransportMetrics(maxPeers=2)
+        peers = [('192.168.0.%d' % (i,), 47808) for i in range(20, 23)]
+
+        metrics.received(peers[0], 8)
+        metrics.received(peers[1], 8)
+        metrics.sent(peers[0], 8)
+
+        # the least recently active is dropped, the totals are not
+        metrics.received(peers[2], 8)
+        assert list(metrics.peers) == [peers[0], peers[2]]
+        assert metrics.peers[peers[0]] == [1, 8, 1, 8, 0]
+        assert metrics.packetsIn == 3
@@ -7,6 +7,7 @@ Test Utilities Time Machine
 """
 
 import unittest
+import threading
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger
 
@@ -76,6 +77,12 @@ class SampleOneShotTask(OneShotTask):
         self.process_task_called.append(time_machine.current_time)
 
 
+@bacpypes_debugging
+class SampleCoarseTask(SampleOneShotTask):
+
+    taskCoarse = True
+
+
 # flag to make sure the function was called
 sample_task_function_called = []
 
@@ -240,3 +247,179 @@ class TestTimeMachine(unittest.TestCase):
         assert almost_equal(ft.process_task_called, [0.9, 1.9, 2.9, 3.9, 4.9])
         assert time_machine.current_time == 5.0
 
+
+    def test_suspend_task(self):
+        if _debug: TestTimeMachine._debug("test_suspend_task")
+
+        # create some tasks
+        ft1 = SampleOneShotTask()
+        ft2 = SampleOneShotTask()
+
+        # reset the time machine, install the tasks, suspend one
+        reset_time_machine()
+        ft1.install_task(1.0)
+        ft2.install_task(2.0)
+        ft1.suspend_task()
+        assert not ft1.isScheduled
+        run_time_machine(5.0)
+
+        # only one called
+        assert ft1.process_task_called == []
+        assert almost_equal(ft2.process_task_called, [2.0])
+
+        # suspending it again is harmless
+        ft1.suspend_task()
+
+    def test_reschedule_task(self):
+        if _debug: TestTimeMachine._debug("test_reschedule_task")
+
+        # create a task
+        ft = SampleOneShotTask()
+
+        # reset the time machine, install the task a few times
+        reset_time_machine()
+        ft.install_task(3.0)
+        ft.install_task(1.0)
+        ft.install_task(2.0)
+        run_time_machine(5.0)
+
+        # only the last one
+        assert almost_equal(ft.process_task_called, [2.0])
+
+    def test_many_suspended(self):
+        if _debug: TestTimeMachine._debug("test_many_suspended")
+
+        # create a lot of tasks
+        tasks = [SampleOneShotTask() for i in range(100)]
+
+        # reset the time machine, install the tasks, reschedule some more
+        # than once so the heap is compacted
+        reset_time_machine()
+        for i, ft in enumerate(tasks):
+            ft.install_task(1.0 + i)
+        for j in range(3):
+            for i, ft in enumerate(tasks[::2]):
+                ft.install_task(101.0 + i + j)
+        assert len(time_machine.tasks) < 300
+        run_time_machine(200.0)
+
+        # each one called once, the odd ones first
+        for i, ft in enumerate(tasks):
+            if i % 2:
+                assert almost_equal(ft.process_task_called, [1.0 + i])
+            else:
+                assert almost_equal(ft.process_task_called, [101.0 + (i // 2) + 2])
+
+    def test_timing_wheel(self):
+        if _debug: TestTimeMachine._debug("test_timing_wheel")
+
+        # coarse tasks are in the wheel
+        time_machine.enable_timing_wheel(0.5)
+        try:
+            ft1 = SampleCoarseTask()
+            ft2 = SampleCoarseTask()
+            ft3 = SampleOneShotTask()
+            ft4 = SampleCoarseTask()
+
+            # reset the time machine, install the tasks, suspend one
+            reset_time_machine()
+            ft1.install_task(1.2)
+            ft2.install_task(1.3)
+            ft3.install_task(1.4)
+            ft4.install_task(2.0)
+            ft2.suspend_task()
+            assert not ft2.isScheduled
+            run_time_machine(5.0)
+
+            # coarse tasks are processed at the end of the tick
+            assert almost_equal(ft1.process_task_called, [1.5])
+            assert ft2.process_task_called == []
+            assert almost_equal(ft3.process_task_called, [1.4])
+            assert almost_equal(ft4.process_task_called, [2.0])
+
+            # the resolution cannot be changed
+            with self.assertRaises(RuntimeError):
+                time_machine.enable_timing_wheel(0.25)
+        finally:
+            # the wheel is not left enabled for the other tests
+            time_machine.disable_timing_wheel()
+
+    def test_timing_wheel_default(self):
+        if _debug: TestTimeMachine._debug("test_timing_wheel_default")
+
+        # all tasks are in the wheel unless they opt out
+        time_machine.enable_timing_wheel(0.5, default=True)
+        try:
+            ft1 = SampleOneShotTask()
+            ft2 = SampleOneShotTask()
+            ft2.taskCoarse = False
+            ft3 = SampleRecurringTask()
+
+            # reset the time machine, install the tasks, reschedule one
+            reset_time_machine()
+            ft1.install_task(0.3)
+            ft1.install_task(0.7)
+            ft2.install_task(0.7)
+            ft3.install_task(1200.0)
+            run_time_machine(3.0)
+        finally:
+            time_machine.disable_timing_wheel()
+
+        assert almost_equal(ft1.process_task_called, [1.0])
+        assert almost_equal(ft2.process_task_called, [0.7])
+        assert almost_equal(ft3.process_task_called, [1.5, 2.5])
+
+    def test_disable_timing_wheel(self):
+        if _debug: TestTimeMachine._debug("test_disable_timing_wheel")
+
+        time_machine.enable_timing_wheel(0.5, default=True)
+        try:
+            ft1 = SampleOneShotTask()
+            ft2 = SampleOneShotTask()
+
+            reset_time_machine()
+            ft1.install_task(1.2)
+            ft2.install_task(1.3)
+        finally:
+            time_machine.disable_timing_wheel()
+        assert time_machine.wheel is None
+        assert not time_machine.wheelDefault
+
+        # the tasks are still scheduled, now at their own times
+        assert ft1.isScheduled
+        ft2.suspend_task()
+        assert not ft2.isScheduled
+        run_time_machine(5.0)
+
+        assert almost_equal(ft1.process_task_called, [1.2])
+        assert ft2.process_task_called == []
+
+    def test_trigger(self):
+        if _debug: TestTimeMachine._debug("test_trigger")
+
+        # only on some platforms
+        trigger = time_machine.trigger
+        if not trigger:
+            return
+
+        reset_time_machine()
+        trigger.clear()
+        try:
+            # installed by the loop thread, nothing written
+            trigger.loopThread = threading.current_thread().ident
+            SampleOneShotTask().install_task(1.0)
+            assert not trigger.isSet()
+
+            # installed by another thread, written once
+            trigger.loopThread = None
+            SampleOneShotTask().install_task(2.0)
+            assert trigger.isSet()
+            assert trigger.wakeupPending
+            SampleOneShotTask().install_task(3.0)
+
+            # read by the loop
+            trigger.handle_read()
+            assert not trigger.isSet()
+            assert not trigger.wakeupPending
+        finally:
+            trigger.loopThread = None
@@ -5,8 +5,6 @@ Testing Time Machine
 --------------------
 """
 
-from heapq import heappop
-
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger
 
 import bacpypes.core as _core
@@ -78,12 +76,12 @@ class TimeMachine(_TaskManager):
             if _debug: TimeMachine._debug("    - time limit reached")
             return False
 
-        if not self.tasks:
+        # peek at the next task and see when it is supposed to run
+        when, task = self.peek_task()
+        if not task:
             if _debug: TimeMachine._debug("    - no more tasks")
             return False
 
-        # peek at the next task and see when it is supposed to run
-        when, task = self.tasks[0]
         if when >= self.time_limit:
             if _debug: TimeMachine._debug("    - time limit reached")
             return False
@@ -106,12 +104,12 @@ class TimeMachine(_TaskManager):
         if (self.time_limit is not None) and (self.current_time >= self.time_limit):
             if _debug: TimeMachine._debug("    - time limit reached")
 
-        elif not self.tasks:
+        elif not self.peek_task()[1]:
             if _debug: TimeMachine._debug("    - no more tasks")
 
         else:
             # peek at the next task and see when it is supposed to run
-            when, _ = self.tasks[0]
+            when, _ = self.peek_task()
             if when >= self.time_limit:
                 if _debug: TimeMachine._debug("    - time limit reached")
 
@@ -119,13 +117,10 @@ class TimeMachine(_TaskManager):
                 self.current_time = self.time_limit
 
             else:
-                # pull it off the list
-                when, task = heappop(self.tasks)
+                # pull it off the list and mark that it is no longer scheduled
+                when, task = self.pop_task()
                 if _debug: TimeMachine._debug("    - when, task: %r, %s", when, task)
 
-                # mark that it is no longer scheduled
-                task.isScheduled = False
-
                 # advance the time
                 self.current_time = when
 
@@ -155,6 +150,9 @@ def reset_time_machine():
 
     # begin time at the beginning
     time_machine.tasks = []
+    time_machine.suspendedTasks = 0
+    if time_machine.wheel:
+        time_machine.wheel.clear()
     time_machine.current_time = 0.0
     time_machine.time_limit = None
 